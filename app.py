@@ -3,11 +3,53 @@ import random
 import os
 from PIL import Image
 from datetime import datetime
+from time import time
 import base64
+import hashlib
 import io
-from time import sleep
-from streamlit_local_storage import LocalStorage
+from array import array
+from functools import partial, wraps
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from src.what_to_cook.api_client import MealDBClient
+from src.what_to_cook.bulk import (
+    EXPORT_FORMATS, MIME_TYPES, export_recipes, format_of, import_recipes,
+)
+from src.what_to_cook.cards import cards
+from src.what_to_cook.catalog import (
+    IndexCache,
+    catalog_version,
+    indexes,
+    is_summary,
+    sync_index,
+)
+from src.what_to_cook.catalog_store import shared_store
+from src.what_to_cook.dedup import DuplicateIndex
+from src.what_to_cook.details import details
+from src.what_to_cook.discovery import HISTORY, random_meals
+from src.what_to_cook.facets import FacetIndex
+from src.what_to_cook.fuzzy import IngredientLookup, shared_lookup
+from src.what_to_cook.governor import CircuitState
+from src.what_to_cook.meal_plan import MealPlanner
+from src.what_to_cook.memory import format_bytes, ledger, shared_ids
+from src.what_to_cook.pantry import IngredientMatrix
+from src.what_to_cook.profiler import (
+    Profiler,
+    ProfileResult,
+    profile_dir,
+    profiling_requested,
+    section,
+)
+from src.what_to_cook.search import SearchIndex, search
+from src.what_to_cook.shopping import build_shopping_list, to_csv, to_text
+from src.what_to_cook.similar import SimilarityIndex
+from src.what_to_cook.sources import (
+    CustomRecipeSource,
+    MealDBSource,
+    SessionFederation,
+    directory_sources,
+    federation,
+)
+from src.what_to_cook.storage import BrowserStorage
 from src.what_to_cook.data_manager import (
     save_all,
     load_all,
@@ -15,24 +57,90 @@ from src.what_to_cook.data_manager import (
     load_favorites,
     load_custom_recipes,
     save_custom_recipes,
-    process_meal,
     generate_custom_recipe_id,
 )
+# Part of this module's interface since it fetched from MealDB itself.
+from src.what_to_cook.data_manager import process_meal  # noqa: F401
 
 
 def get_local_storage():
     if os.environ.get("TESTING"):
         return
-    return LocalStorage()
+    return BrowserStorage()
 
 
 local_storage = get_local_storage()
 
 
+def fragment(func):
+    """st.fragment that renders inline when there is no script run.
+
+    Fragments only exist inside `streamlit run`; in bare mode (unit tests,
+    scripts) st.fragment would silently skip the call.
+    """
+    as_fragment = st.fragment(func)
+
+    @wraps(func)
+    def run(*args, **kwargs):
+        if get_script_run_ctx(suppress_warning=True) is None:
+            return func(*args, **kwargs)
+        return as_fragment(*args, **kwargs)
+
+    return run
+
+
+CATALOG_TTL = 3600
+CATALOG_WAIT = 60
+PANTRY_RESULTS = 10
+SIMILAR_RESULTS = 5
+FACET_COUNTS = 12
+MEMORY_TOP = 20
+SEARCH_RESULTS = 100
+# Indexes a session keeps over its own lists (catalog plus custom
+# recipes, pantry subsets) rather than in the process-wide cache.
+SESSION_INDEXES = 8
+# Seconds between checks while waiting for browser storage.
+STORAGE_POLL = 1.0
+# Seconds a surprise waits for the first meal while the buffer is cold.
+SURPRISE_WAIT = 5.0
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday",
+            "Saturday", "Sunday"]
+FACET_TITLES = {
+    "category": "Category",
+    "area": "Cuisine",
+    "ingredients": "Ingredients",
+}
+
+
 def main():
     st.set_page_config(page_title="What to Cook Today", layout="wide")
+    if not profiling_requested(st.query_params):
+        render_app()
+        return
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    name = ctx.session_id[:8] if ctx else "rerun"
+    with Profiler(profile_dir(), name) as profiler:
+        render_app()
+    render_profile(profiler.result)
 
+
+@st.fragment(run_every=STORAGE_POLL)
+def wait_for_storage():
+    if local_storage.loaded:
+        st.rerun(scope="app")
+
+
+def render_app():
     if "initialized" not in st.session_state:
+        if local_storage and not local_storage.loaded:
+            # Until the browser answers, an empty catalog only means "not
+            # read yet"; going on would crawl MealDB for recipes this
+            # browser may already have. The answer reruns the script; a
+            # browser that never answers times out on a timer.
+            st.info("Loading your saved recipes…")
+            wait_for_storage()
+            st.stop()
         st.session_state.update(
             {
                 "initialized": True,
@@ -42,42 +150,209 @@ def main():
                 "last_api_fetch": None,
             }
         )
+        if local_storage:
+            local_storage.release()
+        # Fill the surprise buffer while the user looks around, so the
+        # first "Surprise me" does not wait on MealDB.
+        random_meals.start()
 
-    if not st.session_state.all_meals or (
-        st.session_state.last_api_fetch
-        and (datetime.now() - st.session_state.last_api_fetch).seconds > 3600
-    ):
-        try:
-            client = MealDBClient()
-            raw_meals = client.fetch_all_meals()
-            processed = [process_meal(m) for m in raw_meals]
-            st.session_state.all_meals = [m for m in processed
-                                          if m is not None]
-            st.session_state.last_api_fetch = datetime.now()
-            save_all(st.session_state.all_meals, local_storage)
-        except Exception as e:
-            st.error(f"Failed to load recipes: {str(e)}")
-            st.session_state.all_meals = []
-
-    all_recipes = st.session_state.all_meals + st.session_state.custom_recipes
+    sync_catalog()
+
+    all_recipes = merged_recipes()
 
     st.sidebar.title("Navigation")
-    page = st.sidebar.radio("Go to",
-                            ["Home", "Browse", "Favorites", "Custom Recipes"])
+    if MealDBClient.governor.breaker.state is CircuitState.OPEN:
+        st.sidebar.warning("MealDB is unavailable, showing cached recipes")
+    pages = ["Home", "Browse", "Meal Plan", "Favorites", "Custom Recipes"]
+    if os.environ.get("COOKTODAY_ADMIN"):
+        pages.append("Memory")
+    page = st.sidebar.radio("Go to", pages)
 
     if "current_recipe" not in st.session_state:
         st.session_state.current_recipe = None
     if "filtered_recipes" not in st.session_state:
         st.session_state.filtered_recipes = []
 
-    if page == "Home":
-        render_home()
-    elif page == "Browse":
-        render_browse(all_recipes)
-    elif page == "Favorites":
-        render_favorites()
-    elif page == "Custom Recipes":
-        render_custom_recipes()
+    with section("render"):
+        if page == "Home":
+            render_home()
+        elif page == "Browse":
+            render_browse(all_recipes)
+        elif page == "Meal Plan":
+            render_meal_plan(all_recipes)
+        elif page == "Favorites":
+            render_favorites()
+        elif page == "Custom Recipes":
+            render_custom_recipes()
+        elif page == "Memory":
+            render_memory()
+
+    if local_storage:
+        local_storage.flush()
+    account_memory()
+
+
+def sync_catalog() -> None:
+    """Adopt the shared catalog, refreshing it first if it is stale.
+
+    Only the process holding the store's refresh lock refreshes the
+    recipe sources; the others keep serving what they have, or wait for
+    that refresh if they have nothing yet.
+    """
+    store = shared_store()
+    version, published_at = store.head()
+    if version is None or time() - published_at > CATALOG_TTL:
+        has_recipes = version is not None or st.session_state.all_meals
+        wait = 0 if has_recipes else CATALOG_WAIT
+        with store.refresh_lock(wait=wait) as elected:
+            if elected and store.head() == (version, published_at):
+                try:
+                    with section("crawl"):
+                        meals = fetch_catalog()
+                    if meals:
+                        store.publish(meals)
+                    else:
+                        st.warning("No recipe source returned any recipes")
+                except Exception as e:
+                    st.error(f"Failed to load recipes: {str(e)}")
+            version, published_at = store.head()
+
+    if version is not None and (
+        version != st.session_state.get("catalog_version")
+    ):
+        st.session_state.all_meals = store.load(version)
+        st.session_state.catalog_version = version
+        details.adopt(version)
+        # Build the search and duplicate indexes at ingest rather than
+        # on first use.
+        catalog_index("search", build_search_index)
+        catalog_index("dedup", build_dedup_index)
+        st.session_state.last_api_fetch = datetime.fromtimestamp(
+            published_at
+        )
+        save_all(st.session_state.all_meals, local_storage)
+
+
+def catalog_key() -> tuple:
+    """The catalog's store version and content digest, worked out once
+    per catalog list this session adopts."""
+    meals = st.session_state.all_meals
+    key = st.session_state.get("catalog_key")
+    if not isinstance(key, tuple) or key[0] is not meals:
+        key = (meals, st.session_state.get("catalog_version"),
+               catalog_version(meals))
+        st.session_state["catalog_key"] = key
+    return key[1:]
+
+
+def catalog_index(kind: str, build):
+    """`build` over this session's catalog, shared by every session of
+    the process holding the same one."""
+    return indexes.get(kind, st.session_state.all_meals, build,
+                       version=catalog_key())
+
+
+def is_catalog(recipes: list) -> bool:
+    catalog = st.session_state.get("all_meals")
+    if not isinstance(catalog, list):
+        return False
+    return recipes is catalog or len(recipes) == len(catalog) and all(
+        a is b for a, b in zip(recipes, catalog)
+    )
+
+
+def session_indexes() -> IndexCache:
+    """Indexes over this session's own lists, kept in its state so the
+    memory ledger bills them and they never evict catalog indexes."""
+    cache = st.session_state.get("indexes")
+    if not isinstance(cache, IndexCache):
+        cache = IndexCache(SESSION_INDEXES)
+        st.session_state["indexes"] = cache
+    return cache
+
+
+def catalog_positions() -> dict:
+    """Position of each catalog recipe by object id, built once per
+    catalog version and shared by the process; the entry holds the list,
+    so the ids stay valid."""
+    meals = st.session_state.all_meals
+    return indexes.lookup(
+        ("positions", catalog_key()),
+        lambda: (meals, {id(r): i for i, r in enumerate(meals)}),
+    )[1]
+
+
+def session_version(recipes: list) -> str:
+    """`catalog_version` of a list mixing catalog recipes with this
+    session's own, hashing the content of its own recipes only: catalog
+    ones are covered by `catalog_key` and their positions."""
+    if not isinstance(st.session_state.get("all_meals"), list):
+        return catalog_version(recipes)
+    positions = catalog_positions()
+    codes = array("q")
+    own = []
+    for recipe in recipes:
+        position = positions.get(id(recipe))
+        if position is None:
+            position = -1 - len(own)
+            own.append(recipe)
+        codes.append(position)
+    digest = hashlib.blake2b(repr(catalog_key()).encode(), digest_size=8)
+    digest.update(codes.tobytes())
+    return f"{digest.hexdigest()}-{catalog_version(own)}"
+
+
+def recipe_index(kind: str, recipes: list, build):
+    """`build` over `recipes`: the shared catalog index when they are the
+    catalog, else one kept by this session."""
+    if is_catalog(recipes):
+        return catalog_index(kind, build)
+    return session_indexes().get(kind, recipes, build,
+                                 version=session_version(recipes))
+
+
+def merged_recipes() -> list:
+    """Catalog plus the session's own sources, leaving out custom recipes
+    that copy a catalog recipe or an earlier custom one."""
+    if not st.session_state.custom_recipes:
+        st.session_state.pop("session_sources", None)
+        return st.session_state.all_meals
+    catalog = catalog_index("dedup", build_dedup_index)
+    sources = st.session_state.get("session_sources")
+    if sources is None or sources.catalog is not catalog:
+        sources = SessionFederation(catalog)
+        st.session_state["session_sources"] = sources
+    return st.session_state.all_meals + sources.refresh(
+        [CustomRecipeSource(st.session_state.custom_recipes)]
+    )
+
+
+def account_memory() -> None:
+    """Measure this session's state every so often, compacting if needed.
+
+    The shared catalog and the process-wide indexes (which session
+    overlays such as `session_sources` point to as their parent) are billed
+    to no session: every session of this process holds the same ones.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None or not ledger.due(ctx.session_id):
+        return
+    shared = {id(index) for index in indexes.values()}
+    if st.session_state.get("catalog_version") is not None:
+        shared |= shared_ids(st.session_state.all_meals)
+    ledger.account(
+        ctx.session_id,
+        st.session_state,
+        st.session_state.all_meals + st.session_state.custom_recipes,
+        shared,
+    )
+
+
+def fetch_catalog() -> list:
+    """MealDB and any local recipe directories, fetched in parallel and
+    merged with near duplicates left out."""
+    return federation.refresh([MealDBSource(MealDBClient),
+                               *directory_sources()])
 
 
 def render_home():
@@ -95,8 +370,7 @@ def render_home():
     )
 
     if source == "All":
-        base_recipes = st.session_state.all_meals + \
-            st.session_state.custom_recipes
+        base_recipes = merged_recipes()
     elif source == "Favorites":
         base_recipes = st.session_state.favorites
     elif source == "Custom":
@@ -104,29 +378,42 @@ def render_home():
     else:
         base_recipes = st.session_state.all_meals
 
-    ingredients_set = {i for r in base_recipes for i in r["ingredients"]}
+    index = recipe_index("facets", base_recipes, FacetIndex)
+    ingredients = index.values("ingredients")
+    ingredient_labels = index.labels["ingredients"]
+    selections = render_facet_pickers(index, "home")
 
-    col1, col2 = st.columns(2)
-    with col1:
-        include = st.multiselect(
-            "Include ingredients",
-            sorted(ingredients_set),
-        )
-    with col2:
-        exclude = st.multiselect(
-            "Exclude ingredients",
-            sorted(ingredients_set),
-        )
+    mode = st.radio(
+        "Mode",
+        ["Filter", "Pantry"],
+        horizontal=True,
+        key="home_mode"
+    )
 
-    filtered = [
-        r
-        for r in base_recipes
-        if (not include or all(i in r["ingredients"] for i in include))
-        and (not exclude or not any(e in r["ingredients"] for e in exclude))
-    ]
+    include, exclude = [], []
+    if mode == "Pantry":
+        with section("filter"):
+            faceted = index.recipes_in(index.match(selections))
+        filtered = render_pantry(faceted, ingredients, ingredient_labels)
+    else:
+        lookup = ingredient_lookup(base_recipes)
+        col1, col2 = st.columns(2)
+        with col1:
+            include = ingredient_picker("Include ingredients", lookup,
+                                        ingredient_labels, "home_include")
+        with col2:
+            exclude = ingredient_picker("Exclude ingredients", lookup,
+                                        ingredient_labels, "home_exclude")
+
+        with section("filter"):
+            filtered = index.recipes_in(
+                index.match(selections, include, exclude)
+            )
+    render_facet_counts(index, selections, include, exclude)
     st.session_state.filtered_recipes = filtered
 
     if st.button("🎲 Get Random Recipe") is True:
+        st.session_state.surprise = False
         if st.session_state.filtered_recipes:
             st.session_state.current_recipe = random.choice(
                 st.session_state.filtered_recipes  # nosec
@@ -135,6 +422,9 @@ def render_home():
             st.error("No recipes match the filters")
             st.session_state.current_recipe = None
 
+    if st.button("✨ Surprise me from all of MealDB") is True:
+        surprise_me()
+
     if st.session_state.current_recipe:
         show_recipe(
             st.session_state.current_recipe,
@@ -145,23 +435,128 @@ def render_home():
         )
 
         if st.button("🔀 Try Another Recipe") is True:
-            st.session_state.current_recipe = random.choice(
-                st.session_state.filtered_recipes  # nosec
-            )
+            if st.session_state.get("surprise") is True:
+                surprise_me()
+            else:
+                st.session_state.current_recipe = random.choice(
+                    st.session_state.filtered_recipes  # nosec
+                )
             st.rerun()
 
 
+def surprise_me() -> None:
+    """Show the next prefetched MealDB meal this session has not seen."""
+    history = list(st.session_state.get("surprise_history") or [])
+    recipe = random_meals.take(set(history), timeout=SURPRISE_WAIT)
+    if recipe is None:
+        st.warning("Still fetching surprises, try again in a moment")
+        return
+    st.session_state["surprise_history"] = \
+        (history + [recipe["id"]])[-HISTORY:]
+    st.session_state["current_recipe"] = recipe
+    st.session_state["surprise"] = True
+
+
+def ingredient_lookup(recipes: list) -> IngredientLookup:
+    index = recipe_index("facets", recipes, FacetIndex)
+    cache = indexes if is_catalog(recipes) else session_indexes()
+    return shared_lookup(index.counts("ingredients", index.everything()),
+                         cache)
+
+
+def ingredient_picker(label: str, lookup: IngredientLookup, labels: dict,
+                      key: str) -> list:
+    """Multiselect offering what is already picked plus the suggestions
+    for the typed text, rather than the whole ingredient vocabulary."""
+    chosen = [i for i in st.session_state.get(f"{key}_chosen") or []
+              if i in labels]
+    query = st.text_input(f"Find {label.lower()}", key=f"{key}_query",
+                          placeholder="e.g. tomatoe")
+    options = list(dict.fromkeys(chosen + lookup.suggest(query)))
+    return st.multiselect(
+        label,
+        options,
+        default=chosen,
+        format_func=lambda i: labels.get(i, i),
+        key=key,
+        on_change=keep_ingredients,
+        args=(key,),
+    )
+
+
+def keep_ingredients(key: str) -> None:
+    # Options follow the typed text, which gives the multiselect a new
+    # identity, so the picks are kept outside it.
+    st.session_state[f"{key}_chosen"] = list(st.session_state[key])
+    st.session_state[f"{key}_query"] = ""
+
+
+def render_pantry(recipes: list, ingredients: list,
+                  labels: dict | None = None) -> list:
+    labels = labels or {}
+    col1, col2 = st.columns(2)
+    with col1:
+        pantry = st.multiselect("In my pantry", ingredients,
+                                format_func=lambda i: labels.get(i, i),
+                                key="pantry_have")
+    with col2:
+        exclude = st.multiselect("Exclude ingredients", ingredients,
+                                 format_func=lambda i: labels.get(i, i),
+                                 key="pantry_exclude")
+
+    if not pantry:
+        st.info("Pick what you have to rank recipes by coverage")
+        return []
+
+    matrix = recipe_index("pantry", recipes, IngredientMatrix)
+    matches = matrix.rank(pantry, k=PANTRY_RESULTS, exclude=exclude)
+    for match in matches:
+        missing = ", ".join(match.missing) or "nothing"
+        st.markdown(
+            f"**{match.recipe['name']}** — {match.matched}/{match.total} "
+            f"ingredients ({match.coverage:.0%}), missing: {missing}"
+        )
+    return [match.recipe for match in matches]
+
+
 def render_browse(recipes: list):
     st.title("Browse Recipes")
-    search = st.text_input("Search recipes")
+    query = st.text_input("Search recipes")
+
+    index = recipe_index("facets", recipes, FacetIndex)
+    within = None
+    hits = []
+    if query:
+        hits = search_recipes(recipes, query)
+        position = {r["id"]: i for i, r in enumerate(recipes)}
+        within = index.from_positions(
+            position[hit.recipe["id"]] for hit in hits
+        )
 
-    filtered = [
-        r
-        for r in recipes
-        if not search
-        or search.lower() in r["name"].lower()
-        or any(search.lower() in ing for ing in r["ingredients"])
-    ]
+    selections = render_facet_pickers(index, "browse")
+    include = st.multiselect(
+        "Ingredients",
+        index.values("ingredients"),
+        format_func=index.labels["ingredients"].get,
+        key="browse_ingredients",
+    )
+    with section("filter"):
+        filtered = index.recipes_in(
+            index.match(selections, include, within=within)
+        )
+    render_facet_counts(index, selections, include, within=within)
+
+    if query:
+        kept = {r["id"] for r in filtered}
+        for hit in hits:
+            if hit.recipe["id"] in kept:
+                if hit.snippet:
+                    st.caption(hit.snippet)
+                show_recipe(hit.recipe, any(
+                    r["id"] == hit.recipe["id"]
+                    for r in st.session_state.favorites
+                ))
+        return
 
     for recipe in filtered:
         show_recipe(
@@ -170,16 +565,248 @@ def render_browse(recipes: list):
         )
 
 
+def search_recipes(recipes: list, query: str,
+                   k: int = SEARCH_RESULTS) -> list:
+    """Ranked hits over the shared catalog index plus this session's
+    custom recipes, which are indexed incrementally."""
+    shared = [r for r in recipes if r.get("source") != "custom"]
+    custom = [r for r in recipes if r.get("source") == "custom"]
+    search_indexes = [recipe_index("search", shared, build_search_index)]
+    if custom:
+        overlay = sync_index(st.session_state.get("search_custom"), custom,
+                             SearchIndex.build)
+        st.session_state["search_custom"] = overlay
+        search_indexes.append(overlay)
+    with section("search"):
+        return search(search_indexes, query, k, bulk_details)
+
+
+def build_search_index(recipes: list) -> SearchIndex:
+    return SearchIndex.build(recipes, bulk_details)
+
+
+def build_dedup_index(recipes: list) -> DuplicateIndex:
+    # Renamed copies are caught by their instructions, which summaries
+    # leave out.
+    return DuplicateIndex.build(recipes, hydrate=bulk_details)
+
+
+def bulk_details(recipes: list) -> list:
+    # Index builds and result snippets read many recipes once each; the
+    # detail LRU is kept for recipes people open.
+    return details.hydrate_many(recipes, remember=False)
+
+
+def render_meal_plan(recipes: list):
+    st.title("🗓️ Meal Plan")
+
+    planner = recipe_index("planner", recipes, MealPlanner.build)
+    ingredients = planner.matrix.vocabulary
+    labels = recipe_index("facets", recipes,
+                          FacetIndex).labels["ingredients"]
+
+    days = st.slider("Days", 1, 14, 7, key="plan_days")
+    col1, col2 = st.columns(2)
+    with col1:
+        include = st.multiselect("Every recipe uses", ingredients,
+                                 format_func=lambda i: labels.get(i, i),
+                                 key="plan_include")
+        max_per_category = st.number_input(
+            "Max recipes per category", 1, 14, 2, key="plan_category_cap"
+        )
+    with col2:
+        exclude = st.multiselect("Exclude ingredients", ingredients,
+                                 format_func=lambda i: labels.get(i, i),
+                                 key="plan_exclude")
+        max_per_area = st.number_input(
+            "Max recipes per cuisine", 1, 14, 3, key="plan_area_cap"
+        )
+
+    if st.button("🗓️ Plan my week") is True:
+        st.session_state.meal_plan = planner.plan(
+            days, include, exclude, max_per_category, max_per_area,
+            seed=random.getrandbits(32),  # nosec
+        )
+
+    plan = st.session_state.get("meal_plan")
+    if not plan:
+        return
+    if len(plan.recipes) < days:
+        st.warning(f"Only {len(plan.recipes)} recipes fit these constraints")
+    if not plan.recipes:
+        return
+
+    st.markdown("\n".join(
+        f"- **{WEEKDAYS[day % 7]}:** {recipe['name']} "
+        f"({recipe.get('category', 'N/A')}, {recipe.get('area', 'N/A')})"
+        for day, recipe in enumerate(plan.recipes)
+    ))
+    st.caption(
+        f"{plan.ingredients} ingredients to buy, "
+        f"{plan.shared} saved by sharing"
+    )
+    with st.expander("🛒 Shopping list"):
+        render_shopping_list(plan.recipes, "plan")
+
+
+def render_facet_pickers(index: FacetIndex, key: str) -> dict:
+    selections = {}
+    columns = st.columns(2)
+    for column, field in zip(columns, ("category", "area")):
+        with column:
+            selections[field] = st.pills(
+                FACET_TITLES[field],
+                index.values(field),
+                selection_mode="multi",
+                key=f"{key}_{field}",
+            ) or []
+    return selections
+
+
+def render_facet_counts(index: FacetIndex, selections: dict, include=(),
+                        exclude=(), within=None) -> None:
+    # Counts live in captions rather than widget labels: a label change
+    # gives the widget a new identity and would drop its selection.
+    lines = []
+    for field, title in FACET_TITLES.items():
+        mask = index.match(selections, include, exclude, within, skip=field)
+        counts = list(index.counts(field, mask).items())[:FACET_COUNTS]
+        labels = index.labels[field]
+        lines.append(f"**{title}:** " + " · ".join(
+            f"{labels[value]} ({count})" for value, count in counts
+        ))
+    st.caption("  \n".join(lines))
+
+
+def render_memory():
+    st.title("Session Memory")
+    sources = federation.reports + getattr(
+        st.session_state.get("session_sources"), "reports", []
+    )
+    if sources:
+        st.subheader("Recipe sources")
+        st.dataframe([
+            {
+                "Source": report.name,
+                "Status": report.status + (" (stale)" if report.stale
+                                           else ""),
+                "Recipes": report.records,
+                "Seconds": round(report.seconds, 2),
+                "Error": report.error,
+            }
+            for report in sources
+        ], hide_index=True)
+    render_mealdb_stats()
+    reports = ledger.heaviest(MEMORY_TOP)
+    st.caption(
+        f"{len(ledger)} sessions measured · budget "
+        f"{format_bytes(ledger.budget)} per session"
+    )
+    if not reports:
+        st.info("No sessions measured yet")
+        return
+
+    now = ledger.clock()
+    st.dataframe([
+        {
+            "Session": report.session_id[:8],
+            "Total": format_bytes(report.total),
+            "Largest keys": ", ".join(
+                f"{key} {format_bytes(size)}"
+                for key, size in report.largest()
+            ),
+            "Compactions": report.compactions,
+            "Measured": f"{now - report.measured_at:.0f}s ago",
+        }
+        for report in reports
+    ], hide_index=True)
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    current = ctx and ledger.report(ctx.session_id)
+    if current:
+        st.subheader("This session")
+        st.dataframe([
+            {"Key": key, "Size": format_bytes(size)}
+            for key, size in current.largest(len(current.sizes))
+        ], hide_index=True)
+
+
+def render_mealdb_stats() -> None:
+    stats = MealDBClient.stats()
+    st.subheader("MealDB requests")
+    st.dataframe([{
+        "Circuit": stats["circuit"],
+        "Concurrency limit": stats["concurrency_limit"],
+        "In flight": stats["in_flight"],
+        "Executed": stats["executed"],
+        "Coalesced": stats["coalesced"],
+    }], hide_index=True)
+    if stats["transitions"]:
+        st.caption("Circuit transitions")
+        st.dataframe([
+            {"At": datetime.fromtimestamp(at).strftime("%H:%M:%S"),
+             "From": old, "To": new}
+            for at, old, new in reversed(stats["transitions"])
+        ], hide_index=True)
+
+
+def render_profile(result: ProfileResult) -> None:
+    with st.sidebar.expander("⏱️ Profile", expanded=True):
+        st.caption(f"Rerun took {result.elapsed * 1000:.0f} ms")
+        st.dataframe([
+            {"Section": name, "Calls": calls, "ms": seconds * 1000}
+            for name, (calls, seconds) in result.sections.items()
+        ], hide_index=True)
+        if not result.traced:
+            st.caption("Another rerun is being profiled; sections only")
+            return
+        st.markdown("**Top functions**")
+        st.dataframe([
+            {"Function": function, "Calls": calls,
+             "Cumulative ms": cumulative * 1000, "Own ms": own * 1000}
+            for function, calls, cumulative, own in result.functions
+        ], hide_index=True)
+        st.markdown(f"**Allocations** · peak {format_bytes(result.peak)}")
+        st.dataframe([
+            {"Line": line, "Size": format_bytes(size), "Blocks": blocks}
+            for line, size, blocks in result.allocations
+        ], hide_index=True)
+        for path in result.paths:
+            st.caption(f"Saved {path}")
+
+
 def render_favorites():
     st.title("❤️ Favorites")
     if not st.session_state.favorites:
         st.info("No favorite recipes yet!")
         return
 
+    with st.expander("🛒 Shopping list"):
+        render_shopping_list(st.session_state.favorites, "favorites")
+
     for recipe in st.session_state.favorites:
         show_recipe(recipe, is_favorite=True)
 
 
+def render_shopping_list(recipes: list, key: str):
+    items = build_shopping_list(bulk_details(recipes))
+    if not items:
+        st.info("Nothing to buy")
+        return
+
+    text = to_text(items)
+    st.markdown(text)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download as text", text,
+                           file_name="shopping-list.txt", mime="text/plain",
+                           key=f"{key}_shopping_text")
+    with col2:
+        st.download_button("Download as CSV", partial(to_csv, items),
+                           file_name="shopping-list.csv", mime="text/csv",
+                           key=f"{key}_shopping_csv")
+
+
 def render_custom_recipes():
     st.title("📝 Custom Recipes")
 
@@ -191,13 +818,17 @@ def render_custom_recipes():
                                       type=["png", "jpg", "jpeg"])
 
         if st.form_submit_button("Save Recipe"):
+            # Spell ingredients the way the catalog does, so they match
+            # filters, pantry and similar-recipe lookups.
             new_recipe = create_custom_recipe(
-                name, ingredients, instructions, image_file
+                name, ingredients, instructions, image_file,
+                ingredient_lookup(st.session_state.all_meals),
             )
             st.session_state.custom_recipes.append(new_recipe)
             save_custom_recipes(st.session_state.custom_recipes, local_storage)
-            sleep(0.3)
-            st.rerun()
+
+    with st.expander("📦 Import / export"):
+        render_bulk_transfer()
 
     for recipe in st.session_state.custom_recipes:
         show_recipe(
@@ -206,26 +837,103 @@ def render_custom_recipes():
         )
 
 
+def render_bulk_transfer():
+    upload = st.file_uploader(
+        "Import recipes (JSON, NDJSON, CSV, or a zip with images)",
+        type=["json", "ndjson", "jsonl", "csv", "zip"],
+        key="bulk_import",
+    )
+    if upload is not None and st.button("Import recipes") is True:
+        import_upload(upload)
+
+    recipes = st.session_state.custom_recipes
+    if not recipes:
+        return
+    fmt = st.radio("Export format", EXPORT_FORMATS, horizontal=True,
+                   key="export_format")
+    if fmt in EXPORT_FORMATS:
+        # Built when clicked, not on every rerun that shows the button.
+        st.download_button(
+            f"Export {len(recipes)} recipes",
+            partial(export_recipes, list(recipes), fmt),
+            file_name=f"custom-recipes.{fmt}",
+            mime=MIME_TYPES[fmt],
+            key="bulk_export",
+        )
+
+
+def import_upload(upload) -> None:
+    """Import an uploaded file into the custom recipes, skipping any
+    already here or in the catalog, and save them in one write."""
+    bar = st.progress(0.0, text="Importing…")
+
+    def progress(done: int, total: int) -> None:
+        if total:
+            bar.progress(done / total, text=f"Importing… {done / total:.0%}")
+        else:
+            bar.progress(0.0, text=f"Importing… {done} recipes read")
+
+    try:
+        result = import_recipes(
+            upload, format_of(upload.name),
+            existing=st.session_state.custom_recipes
+            + st.session_state.all_meals,
+            lookup=ingredient_lookup(st.session_state.all_meals),
+            progress=progress,
+            size=upload.size,
+        )
+    except ValueError as e:
+        bar.empty()
+        st.error(f"Could not import {upload.name}: {e}")
+        return
+
+    bar.progress(1.0, text="Import finished")
+    if result.recipes:
+        st.session_state.custom_recipes.extend(result.recipes)
+        save_custom_recipes(st.session_state.custom_recipes, local_storage)
+    st.success(f"Imported {len(result.recipes)} recipes, skipped "
+               f"{result.duplicates} duplicates")
+    if result.failed:
+        st.warning(f"{result.failed} records could not be read:\n"
+                   + "\n".join(f"- {error}" for error in result.errors))
+
+
+@fragment
 def show_recipe(recipe: dict, is_favorite=False):
+    # A fragment, so toggling a favorite reruns this card only.
     st.subheader(recipe["name"])
 
     if recipe.get("image_url"):
         st.image(recipe["image_url"])
 
-    st.markdown(f"**Category:** {recipe.get('category', 'N/A')}")
-    st.markdown(f"**Cuisine:** {recipe.get('area', 'N/A')}")
+    version = st.session_state.get("catalog_version")
+    st.markdown(cards.card(recipe, version).facts)
+
+    # Catalog recipes are summaries; measures and instructions are read
+    # from the detail store only once the card is opened.
+    full = recipe
+    if is_summary(recipe) and st.toggle(
+        "📖 Full recipe", key=f"details_{recipe['id']}"
+    ) is True:
+        full = details.hydrate(recipe)
 
+    # One markdown element per section, rendered once per recipe and
+    # catalog version.
+    card = cards.card(full, version)
     with st.expander("Ingredients"):
-        for i, ingredient in enumerate(recipe["ingredients"]):
-            measures = (
-                f": {recipe['measures'][i]}"
-                if "measures" in recipe and recipe["measures"][i] != ""
-                else ""
-            )
-            st.write(f"- {ingredient.capitalize()}{measures}")
+        st.markdown(card.ingredients)
+
+    if card.instructions is not None:
+        with st.expander("Instructions"):
+            st.markdown(card.instructions)
 
-    with st.expander("Instructions"):
-        st.write(recipe.get("instructions", "No instructions provided"))
+    similar = similar_recipes(recipe)
+    if similar:
+        with st.expander("Similar recipes"):
+            st.markdown("\n".join(
+                f"- {r['name']} ({r.get('category', 'N/A')})"
+                for r in similar
+            ))
 
     if not is_favorite:
         current_fav_status = any(
@@ -233,33 +941,60 @@ def show_recipe(recipe: dict, is_favorite=False):
                 "favorites", [])
         )
 
-        btn_key = f"fav_{recipe['id']}_{current_fav_status}"
-
-        if st.button(
+        st.button(
             "❤️ Add to Favorites"
             if not current_fav_status
             else "★ Remove from Favorites",
-            key=btn_key,
-        ):
-            if current_fav_status:
-                st.session_state.favorites = [
-                    r for r in st.session_state.favorites
-                    if r["id"] != recipe["id"]
-                ]
-            else:
-                st.session_state.favorites.append(recipe)
-            st.toast("Favorites updated!", icon="✅")
-            save_favorites(st.session_state.favorites, local_storage)
-            sleep(0.3)
-            st.rerun()
+            key=f"fav_{recipe['id']}",
+            on_click=toggle_favorite,
+            args=(recipe,),
+        )
+
+    if local_storage:
+        local_storage.flush()
+
+
+def toggle_favorite(recipe: dict) -> None:
+    if any(r["id"] == recipe["id"] for r in st.session_state.favorites):
+        st.session_state.favorites = [
+            r for r in st.session_state.favorites
+            if r["id"] != recipe["id"]
+        ]
+    else:
+        st.session_state.favorites.append(recipe)
+    save_favorites(st.session_state.favorites, local_storage)
+    st.toast(
+        f"Favorites updated! {len(st.session_state.favorites)} saved",
+        icon="✅",
+    )
+
+
+def similar_recipes(recipe: dict, k: int = SIMILAR_RESULTS) -> list:
+    """Most similar API and custom recipes to `recipe`."""
+    base = catalog_index("similar", SimilarityIndex.build)
+    custom = sync_index(
+        st.session_state.get("similar_custom"),
+        st.session_state.custom_recipes,
+        SimilarityIndex.build,
+    )
+    st.session_state["similar_custom"] = custom
+
+    hits = base.similar(recipe, k) + custom.similar(recipe, k)
+    hits.sort(key=lambda hit: hit[0], reverse=True)
+    return [r for _, r in hits[:k]]
 
 
 def create_custom_recipe(
-    name: str, ingredients: str, instructions: str, image_file
+    name: str, ingredients: str, instructions: str, image_file,
+    lookup: IngredientLookup | None = None,
 ) -> dict:
     ingredients_list = [i.strip().lower()
                         for i in ingredients.split("\n")
                         if i.strip()]
+    if lookup is not None:
+        ingredients_list = list(dict.fromkeys(
+            lookup.canonical(i) for i in ingredients_list
+        ))
 
     image_data = None
     if image_file:
@@ -1,14 +1,111 @@
-from typing import Dict
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict
+
 import requests
+from requests import RequestException, Response
+
+from src.what_to_cook.governor import RequestGovernor, RequestRejected
+from src.what_to_cook.singleflight import SingleFlight
+
+
+class ResponseCache:
+    """Bounded LRU of the last good JSON payload per URL."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str):
+        with self._lock:
+            if url not in self._data:
+                return None
+            self._data.move_to_end(url)
+            return self._data[url]
+
+    def put(self, url: str, payload) -> None:
+        with self._lock:
+            self._data[url] = payload
+            self._data.move_to_end(url)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+def _is_server_error(response: Response) -> bool:
+    status = response.status_code
+    return isinstance(status, int) and (status >= 500 or status == 429)
 
 
 class MealDBClient:
-    BASE_URL = "https://www.themealdb.com/api/json/v1/1/"
+    BASE_URL = os.environ.get("MEALDB_BASE_URL",
+                              "https://www.themealdb.com/api/json/v1/1/")
+
+    # Shared by every client instance so the limits hold per process.
+    governor = RequestGovernor.from_env()
+    cache = ResponseCache()
+    flights = SingleFlight()
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Governor state plus counts of coalesced duplicate requests."""
+        flights = cls.flights.snapshot()
+        return {
+            **cls.governor.snapshot(),
+            "executed": flights["executed"],
+            "coalesced": flights["coalesced"],
+            # Distinct requests being fetched, each possibly shared.
+            "flights": flights["in_flight"],
+        }
+
+    def _fetch(self, url: str, timeout: int,
+               accept: Callable[[Response], bool]) -> dict | None:
+        response = self.governor.call(
+            lambda: requests.get(url, timeout=timeout),
+            is_failure=_is_server_error,
+        )
+        return response.json() if accept(response) else None
+
+    def _get_json(
+        self,
+        url: str,
+        timeout: int,
+        accept: Callable[[Response], bool] = lambda r: r.ok,
+        use_cache: bool = True,
+    ) -> dict | None:
+        """GET `url` through the governor.
+
+        Falls back to the last good payload for `url` when the call is
+        shed, fails, or comes back unacceptable; None if there is none.
+        """
+        cached = self.cache.get(url) if use_cache else None
+        try:
+            # Cacheable endpoints are idempotent, so concurrent callers for
+            # the same URL can share one request. random.php is not.
+            if use_cache:
+                payload = self.flights.do(
+                    url, lambda: self._fetch(url, timeout, accept)
+                )
+            else:
+                payload = self._fetch(url, timeout, accept)
+        except RequestRejected:
+            return cached
+        except RequestException:
+            if cached is None:
+                raise
+            return cached
+
+        if payload is None:
+            return cached
+        if use_cache:
+            self.cache.put(url, payload)
+        return payload
 
     def fetch_meals_by_first_letter(self, letter: str) -> list:
         url = f"{self.BASE_URL}search.php?f={letter}"
-        response = requests.get(url, timeout=5)
-        return response.json().get("meals", []) if response.ok else []
+        payload = self._get_json(url, timeout=5)
+        return payload.get("meals", []) if payload is not None else []
 
     def fetch_all_meals(self) -> list:
         all_meals = []
@@ -28,18 +125,20 @@ class MealDBClient:
 
     def fetch_random_meal(self) -> dict:
         url = f"{self.BASE_URL}random.php"
-        response = requests.get(url, timeout=5)
-        return response.json().get("meals", [{}])[0] if response.ok else {}
+        payload = self._get_json(url, timeout=5, use_cache=False)
+        if payload is None:
+            return {}
+        return (payload.get("meals") or [{}])[0]
 
     def get_meal_details(self, meal_id: str) -> Dict:
         """Get full details for a meal"""
         try:
-            response = requests.get(
-                f"{self.BASE_URL}lookup.php?i={meal_id}", timeout=10
+            payload = self._get_json(
+                f"{self.BASE_URL}lookup.php?i={meal_id}",
+                timeout=10,
+                accept=lambda r: r.status_code == 200,
             )
-            if response.status_code == 200:
-                return response.json()["meals"][0]
-            return {}
+            return payload["meals"][0] if payload is not None else {}
         except Exception as e:
             print(f"Error fetching details for meal {meal_id}: {str(e)}")
             return {}
@@ -0,0 +1,315 @@
+import base64
+import csv
+import hashlib
+import io
+import json
+import re
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import Callable, Iterator
+
+from PIL import Image
+
+from src.what_to_cook.catalog import normalize_ingredient
+from src.what_to_cook.data_manager import generate_custom_recipe_id
+
+FORMATS = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson",
+           ".csv": "csv", ".zip": "zip"}
+EXPORT_FORMATS = ("json", "ndjson", "csv", "zip")
+MIME_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson",
+              "csv": "text/csv", "zip": "application/zip"}
+CSV_FIELDS = ("name", "category", "area", "ingredients", "measures",
+              "instructions", "image")
+CHUNK_SIZE = 1 << 16
+# Largest CSV field read, enough for a photo as a data URL.
+CSV_FIELD_LIMIT = 64 << 20
+PROGRESS_EVERY = 100
+# Error messages kept per import; the rest are only counted.
+MAX_ERRORS = 10
+
+_LIST_SEPARATOR = re.compile(r"[\n;]")
+
+
+class CountingReader(io.RawIOBase):
+    """Binary stream wrapper that counts the bytes read through it."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.read_bytes = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.stream.read(len(buffer))
+        buffer[:len(data)] = data
+        self.read_bytes += len(data)
+        return len(data)
+
+
+def iter_json_array(text: io.TextIOBase,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """Items of a top-level JSON array, decoded one at a time from
+    `text` so the whole document is never held in memory."""
+    decoder = json.JSONDecoder()
+    buffer, eof = "", False
+
+    def fill() -> bool:
+        nonlocal buffer, eof
+        chunk = text.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        return not eof
+
+    def skip(chars: str) -> str:
+        nonlocal buffer
+        while True:
+            buffer = buffer.lstrip(chars)
+            if buffer or not fill():
+                return buffer[:1]
+
+    if skip(" \t\r\n") != "[":
+        raise ValueError("expected a JSON array of recipes")
+    buffer = buffer[1:]
+    while True:
+        if skip(" \t\r\n,") in ("]", ""):
+            if not buffer:
+                raise ValueError("unterminated JSON array")
+            return
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer)
+                break
+            except json.JSONDecodeError:
+                if not fill():
+                    raise
+        buffer = buffer[end:]
+        yield item
+
+
+def iter_ndjson(text: io.TextIOBase) -> Iterator:
+    """One record per line; a line that does not parse is yielded as its
+    error, so the lines after it still import."""
+    for line in text:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield e
+
+
+def _split(value) -> list:
+    if isinstance(value, list):
+        return [str(v).strip() for v in value]
+    return [v.strip() for v in _LIST_SEPARATOR.split(value or "")]
+
+
+def iter_csv(text: io.TextIOBase) -> Iterator:
+    # Exported photos are data URLs, far over the csv module's default
+    # 128 KB field limit. The limit is process-wide, so only raise it.
+    csv.field_size_limit(max(csv.field_size_limit(), CSV_FIELD_LIMIT))
+    rows = csv.DictReader(text)
+    while True:
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            raise ValueError(f"bad CSV on line {rows.line_num}: {e}") from e
+        yield {key.strip().lower(): value for key, value in row.items()
+               if key}
+
+
+def content_hash(recipe: dict) -> str:
+    """Fingerprint of what makes two recipes the same dish: the name and
+    the set of ingredients, compared case- and spacing-insensitively."""
+    name = " ".join((recipe.get("name") or "").split()).lower()
+    ingredients = sorted({normalize_ingredient(i)
+                          for i in recipe.get("ingredients") or []})
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([name, ingredients]).encode())
+    return digest.hexdigest()
+
+
+def _png_data_url(data: bytes) -> str:
+    buffered = io.BytesIO()
+    Image.open(io.BytesIO(data)).save(buffered, format="PNG")
+    encoded = base64.b64encode(buffered.getvalue()).decode("utf-8")
+    return f"data:image/png;base64,{encoded}"
+
+
+def to_recipe(raw: dict, images: Callable[[str], bytes] | None = None,
+              lookup=None) -> dict:
+    """A custom recipe from one imported record, in the form's format."""
+    if not isinstance(raw, dict):
+        raise ValueError("record is not an object")
+    name = " ".join(str(raw.get("name") or "").split())
+    if not name:
+        raise ValueError("recipe has no name")
+    ingredients = [i.lower() for i in _split(raw.get("ingredients"))]
+    measures = _split(raw.get("measures"))
+    pairs = [(i, measures[n] if n < len(measures) else "")
+             for n, i in enumerate(ingredients) if i]
+    kept: dict = {}
+    for ingredient, measure in pairs:
+        if lookup is not None:
+            ingredient = lookup.canonical(ingredient)
+        kept.setdefault(ingredient, measure)
+
+    image = str(raw.get("image_url") or raw.get("image") or "")
+    if image and not image.startswith(("data:", "http://", "https://")):
+        # A path inside a zip import; anywhere else there is nothing to
+        # read it from.
+        image = _png_data_url(images(image)) if images else ""
+    return {
+        "id": generate_custom_recipe_id(),
+        "name": name,
+        "ingredients": list(kept),
+        "measures": list(kept.values()),
+        "instructions": str(raw.get("instructions") or ""),
+        "image_url": image or None,
+        "source": "custom",
+        "category": raw.get("category") or "Custom",
+        "area": raw.get("area") or "Personal",
+    }
+
+
+@dataclass
+class ImportResult:
+    recipes: list = field(default_factory=list)
+    duplicates: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+
+    def fail(self, number: int, error: Exception) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f"Record {number}: {error}")
+
+
+def _records(stream, fmt: str) -> tuple:
+    """(records, image reader) for a binary `stream` in `fmt`."""
+    if fmt != "zip":
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        parse = {"json": iter_json_array, "ndjson": iter_ndjson,
+                 "csv": iter_csv}[fmt]
+        return parse(text), None
+
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"not a zip file: {e}") from e
+    for name in archive.namelist():
+        inner = format_of(name)
+        if "/" not in name and inner in ("json", "ndjson", "csv"):
+            records, _ = _records(archive.open(name), inner)
+            return records, lambda path: archive.read(path.lstrip("/"))
+    raise ValueError("zip has no recipes .json, .ndjson or .csv file")
+
+
+def import_recipes(stream, fmt: str, existing=(), lookup=None,
+                   progress: Callable[[int, int], None] | None = None,
+                   size: int | None = None) -> ImportResult:
+    """Parse recipes from a binary `stream` in `fmt`, record by record.
+
+    Records matching an `existing` recipe, or an earlier record, by
+    `content_hash` are skipped. Bad records are counted and reported
+    without stopping the import. `progress(done, total)` is called with
+    bytes read so far when `size` is known, else with records read.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unsupported format: {fmt}")
+    seen = {content_hash(r) for r in existing}
+    result = ImportResult()
+    counter = CountingReader(stream)
+    reader = io.BufferedReader(counter) if fmt != "zip" else stream
+    records, images = _records(reader, fmt)
+
+    def report(number: int) -> None:
+        if progress is not None:
+            if size and fmt != "zip":
+                progress(min(counter.read_bytes, size), size)
+            else:
+                progress(number, 0)
+
+    number = 0
+    for number, raw in enumerate(records, 1):
+        if number % PROGRESS_EVERY == 0:
+            report(number)
+        if isinstance(raw, Exception):
+            result.fail(number, raw)
+            continue
+        try:
+            recipe = to_recipe(raw, images, lookup)
+        except (ValueError, KeyError, OSError) as e:
+            result.fail(number, e)
+            continue
+        key = content_hash(recipe)
+        if key in seen:
+            result.duplicates += 1
+        else:
+            seen.add(key)
+            result.recipes.append(recipe)
+    report(number)
+    return result
+
+
+def _exported(recipe: dict) -> dict:
+    return {key: recipe.get(key) for key in
+            ("name", "category", "area", "ingredients", "measures",
+             "instructions", "image_url")}
+
+
+def iter_export(recipes: list, fmt: str) -> Iterator:
+    """Text chunks of `recipes` exported as json, ndjson or csv."""
+    if fmt == "json":
+        yield "["
+        for n, recipe in enumerate(recipes):
+            yield ("," if n else "") + "\n" + json.dumps(_exported(recipe))
+        yield "\n]\n"
+    elif fmt == "ndjson":
+        for recipe in recipes:
+            yield json.dumps(_exported(recipe)) + "\n"
+    elif fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_FIELDS)
+        for recipe in recipes:
+            writer.writerow([
+                recipe.get("name"), recipe.get("category"),
+                recipe.get("area"),
+                "\n".join(recipe.get("ingredients") or []),
+                "\n".join(recipe.get("measures") or []),
+                recipe.get("instructions"), recipe.get("image_url") or "",
+            ])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    else:
+        raise ValueError(f"unsupported format: {fmt}")
+
+
+def export_recipes(recipes: list, fmt: str) -> bytes:
+    """`recipes` as a downloadable file. A zip holds recipes.ndjson plus
+    one PNG per uploaded photo, referenced by relative path."""
+    if fmt != "zip":
+        return "".join(iter_export(recipes, fmt)).encode()
+
+    buffer = io.BytesIO()
+    lines = []
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for n, recipe in enumerate(recipes):
+            image = recipe.get("image_url") or ""
+            if image.startswith("data:"):
+                path = f"images/{n:05d}.png"
+                archive.writestr(path,
+                                 base64.b64decode(image.split(",", 1)[1]))
+                recipe = {**recipe, "image_url": path}
+            lines.extend(iter_export([recipe], "ndjson"))
+        archive.writestr("recipes.ndjson", "".join(lines))
+    return buffer.getvalue()
+
+
+def format_of(filename: str) -> str | None:
+    return FORMATS.get(PurePosixPath(filename).suffix.lower())
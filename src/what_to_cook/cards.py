@@ -0,0 +1,67 @@
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from src.what_to_cook.catalog import is_summary
+
+CARD_CACHE = 1024
+
+
+class RecipeCard(NamedTuple):
+    """Markdown for each section of a recipe card, one element apiece."""
+    facts: str
+    ingredients: str
+    instructions: str | None
+
+
+def render_card(recipe: dict) -> RecipeCard:
+    facts = (f"**Category:** {recipe.get('category', 'N/A')}  \n"
+             f"**Cuisine:** {recipe.get('area', 'N/A')}")
+    measures = recipe.get("measures") or []
+    lines = []
+    for i, ingredient in enumerate(recipe.get("ingredients") or []):
+        measure = measures[i] if i < len(measures) else ""
+        lines.append(f"- {ingredient.capitalize()}"
+                     + (f": {measure}" if measure != "" else ""))
+    instructions = None
+    if not is_summary(recipe):
+        instructions = recipe.get("instructions",
+                                  "No instructions provided")
+    return RecipeCard(facts, "\n".join(lines), instructions)
+
+
+class CardCache:
+    """Process-wide LRU of rendered recipe cards.
+
+    Cards are keyed by recipe id and the catalog version they were
+    rendered under, plus whether the recipe was a summary, so a rerun
+    re-emits cached markdown instead of rebuilding every line.
+    """
+
+    def __init__(self, maxsize: int = CARD_CACHE):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def card(self, recipe: dict, version) -> RecipeCard:
+        key = (str(recipe["id"]), version, is_summary(recipe))
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+        card = render_card(recipe)
+        with self._lock:
+            self._data[key] = card
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return card
+
+
+cards = CardCache()
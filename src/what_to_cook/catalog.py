@@ -0,0 +1,117 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+# Fields only a recipe card needs. Everything else (name, category,
+# ingredient names, thumbnail) is the summary that lists, filters and
+# indexes work from.
+DETAIL_FIELDS = ("instructions", "measures", "quantities")
+
+
+def normalize_ingredient(name: str) -> str:
+    """Key used to compare ingredients across API and custom recipes."""
+    return " ".join(name.split()).lower()
+
+
+def summarize(recipe: dict) -> dict:
+    """`recipe` without its detail fields, marked as a summary. Records
+    that have no details to leave out are returned as they are."""
+    if not detail_of(recipe):
+        return recipe
+    summary = {k: v for k, v in recipe.items() if k not in DETAIL_FIELDS}
+    summary["summary"] = True
+    return summary
+
+
+def detail_of(recipe: dict) -> dict:
+    return {k: recipe[k] for k in DETAIL_FIELDS if k in recipe}
+
+
+def is_summary(recipe: dict) -> bool:
+    return recipe.get("summary") is True
+
+
+def with_details(summary: dict, details: dict) -> dict:
+    recipe = {k: v for k, v in summary.items() if k != "summary"}
+    recipe.update(details)
+    return recipe
+
+
+def catalog_version(recipes: list) -> str:
+    """Fingerprint of a recipe list's content, used to key derived
+    indexes. Recipes edited under the same id change it."""
+    digest = hashlib.blake2b(digest_size=8)
+    for recipe in recipes:
+        digest.update(json.dumps(recipe, sort_keys=True,
+                                 default=str).encode())
+        digest.update(b"\0")
+    return f"{len(recipes)}-{digest.hexdigest()}"
+
+
+class IndexCache:
+    """LRU of indexes built from a recipe list.
+
+    Indexes are keyed by kind and catalog version, so every session
+    looking at the same catalog shares one copy and a new catalog
+    version is built exactly once.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, kind: str, recipes: list, build: Callable[[list], T],
+            version=None) -> T:
+        """`build(recipes)`, cached under `version`, or under the
+        recipes' `catalog_version` when it is not given."""
+        if version is None:
+            version = catalog_version(recipes)
+        return self.lookup((kind, version), lambda: build(recipes))
+
+    def values(self) -> list:
+        with self._lock:
+            return list(self._data.values())
+
+    def lookup(self, key: tuple, build: Callable[[], T]) -> T:
+        """Cached value for any hashable `key`, built on a miss."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+
+        index = build()
+        with self._lock:
+            self._data[key] = index
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+indexes = IndexCache()
+
+
+def sync_index(index, recipes: list, build: Callable[[list], T]) -> T:
+    """Bring an incrementally maintained index up to date with `recipes`.
+
+    New recipes are added in place; if any indexed recipe has gone, the
+    index is rebuilt from scratch.
+    """
+    ids = {recipe["id"] for recipe in recipes}
+    if index is None or any(i not in ids for i in index.ids):
+        return build(recipes)
+    for recipe in recipes:
+        if recipe["id"] not in index:
+            index.add(recipe)
+    return index
@@ -0,0 +1,183 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.what_to_cook.catalog import detail_of, summarize
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+DEFAULT_DATA_DIR = Path.home() / ".cache" / "cooktoday"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS recipes (
+    version INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (version, position)
+);
+CREATE TABLE IF NOT EXISTS details (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+# Under SQLite's default limit on bound parameters.
+DETAIL_BATCH = 500
+
+
+class CatalogStore:
+    """Recipe catalog shared by every server process on this machine.
+
+    The catalog lives in one SQLite file. A refresh writes a complete new
+    version and moves the `version` pointer in the same transaction, so
+    readers see either the old catalog or the new one, never a mix.
+    Checking for a new version is a single-row lookup; the recipes of the
+    latest version are parsed once per process and shared by its sessions.
+
+    Versions hold summary records only. Instructions and measures sit in
+    a separate table keyed by recipe id and are read a few at a time,
+    when a recipe is actually shown.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._loaded: tuple = (None, [])
+        with self._connection() as db:
+            db.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def head(self) -> tuple:
+        """Current (version, published_at), or (None, None) if empty."""
+        rows = dict(self._connection().execute(
+            "SELECT key, value FROM meta "
+            "WHERE key IN ('version', 'published_at')"
+        ))
+        if "version" not in rows:
+            return None, None
+        return int(rows["version"]), float(rows["published_at"])
+
+    def load(self, version: int) -> list:
+        with self._lock:
+            if self._loaded[0] == version:
+                return self._loaded[1]
+        rows = self._connection().execute(
+            "SELECT data FROM recipes WHERE version = ? ORDER BY position",
+            (version,),
+        )
+        recipes = [json.loads(data) for (data,) in rows]
+        with self._lock:
+            if self._loaded[0] is None or version > self._loaded[0]:
+                self._loaded = (version, recipes)
+        return recipes
+
+    def publish(self, recipes: list) -> int:
+        """Store `recipes` as the next version and make it current."""
+        with self._connection() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                "SELECT value FROM meta WHERE key = 'version'"
+            ).fetchone()
+            version = int(row[0]) + 1 if row else 1
+            db.executemany(
+                "INSERT INTO recipes (version, position, id, data) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (version, i, str(r["id"]), json.dumps(summarize(r)))
+                    for i, r in enumerate(recipes)
+                ),
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO details (id, data) VALUES (?, ?)",
+                (
+                    (str(r["id"]), json.dumps(detail_of(r)))
+                    for r in recipes if detail_of(r)
+                ),
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("version", str(version)),
+                 ("published_at", str(time.time()))],
+            )
+            db.execute("DELETE FROM recipes WHERE version < ?", (version,))
+            db.execute(
+                "DELETE FROM details WHERE id NOT IN "
+                "(SELECT id FROM recipes WHERE version = ?)",
+                (version,),
+            )
+        return version
+
+    def details(self, ids: list) -> dict:
+        """Detail fields of the recipes in `ids` that have them, by id."""
+        found = {}
+        ids = [str(i) for i in ids]
+        for start in range(0, len(ids), DETAIL_BATCH):
+            batch = ids[start:start + DETAIL_BATCH]
+            rows = self._connection().execute(
+                "SELECT id, data FROM details WHERE id IN "
+                f"({', '.join('?' * len(batch))})",  # nosec
+                batch,
+            )
+            found.update((i, json.loads(data)) for i, data in rows)
+        return found
+
+    @contextmanager
+    def refresh_lock(self, wait: float = 0.0):
+        """Elect one refresher across processes.
+
+        Yields True to the process holding the lock, False to everyone
+        else once `wait` seconds have passed. Without fcntl every process
+        is its own refresher.
+        """
+        if fcntl is None:
+            yield True
+            return
+        with open(self.path.with_suffix(".lock"), "w") as handle:
+            deadline = time.monotonic() + wait
+            while True:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        yield False
+                        return
+                    time.sleep(0.2)
+            try:
+                yield True
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+_stores: dict = {}
+_stores_lock = threading.Lock()
+
+
+def shared_store() -> CatalogStore:
+    """The store under $COOKTODAY_DATA_DIR, one instance per process."""
+    path = Path(os.environ.get("COOKTODAY_DATA_DIR", DEFAULT_DATA_DIR))
+    path = path / "catalog.sqlite3"
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = CatalogStore(path)
+        return _stores[path]
@@ -1,6 +1,7 @@
 import json
 from uuid import uuid4
 from src.what_to_cook.api_client import MealDBClient
+from src.what_to_cook.measures import parse_measure
 
 
 def _safe_json_loads(data: str) -> list:
@@ -40,8 +41,15 @@ def process_meal(raw_meal: dict) -> dict | None:
         return None
 
     client = MealDBClient()
-    details = client.get_meal_details(raw_meal["idMeal"])
+    # The search payload carries the same fields, so it stands in for the
+    # lookup when MealDB is unavailable and the client has nothing cached.
+    details = client.get_meal_details(raw_meal["idMeal"]) or raw_meal
+    return convert_meal(details)
 
+
+def convert_meal(details: dict) -> dict:
+    """Our format for a full meal payload, as lookup.php and random.php
+    return it."""
     ingredients = []
     measures = []
     for i in range(1, 21):
@@ -61,6 +69,7 @@ def process_meal(raw_meal: dict) -> dict | None:
         "area": details.get("strArea", "Unknown"),
         "ingredients": ingredients,
         "measures": measures,
+        "quantities": [parse_measure(m) for m in measures],
         "instructions": (details.get(
             "strInstructions",
             "No instructions available")),
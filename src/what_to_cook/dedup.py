@@ -0,0 +1,193 @@
+import zlib
+from typing import NamedTuple
+
+import numpy as np
+
+from src.what_to_cook.search import BUILD_BATCH, tokenize
+from src.what_to_cook.similar import MinHash, jaccard
+
+SHINGLE_WORDS = 5
+# Recent entries compared per LSH bucket, so a bucket of very common
+# signatures cannot make ingest quadratic.
+BUCKET_LIMIT = 32
+# Two recipes are the same dish when their names and ingredient sets
+# overlap this much, or their instructions nearly match and their
+# ingredients mostly do.
+NAME_MATCH = 0.5
+INGREDIENT_MATCH = 0.7
+TEXT_MATCH = 0.8
+TEXT_INGREDIENT_MATCH = 0.5
+
+_minhash = MinHash(num_perm=32, bands=8, seed=11)
+
+
+class Fingerprint(NamedTuple):
+    name: frozenset
+    ingredients: frozenset
+    # MinHash of 5-word instruction shingles; None without instructions.
+    text: np.ndarray | None
+    # LSH buckets the recipe belongs to.
+    keys: tuple
+
+
+def fingerprint(recipe: dict) -> Fingerprint:
+    ingredients = frozenset(
+        " ".join(tokenize(i)) for i in recipe.get("ingredients") or []
+    ) - {""}
+    words = tokenize(recipe.get("instructions") or "")
+    shingles = {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode())
+        for i in range(max(len(words) - SHINGLE_WORDS + 1, 0))
+    }
+    name = frozenset(tokenize(recipe.get("name") or ""))
+    text = _minhash.signature(list(shingles)) if shingles else None
+    keys = []
+    if name:
+        keys.append(("name", " ".join(sorted(name))))
+    if ingredients:
+        signature = _minhash.signature(list(ingredients))
+        keys.extend(("ingredients", *key)
+                    for key in _minhash.band_keys(signature))
+    if text is not None:
+        keys.extend(("text", *key) for key in _minhash.band_keys(text))
+    return Fingerprint(name, ingredients, text, tuple(keys))
+
+
+def is_duplicate(a: Fingerprint, b: Fingerprint) -> bool:
+    ingredients = jaccard(a.ingredients, b.ingredients)
+    if ingredients >= INGREDIENT_MATCH and \
+            jaccard(a.name, b.name) >= NAME_MATCH:
+        return True
+    if a.text is None or b.text is None:
+        return False
+    return ingredients >= TEXT_INGREDIENT_MATCH and \
+        float(np.mean(a.text == b.text)) >= TEXT_MATCH
+
+
+def _completeness(recipe: dict) -> tuple:
+    return (bool(recipe.get("image_url")),
+            len(recipe.get("ingredients") or []),
+            len(recipe.get("instructions") or ""))
+
+
+class DuplicateIndex:
+    """Clusters near-duplicate recipes as they are added.
+
+    Candidates come from LSH buckets keyed on the normalized name, bands
+    of an ingredient-set MinHash and bands of an instruction-shingle
+    MinHash, so each recipe is only compared with the few that share a
+    bucket and ingest stays linear in the catalog. Matches are merged with
+    union-find; each cluster shows its most complete record.
+
+    With a `parent` index, recipes matching one of its records are hidden
+    in favour of that record, which stays where it is.
+    """
+
+    def __init__(self, parent: "DuplicateIndex | None" = None):
+        self.parent = parent
+        self.recipes: list = []
+        self._position: dict = {}
+        self._prints: list = []
+        self._complete: list = []
+        self._roots: list = []
+        self._best: dict = {}
+        self._buckets: dict = {}
+        # Positions hidden behind a parent record, with its id.
+        self._matched: dict = {}
+
+    @classmethod
+    def build(cls, recipes: list, parent: "DuplicateIndex | None" = None,
+              hydrate=None) -> "DuplicateIndex":
+        """Index `recipes`. `hydrate` supplies the full text of summary
+        records, a batch at a time; the index keeps the summaries."""
+        index = cls(parent)
+        for start in range(0, len(recipes), BUILD_BATCH):
+            batch = recipes[start:start + BUILD_BATCH]
+            full = hydrate(batch) if hydrate else batch
+            for recipe, text in zip(batch, full):
+                index.add(recipe, text)
+        return index
+
+    @property
+    def ids(self):
+        return self._position.keys()
+
+    def __contains__(self, recipe_id) -> bool:
+        return recipe_id in self._position
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def _find(self, position: int) -> int:
+        root = position
+        while self._roots[root] != root:
+            root = self._roots[root]
+        while self._roots[position] != root:
+            self._roots[position], position = root, self._roots[position]
+        return root
+
+    def _union(self, a: int, b: int) -> None:
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        best = max(self._best.pop(a), self._best.pop(b),
+                   key=lambda p: (self._complete[p], -p))
+        self._roots[b] = a
+        self._best[a] = best
+
+    def _candidates(self, print_: Fingerprint) -> set:
+        found = set()
+        for key in print_.keys:
+            found.update(self._buckets.get(key, ())[-BUCKET_LIMIT:])
+        return found
+
+    def match(self, recipe: dict, print_: Fingerprint | None = None):
+        """The shown record `recipe` duplicates, or None."""
+        print_ = print_ or fingerprint(recipe)
+        if self.parent is not None:
+            found = self.parent.match(recipe, print_)
+            if found is not None:
+                return found
+        for candidate in sorted(self._candidates(print_)):
+            if self.recipes[candidate]["id"] != recipe["id"] and \
+                    is_duplicate(print_, self._prints[candidate]):
+                return self.recipes[self._best[self._find(candidate)]]
+        return None
+
+    def add(self, recipe: dict, text: dict | None = None) -> None:
+        """Index `recipe`, fingerprinting `text` (its full record) when
+        it is a summary."""
+        if recipe["id"] in self._position:
+            return
+        text = text or recipe
+        print_ = fingerprint(text)
+        position = len(self.recipes)
+        self._position[recipe["id"]] = position
+        self.recipes.append(recipe)
+        self._prints.append(print_)
+        self._complete.append(_completeness(text))
+        self._roots.append(position)
+        self._best[position] = position
+
+        if self.parent is not None:
+            shown = self.parent.match(recipe, print_)
+            if shown is not None:
+                self._matched[position] = shown["id"]
+        for candidate in self._candidates(print_):
+            if is_duplicate(print_, self._prints[candidate]):
+                self._union(candidate, position)
+        for key in print_.keys:
+            self._buckets.setdefault(key, []).append(position)
+
+    def hidden(self) -> set:
+        """Ids of recipes that duplicate a record shown instead."""
+        behind_parent = {self._find(p) for p in self._matched}
+        shown = {best for root, best in self._best.items()
+                 if root not in behind_parent}
+        return {r["id"] for p, r in enumerate(self.recipes)
+                if p not in shown}
+
+    def unique(self) -> list:
+        """Recipes in their original order, without hidden duplicates."""
+        hidden = self.hidden()
+        return [r for r in self.recipes if r["id"] not in hidden]
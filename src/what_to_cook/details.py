@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from src.what_to_cook.api_client import MealDBClient
+from src.what_to_cook.catalog import detail_of, is_summary, with_details
+from src.what_to_cook.catalog_store import shared_store
+from src.what_to_cook.data_manager import convert_meal
+
+DETAIL_CACHE = 256
+
+
+def load_details(ids: list, remote: bool = True) -> dict:
+    """Details from the local store. With `remote`, MealDB recipes it
+    does not have (a catalog kept only in browser storage) are looked up
+    one by one, so only recipes someone opens should ask for that."""
+    found = shared_store().details(ids)
+    if not remote:
+        return found
+    client = MealDBClient()
+    for recipe_id in ids:
+        # Local and custom recipes have no MealDB record to fall back on.
+        if str(recipe_id) in found or not str(recipe_id).isdigit():
+            continue
+        raw = client.get_meal_details(recipe_id)
+        if raw:
+            found[str(recipe_id)] = detail_of(convert_meal(raw))
+    return found
+
+
+class DetailCache:
+    """Process-wide LRU of recently viewed recipe details.
+
+    Catalog recipes are held as summaries; `hydrate` merges their details
+    back in, reading only the ones not cached in a single batch.
+    """
+
+    def __init__(self, load: Callable[..., dict] = load_details,
+                 maxsize: int = DETAIL_CACHE):
+        self.maxsize = maxsize
+        self._load = load
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def adopt(self, version) -> None:
+        """Drop cached details when the catalog moves to a new version."""
+        with self._lock:
+            if version != self.version:
+                self._data.clear()
+                self.version = version
+
+    def hydrate(self, recipe: dict) -> dict:
+        return self.hydrate_many([recipe])[0]
+
+    def hydrate_many(self, recipes: list, remember: bool = True) -> list:
+        """Full copies of `recipes`; summaries get their details merged
+        in. With `remember` off, bulk readers such as index builds leave
+        the LRU to what people actually viewed and read the local store
+        only, never MealDB."""
+        found = {}
+        with self._lock:
+            for recipe in recipes:
+                key = str(recipe["id"])
+                if is_summary(recipe) and key in self._data:
+                    self._data.move_to_end(key)
+                    found[key] = self._data[key]
+        missing = list(dict.fromkeys(
+            str(r["id"]) for r in recipes
+            if is_summary(r) and str(r["id"]) not in found
+        ))
+        if missing:
+            loaded = self._load(missing, remote=remember)
+            found.update(loaded)
+            if remember:
+                with self._lock:
+                    for key, detail in loaded.items():
+                        self._data[key] = detail
+                        self._data.move_to_end(key)
+                    while len(self._data) > self.maxsize:
+                        self._data.popitem(last=False)
+        return [
+            with_details(recipe, found.get(str(recipe["id"]), {}))
+            if is_summary(recipe) else recipe
+            for recipe in recipes
+        ]
+
+
+details = DetailCache()
@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from src.what_to_cook.api_client import MealDBClient
+from src.what_to_cook.data_manager import convert_meal
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = 8
+LOW_WATER = 3
+# Recently served meals that are not buffered again.
+HISTORY = 50
+# Pause after a failed or repeated fetch, doubling up to the maximum.
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 30.0
+
+
+def fetch_random_recipe() -> dict | None:
+    raw = MealDBClient().fetch_random_meal()
+    return convert_meal(raw) if raw.get("idMeal") else None
+
+
+class RandomMealBuffer:
+    """Ring buffer of random MealDB recipes, filled ahead of demand.
+
+    A background thread tops the buffer up to `size` whenever it drops
+    below `low_water`, skipping meals already buffered or served
+    recently, so taking one never waits on MealDB once the buffer is
+    warm. Fetches go through the client's governor like any other
+    request; failures and repeats back off.
+
+    While a caller waits because every buffered meal is one it has seen,
+    the thread keeps fetching past `size`, up to twice that; only then
+    does a new meal push out the oldest one.
+    """
+
+    def __init__(self, fetch: Callable[[], dict | None] = fetch_random_recipe,
+                 size: int = BUFFER_SIZE, low_water: int = LOW_WATER,
+                 history: int = HISTORY, retry_delay: float = RETRY_DELAY,
+                 max_retry_delay: float = MAX_RETRY_DELAY):
+        self.size = size
+        self.low_water = low_water
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._fetch = fetch
+        self._ready: deque = deque(maxlen=2 * size)
+        self._served: deque = deque(maxlen=history)
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        # A caller found no meal it has not seen since the last fetch.
+        self._hungry = False
+        self.fetched = 0
+        self.duplicates = 0
+        self.failures = 0
+
+    def __len__(self) -> int:
+        with self._changed:
+            return len(self._ready)
+
+    def start(self) -> None:
+        with self._changed:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="random-meals", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def take(self, exclude=(), timeout: float = 0.0) -> dict | None:
+        """The next buffered recipe whose id is not in `exclude`, waiting
+        up to `timeout` for one; None if there is none.
+
+        Buffered recipes this caller has already seen are left for other
+        callers; waiting makes the buffer fetch more.
+        """
+        self.start()
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                for recipe in self._ready:
+                    if recipe["id"] not in exclude:
+                        self._ready.remove(recipe)
+                        self._served.append(recipe["id"])
+                        self._changed.notify_all()
+                        return recipe
+                # Fetch past `size` until there is one it has not seen.
+                self._hungry = True
+                self._changed.notify_all()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    return None
+                self._changed.wait(remaining)
+
+    def _run(self) -> None:
+        delay = self.retry_delay
+        while not self._stop.is_set():
+            with self._changed:
+                while len(self._ready) >= self.low_water and \
+                        not self._hungry and not self._stop.is_set():
+                    self._changed.wait()
+            while self._wanted() and not self._stop.is_set():
+                if self._fill_one():
+                    delay = self.retry_delay
+                else:
+                    self._stop.wait(delay)
+                    delay = min(delay * 2, self.max_retry_delay)
+
+    def _wanted(self) -> bool:
+        with self._changed:
+            return len(self._ready) < self.size or self._hungry
+
+    def _fill_one(self) -> bool:
+        try:
+            recipe = self._fetch()
+        except Exception as e:
+            logger.warning("Random meal fetch failed: %s", e)
+            recipe = None
+        with self._changed:
+            if recipe is None:
+                self.failures += 1
+                return False
+            if recipe["id"] in self._served or any(
+                r["id"] == recipe["id"] for r in self._ready
+            ):
+                self.duplicates += 1
+                return False
+            self._ready.append(recipe)
+            self._hungry = False
+            self.fetched += 1
+            self._changed.notify_all()
+            return True
+
+
+random_meals = RandomMealBuffer()
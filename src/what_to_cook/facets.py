@@ -0,0 +1,123 @@
+import numpy as np
+
+from src.what_to_cook.catalog import normalize_ingredient
+
+FACET_FIELDS = ("category", "area", "ingredients")
+
+
+def _facet_values(recipe: dict, field: str) -> dict:
+    """Map facet key -> display label for one recipe."""
+    if field == "ingredients":
+        return {normalize_ingredient(i): i for i in recipe["ingredients"]}
+    value = recipe.get(field) or "Unknown"
+    return {value: value}
+
+
+class FacetIndex:
+    """Posting lists per category, cuisine and ingredient.
+
+    Every facet value owns a bitset over recipe positions, packed eight
+    per byte. A result set is a bitset of the same shape, so narrowing it
+    is a handful of ANDs and the counts for every value of a facet are one
+    AND plus a popcount over that facet's matrix.
+    """
+
+    def __init__(self, recipes: list):
+        self.recipes = recipes
+        self.labels: dict = {}
+        self._rows: dict = {}
+        self._postings: dict = {}
+        width = (len(recipes) + 7) // 8
+
+        for field in FACET_FIELDS:
+            labels: dict = {}
+            rows, positions = [], []
+            per_recipe = [_facet_values(r, field) for r in recipes]
+            for values in per_recipe:
+                for key, label in values.items():
+                    labels.setdefault(key, label)
+            keys = sorted(labels, key=str.lower)
+            row_of = {key: row for row, key in enumerate(keys)}
+            for position, values in enumerate(per_recipe):
+                for key in values:
+                    rows.append(row_of[key])
+                    positions.append(position)
+
+            postings = np.zeros((len(keys), width), dtype=np.uint8)
+            positions = np.asarray(positions, dtype=np.int64)
+            np.bitwise_or.at(
+                postings,
+                (np.asarray(rows, dtype=np.int64), positions >> 3),
+                (0x80 >> (positions & 7)).astype(np.uint8),
+            )
+            self.labels[field] = {key: labels[key] for key in keys}
+            self._rows[field] = row_of
+            self._postings[field] = postings
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def values(self, field: str) -> list:
+        return list(self.labels[field])
+
+    def everything(self) -> np.ndarray:
+        return np.packbits(np.ones(len(self.recipes), dtype=bool))
+
+    def from_positions(self, positions) -> np.ndarray:
+        dense = np.zeros(len(self.recipes), dtype=bool)
+        dense[list(positions)] = True
+        return np.packbits(dense)
+
+    def _key(self, field: str, value: str) -> str:
+        return normalize_ingredient(value) if field == "ingredients" else value
+
+    def _row(self, field: str, value: str) -> np.ndarray | None:
+        row = self._rows[field].get(self._key(field, value))
+        return None if row is None else self._postings[field][row]
+
+    def any_of(self, field: str, values) -> np.ndarray:
+        mask = np.zeros(self._postings[field].shape[1], dtype=np.uint8)
+        for value in values:
+            row = self._row(field, value)
+            if row is not None:
+                mask |= row
+        return mask
+
+    def match(self, selections: dict, include=(), exclude=(),
+              within: np.ndarray | None = None,
+              skip: str | None = None) -> np.ndarray:
+        """Bitset of recipes passing every facet selection.
+
+        Values selected within one facet are OR-ed, facets are AND-ed.
+        `include` ingredients must all be present and `exclude` ones
+        absent. The facet named by `skip` is ignored, which gives the
+        result set to count that facet's own values against.
+        """
+        mask = self.everything() if within is None else within.copy()
+        for field, values in selections.items():
+            values = list(values)
+            if field != skip and values:
+                mask &= self.any_of(field, values)
+        for name in include:
+            row = self._row("ingredients", name)
+            if row is None:
+                mask[:] = 0
+            else:
+                mask &= row
+        exclude = list(exclude)
+        if exclude:
+            mask &= ~self.any_of("ingredients", exclude)
+        return mask
+
+    def counts(self, field: str, mask: np.ndarray) -> dict:
+        """Non-zero counts per value of `field` in `mask`, largest first."""
+        totals = np.bitwise_count(self._postings[field] & mask).sum(
+            axis=1, dtype=np.int64
+        )
+        keys = self.values(field)
+        order = np.argsort(-totals, kind="stable")
+        return {keys[i]: int(totals[i]) for i in order if totals[i]}
+
+    def recipes_in(self, mask: np.ndarray) -> list:
+        positions = np.flatnonzero(np.unpackbits(mask, count=len(self)))
+        return [self.recipes[i] for i in positions]
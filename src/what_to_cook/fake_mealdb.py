@@ -0,0 +1,148 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = "/api/json/v1/1/"
+
+ADJECTIVES = ["Smoky", "Spicy", "Creamy", "Crispy", "Slow-cooked", "Zesty",
+              "Honey", "Garlic", "Lemon", "Herbed", "Rustic", "Sticky"]
+PROTEINS = ["Chicken", "Beef", "Lamb", "Pork", "Salmon", "Prawn", "Tofu",
+            "Chickpea", "Lentil", "Mushroom", "Duck", "Cod"]
+DISHES = ["Curry", "Stew", "Pie", "Tacos", "Risotto", "Salad", "Soup",
+          "Bake", "Stir-fry", "Skewers", "Noodles", "Burger"]
+CATEGORIES = ["Beef", "Chicken", "Dessert", "Lamb", "Pasta", "Pork",
+              "Seafood", "Side", "Starter", "Vegan", "Vegetarian"]
+AREAS = ["British", "Chinese", "French", "Greek", "Indian", "Italian",
+         "Japanese", "Mexican", "Moroccan", "Thai", "Turkish"]
+INGREDIENTS = [
+    "Olive Oil", "Onion", "Garlic", "Ginger", "Salt", "Black Pepper",
+    "Butter", "Flour", "Eggs", "Milk", "Sugar", "Tomatoes", "Potatoes",
+    "Carrots", "Celery", "Rice", "Spaghetti", "Chicken Stock", "Cumin",
+    "Paprika", "Chilli", "Coriander", "Parsley", "Basil", "Thyme",
+    "Lemon", "Lime", "Soy Sauce", "Honey", "Cream", "Cheddar Cheese",
+    "Parmesan", "Spinach", "Peas", "Mushrooms", "Bell Pepper",
+    "Coconut Milk", "Cinnamon", "Turmeric", "Red Wine", "Vinegar",
+    "Breadcrumbs", "Yogurt", "Chickpeas", "Lentils", "Bay Leaf",
+]
+MEASURES = ["1 tbsp", "2 tbsp", "1 tsp", "½ tsp", "100g", "250g", "1 cup",
+            "2 cups", "1 clove", "3 cloves", "pinch", "to taste", "1 large",
+            "400ml", ""]
+
+
+def synthetic_meals(count: int, seed: int = 0) -> list:
+    """`count` MealDB-shaped meals with plausible names and ingredients."""
+    rng = random.Random(seed)
+    meals = []
+    for i in range(count):
+        name = " ".join(rng.choice(words)
+                        for words in (ADJECTIVES, PROTEINS, DISHES))
+        meal = {
+            "idMeal": str(90000 + i),
+            "strMeal": f"{name} {i}",
+            "strCategory": rng.choice(CATEGORIES),
+            "strArea": rng.choice(AREAS),
+            "strInstructions": " ".join(
+                f"Step {step}: {rng.choice(DISHES).lower()} the "
+                f"{rng.choice(INGREDIENTS).lower()} gently."
+                for step in range(1, rng.randint(4, 12))
+            ),
+            "strMealThumb": f"http://localhost/images/{90000 + i}.jpg",
+        }
+        picked = rng.sample(INGREDIENTS, rng.randint(4, 20))
+        for slot in range(1, 21):
+            has = slot <= len(picked)
+            meal[f"strIngredient{slot}"] = picked[slot - 1] if has else ""
+            meal[f"strMeasure{slot}"] = rng.choice(MEASURES) if has else ""
+        meals.append(meal)
+    return meals
+
+
+class FakeMealDB:
+    """Local stand-in for TheMealDB's search, lookup and random endpoints.
+
+    Serves `meals` over HTTP on localhost, optionally sleeping `latency`
+    seconds per request, and counts the requests each endpoint received.
+    Point the app at it with MEALDB_BASE_URL=<base_url>.
+    """
+
+    def __init__(self, meals: list, latency: float = 0.0, port: int = 0):
+        self.meals = meals
+        self.latency = latency
+        self.requests: Counter = Counter()
+        self._by_id = {m["idMeal"]: m for m in meals}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port),
+                                           self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def respond(self, endpoint: str, query: dict) -> dict:
+        with self._lock:
+            self.requests[endpoint] += 1
+        if endpoint == "search.php" and "f" in query:
+            letter = query["f"][0].lower()
+            meals = [m for m in self.meals
+                     if m["strMeal"].lower().startswith(letter)]
+        elif endpoint == "search.php":
+            needle = query.get("s", [""])[0].lower()
+            meals = [m for m in self.meals
+                     if needle in m["strMeal"].lower()]
+        elif endpoint == "lookup.php":
+            meal = self._by_id.get(query.get("i", [""])[0])
+            meals = [meal] if meal else []
+        elif endpoint == "random.php":
+            meals = [random.choice(self.meals)] if self.meals else []
+        else:
+            raise KeyError(endpoint)
+        return {"meals": meals or None}
+
+    def _handler(self):
+        mealdb = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                endpoint = url.path.removeprefix(API_PREFIX)
+                if mealdb.latency:
+                    time.sleep(mealdb.latency)
+                try:
+                    payload = mealdb.respond(endpoint, parse_qs(url.query))
+                except KeyError:
+                    self.send_error(404)
+                    return
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeMealDB":
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeMealDB":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
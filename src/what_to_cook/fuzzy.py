@@ -0,0 +1,188 @@
+import hashlib
+from bisect import bisect_left
+from collections import Counter
+
+from src.what_to_cook.catalog import (
+    IndexCache,
+    indexes,
+    normalize_ingredient,
+)
+
+SUGGESTIONS = 20
+# Deletes are generated from this many leading characters only, as in
+# SymSpell; candidates are still verified against the whole string.
+PREFIX_LENGTH = 7
+# Typos are only corrected silently in names at least this long; shorter
+# ones ("pear", "malt") are too often a different ingredient.
+AUTOCORRECT_LENGTH = 8
+
+
+def max_distance(text: str) -> int:
+    """Edits tolerated for a string this long: none for "egg" or "oil",
+    one for "chilli", two for "tomatoess"."""
+    if len(text) < 4:
+        return 0
+    return 1 if len(text) < 8 else 2
+
+
+def distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions), or `limit + 1` once it is known to exceed `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] \
+                    and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def plural_variants(text: str) -> set:
+    """Singular and plural spellings of `text` ("tomatoes" -> "tomato",
+    "cherry" -> "cherries")."""
+    variants = {text + "s", text + "es"}
+    if text.endswith("ies"):
+        variants.add(text[:-3] + "y")
+    if text.endswith("y"):
+        variants.add(text[:-1] + "ies")
+    if text.endswith("es"):
+        variants.add(text[:-2])
+    if text.endswith("s"):
+        variants.add(text[:-1])
+    variants.discard(text)
+    return variants
+
+
+def _deletes(text: str, depth: int) -> set:
+    found = frontier = {text[:PREFIX_LENGTH]}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier
+                    for i in range(len(w))}
+        found = found | frontier
+    return found
+
+
+def vocabulary_version(terms) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    for term in sorted(terms):
+        digest.update(term.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IngredientLookup:
+    """Typo-tolerant lookup over an ingredient vocabulary.
+
+    A SymSpell index maps every string reachable by up to two deletions
+    from a whole ingredient ("chicken stock") or one of its words
+    ("stock") to those keys, so a query only generates its own deletes
+    and verifies the handful of keys they hit. Sorted term and word
+    lists answer prefix matches for text still being typed.
+    """
+
+    def __init__(self, counts: dict):
+        # Normalized ingredient -> recipes using it, for ranking.
+        self.counts = {normalize_ingredient(term): count
+                       for term, count in counts.items()}
+        self.terms = sorted(self.counts)
+        self._words = sorted({(word, term) for term in self.terms
+                              for word in term.split()})
+        self._keys: dict = {}
+        for term in self.terms:
+            self._keys.setdefault(term, set()).add(term)
+            for word in term.split():
+                self._keys.setdefault(word, set()).add(term)
+        self._deletes: dict = {}
+        for key in self._keys:
+            for delete in _deletes(key, max_distance(key)):
+                self._deletes.setdefault(delete, set()).add(key)
+
+    @classmethod
+    def build(cls, recipes: list) -> "IngredientLookup":
+        return cls(Counter(
+            name
+            for recipe in recipes
+            for name in {normalize_ingredient(i)
+                         for i in recipe.get("ingredients") or []}
+        ))
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _prefixed(self, text: str) -> dict:
+        found = {}
+        for term in self.terms[bisect_left(self.terms, text):]:
+            if not term.startswith(text):
+                break
+            found[term] = 0 if term == text else 1
+        for word, term in self._words[bisect_left(self._words, (text,)):]:
+            if not word.startswith(text):
+                break
+            found.setdefault(term, 2)
+        return found
+
+    def _near(self, text: str, limit: int) -> dict:
+        """Keys within `limit` edits of `text`, with their distance."""
+        found = {}
+        for delete in _deletes(text, limit):
+            for key in self._deletes.get(delete, ()):
+                if key not in found:
+                    found[key] = distance(text, key,
+                                          min(limit, max_distance(key)))
+        return {key: d for key, d in found.items()
+                if d <= min(limit, max_distance(key))}
+
+    def suggest(self, text: str, k: int = SUGGESTIONS) -> list:
+        """Up to `k` vocabulary terms for typed `text`: exact and prefix
+        matches first, then misspellings by edit distance, each most
+        used first. Empty text gives the most used ingredients."""
+        text = normalize_ingredient(text)
+        if not text:
+            return sorted(self.terms, key=lambda t: -self.counts[t])[:k]
+
+        ranked = {term: (0, kind)
+                  for term, kind in self._prefixed(text).items()}
+        for key, edits in self._near(text, max_distance(text)).items():
+            for term in self._keys[key]:
+                rank = (edits, 1 if term == key else 2)
+                ranked[term] = min(ranked.get(term, rank), rank)
+        return sorted(
+            ranked, key=lambda t: (ranked[t], -self.counts[t], t)
+        )[:k]
+
+    def canonical(self, name: str) -> str:
+        """The vocabulary spelling of `name`, merging case, spacing and
+        plural variants ("Tomatoes" -> "tomato"). Typos are only corrected
+        in long names with a single candidate; "pear" never becomes
+        "peas"."""
+        text = normalize_ingredient(name)
+        if text in self.counts:
+            return text
+        plurals = [key for key in plural_variants(text)
+                   if key in self.counts]
+        if plurals:
+            return min(plurals, key=lambda key: (-self.counts[key], key))
+        if len(text) < AUTOCORRECT_LENGTH:
+            return text
+        near = [key for key in self._near(text, max_distance(text))
+                if key in self.counts]
+        return near[0] if len(near) == 1 else text
+
+
+def shared_lookup(counts: dict,
+                  cache: IndexCache = indexes) -> IngredientLookup:
+    """The lookup for this vocabulary in `cache` (the process-wide one by
+    default), built once per distinct set of ingredients rather than per
+    catalog version."""
+    return cache.lookup(("fuzzy", vocabulary_version(counts)),
+                        lambda: IngredientLookup(counts))
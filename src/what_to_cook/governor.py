@@ -0,0 +1,276 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class RequestRejected(Exception):
+    """Raised when the governor sheds a call instead of sending it."""
+
+
+class CircuitOpenError(RequestRejected):
+    pass
+
+
+class RateLimitedError(RequestRejected):
+    pass
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self, max_wait: float | None = None) -> bool:
+        """Take a token, sleeping until it is available.
+
+        Tokens are reserved up front so concurrent waiters are served in
+        arrival order. Returns False without consuming anything if the
+        wait would exceed `max_wait`.
+        """
+        with self._lock:
+            self._refill()
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return False
+            self._tokens -= 1
+        if wait:
+            self._sleep(wait)
+        return True
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by observed latency and errors.
+
+    Every fast, successful call grows the limit by roughly one slot per
+    window of calls; a slow or failed call halves it, at most once per
+    `cooldown` seconds so a single burst of timeouts does not collapse
+    the limit straight to the floor.
+    """
+
+    def __init__(self, initial: int = 4, min_limit: int = 1,
+                 max_limit: int = 16, latency_target: float = 2.0,
+                 backoff: float = 0.5, cooldown: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self._clock = clock
+        self._in_flight = 0
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._in_flight < int(self.limit), timeout
+            ):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, latency: float, ok: bool) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if ok and latency <= self.latency_target:
+                self.limit = min(self.max_limit,
+                                 self.limit + 1 / self.limit)
+            else:
+                now = self._clock()
+                if now - self._last_decrease >= self.cooldown:
+                    self._last_decrease = now
+                    self.limit = max(self.min_limit,
+                                     self.limit * self.backoff)
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures.
+
+    While open every call is rejected immediately. After `reset_timeout`
+    seconds a single probe is let through (half-open); its outcome
+    decides whether the circuit closes again or re-opens.
+    """
+
+    def __init__(self, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._listeners: list[Callable[[CircuitState, CircuitState], None]]
+        self._listeners = []
+        self.transitions: deque = deque(maxlen=50)
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state
+
+    def subscribe(
+        self, listener: Callable[[CircuitState, CircuitState], None]
+    ) -> None:
+        """Call `listener(old, new)` on every state transition."""
+        self._listeners.append(listener)
+
+    def allow(self) -> bool:
+        with self._lock:
+            changed = None
+            if self._state is CircuitState.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                changed = self._transition(CircuitState.HALF_OPEN)
+            allowed = not self._probing
+            if self._state is CircuitState.HALF_OPEN:
+                self._probing = True
+        self._notify(changed)
+        return allowed
+
+    def cancel(self) -> None:
+        """Give back a slot taken by `allow` that was never used."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            changed = None
+            if self._state is not CircuitState.CLOSED:
+                changed = self._transition(CircuitState.CLOSED)
+        self._notify(changed)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            changed = None
+            if self._state is CircuitState.HALF_OPEN or (
+                self._state is CircuitState.CLOSED
+                and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = self._clock()
+                changed = self._transition(CircuitState.OPEN)
+        self._notify(changed)
+
+    def _transition(self, new: CircuitState) -> tuple:
+        old, self._state = self._state, new
+        self.transitions.append((time.time(), old.value, new.value))
+        return old, new
+
+    def _notify(self, changed: tuple | None) -> None:
+        if changed is None:
+            return
+        logger.warning("MealDB circuit %s -> %s", *(s.value for s in changed))
+        for listener in list(self._listeners):
+            listener(*changed)
+
+
+class RequestGovernor:
+    """Process-wide gate in front of every MealDB request.
+
+    A call passes the circuit breaker (fail fast), then the token bucket
+    (request rate), then the adaptive limiter (requests in flight).
+    """
+
+    def __init__(self, rate: float | None = 10.0, burst: int = 20,
+                 max_concurrency: int = 16, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, max_wait: float = 10.0):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.limiter = AdaptiveLimiter(
+            initial=min(4, max_concurrency), max_limit=max_concurrency
+        )
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_wait = max_wait
+
+    @classmethod
+    def from_env(cls) -> "RequestGovernor":
+        return cls(
+            rate=float(os.environ.get("MEALDB_RATE_LIMIT", 10.0)),
+            burst=int(os.environ.get("MEALDB_RATE_BURST", 20)),
+            max_concurrency=int(os.environ.get("MEALDB_MAX_CONCURRENCY",
+                                               16)),
+            failure_threshold=int(os.environ.get("MEALDB_BREAKER_THRESHOLD",
+                                                 5)),
+            reset_timeout=float(os.environ.get("MEALDB_BREAKER_RESET", 30.0)),
+        )
+
+    def call(self, fn: Callable[[], T],
+             is_failure: Callable[[T], bool] = lambda _: False) -> T:
+        if not self.breaker.allow():
+            raise CircuitOpenError("MealDB circuit is open")
+        if self.bucket and not self.bucket.acquire(self.max_wait):
+            self.breaker.cancel()
+            raise RateLimitedError("MealDB rate limit exceeded")
+        if not self.limiter.acquire(self.max_wait):
+            self.breaker.cancel()
+            raise RateLimitedError("MealDB concurrency limit exceeded")
+
+        start = time.monotonic()
+        ok = False
+        try:
+            result = fn()
+            ok = not is_failure(result)
+            return result
+        finally:
+            self.limiter.release(time.monotonic() - start, ok)
+            if ok:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def snapshot(self) -> dict:
+        return {
+            "circuit": self.breaker.state.value,
+            "transitions": list(self.breaker.transitions),
+            "concurrency_limit": int(self.limiter.limit),
+            "in_flight": self.limiter.in_flight,
+            "tokens": self.bucket.tokens if self.bucket else None,
+        }
@@ -0,0 +1,336 @@
+"""Drive concurrent simulated sessions through the app and time each rerun.
+
+    python -m src.what_to_cook.loadtest --sessions 16 --iterations 3
+
+Every session is a headless AppTest of app.py running in its own thread
+of this process, the way a Streamlit server runs one script thread per
+browser tab. Sessions share the process-wide catalog, indexes and MealDB
+client; MealDB is the local stand-in serving a synthetic catalog. The
+JSON report has per-step p50/p95/p99 latency, throughput and RSS.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from streamlit import logger as streamlit_logger
+from PIL import Image
+from streamlit.runtime.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1.util import patch_config_options
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner
+
+from src.what_to_cook.api_client import MealDBClient
+from src.what_to_cook.catalog import normalize_ingredient
+from src.what_to_cook.fake_mealdb import FakeMealDB, synthetic_meals
+from src.what_to_cook.governor import RequestGovernor
+from src.what_to_cook.storage import ITEMS_KEY, PENDING_KEY, READ_KEY
+
+APP_PATH = Path(__file__).resolve().parents[2] / "app.py"
+
+
+class SharedRuntime:
+    """Runtime lookup that survives AppTest runs overlapping in threads.
+
+    Each AppTest run installs a runtime and clears it when it finishes,
+    which would pull it from under runs still going in other threads.
+    Lookups fall back to the last runtime any run installed.
+    """
+
+    def __init__(self):
+        self.last = None
+
+    def instance(self) -> Runtime:
+        current = Runtime._instance
+        if current is not None:
+            self.last = current
+        elif self.last is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return self.last
+
+    def exists(self) -> bool:
+        return Runtime._instance is not None or self.last is not None
+
+
+def rss() -> dict:
+    """Current and peak resident set size of this process, in bytes."""
+    try:
+        status = Path("/proc/self/status").read_text()
+        fields = dict(re.findall(r"^(VmRSS|VmHWM):\s+(\d+) kB", status,
+                                 re.MULTILINE))
+        return {"current": int(fields["VmRSS"]) << 10,
+                "peak": int(fields["VmHWM"]) << 10}
+    except (OSError, KeyError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak if sys.platform == "darwin" else peak << 10
+        return {"current": None, "peak": peak}
+
+
+def summarize(latencies: list) -> dict:
+    ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"count": len(ms), "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2), "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(ms.max()), 2)}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict = defaultdict(list)
+        self.errors: dict = defaultdict(int)
+        self.messages: dict = {}
+        self._lock = threading.Lock()
+
+    def record(self, step: str, elapsed: float) -> None:
+        with self._lock:
+            self.latencies[step].append(elapsed)
+
+    def fail(self, step: str, message: str) -> None:
+        with self._lock:
+            self.errors[step] += 1
+            self.messages.setdefault(step, message)
+
+    @property
+    def steps(self) -> int:
+        return sum(len(v) for v in self.latencies.values())
+
+
+class Session:
+    """One simulated browser tab."""
+
+    def __init__(self, number: int, recorder: Recorder, words: list,
+                 timeout: float):
+        self.at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+        self.rng = random.Random(number)
+        self.recorder = recorder
+        self.words = words
+        # The tab's localStorage.
+        self.browser: dict = {}
+
+    def step(self, name: str, action=None) -> None:
+        if action is not None:
+            action(self.at)
+        start = time.perf_counter()
+        self.at.run()
+        if self.answer_storage():
+            # The browser's answer to the first read reruns the script.
+            self.at.run()
+            self.answer_storage()
+        elapsed = time.perf_counter() - start
+        self.recorder.record(name, elapsed)
+        for exception in self.at.exception:
+            self.recorder.fail(name, exception.message)
+
+    def answer_storage(self) -> bool:
+        """What the browser does for BrowserStorage: keep each write and
+        answer its script with the sequence number on the next run, and
+        answer the read of the app keys. True if it answered the read."""
+        state = self.at.session_state
+        if PENDING_KEY in state:
+            for item_key, write in state[PENDING_KEY].items():
+                self.browser[item_key] = write["value"]
+                state[f"storage_{item_key}_{write['seq']}"] = write["seq"]
+        if ITEMS_KEY in state:
+            return False
+        state[READ_KEY] = json.dumps(self.browser)
+        return True
+
+    def widget(self, kind: str, label: str):
+        return next(w for w in getattr(self.at, kind) if w.label == label)
+
+    def goto(self, page: str) -> None:
+        radio = self.at.sidebar.radio[0]
+        if radio.value != page:
+            self.step(f"{page.split()[0].lower()}.open",
+                      lambda at: radio.set_value(page))
+
+
+def home_journey(session: Session) -> None:
+    """Filter by a misspelled ingredient, draw a random recipe, favorite
+    it."""
+    session.goto("Home")
+    include = session.widget("multiselect", "Include ingredients")
+    if include.options:
+        word = normalize_ingredient(session.rng.choice(include.options))
+        typo = word[:1] + word[2:] if len(word) > 4 else word
+        session.step("home.type", lambda at: session.widget(
+            "text_input", "Find include ingredients").input(typo))
+        include = session.widget("multiselect", "Include ingredients")
+        if include.options:
+            session.step("home.filter", lambda at: include.set_value(
+                [normalize_ingredient(include.options[0])]
+            ))
+    session.step("home.random", lambda at: session.widget(
+        "button", "🎲 Get Random Recipe").click())
+    current = session.at.session_state["current_recipe"]
+    if current:
+        session.step("home.favorite", lambda at: at.button(
+            key=f"fav_{current['id']}").click())
+
+
+def browse_journey(session: Session) -> None:
+    """Type a search term one keystroke per rerun."""
+    session.goto("Browse")
+    word = session.rng.choice(session.words)
+    for end in range(1, min(len(word), 6) + 1):
+        session.step("browse.type", lambda at: session.widget(
+            "text_input", "Search recipes").input(word[:end]))
+    session.step("browse.clear", lambda at: session.widget(
+        "text_input", "Search recipes").input(""))
+
+
+def custom_journey(session: Session) -> None:
+    """Fill in and save a custom recipe, with a photo where supported."""
+    session.goto("Custom Recipes")
+    number = session.rng.randrange(10 ** 6)
+    session.widget("text_input", "Recipe Name").input(f"Load test {number}")
+    session.widget("text_area", "Ingredients (one per line)").input(
+        "\n".join(session.rng.sample(session.words, 5)))
+    session.widget("text_area", "Instructions").input("Mix and cook.")
+    uploaders = getattr(session.at, "file_uploader", None)
+    if uploaders:
+        buffer = io.BytesIO()
+        Image.new("RGB", (64, 64), "orange").save(buffer, format="PNG")
+        uploaders[0].set_value((f"{number}.png", buffer.getvalue(),
+                                "image/png"))
+    session.step("custom.save", lambda at: session.widget(
+        "button", "Save Recipe").click())
+
+
+JOURNEYS = {
+    "home": home_journey,
+    "browse": browse_journey,
+    "custom": custom_journey,
+}
+
+
+def run_load(sessions: int = 8, iterations: int = 2,
+             journeys: tuple = tuple(JOURNEYS), catalog_size: int = 300,
+             latency: float = 0.0, seed: int = 0,
+             timeout: float = 120.0) -> dict:
+    meals = synthetic_meals(catalog_size, seed)
+    words = sorted({w for m in meals for w in m["strMeal"].split()
+                    if w.isalpha()})
+    recorder = Recorder()
+    runtime = SharedRuntime()
+    script_cache = ScriptCache()
+
+    with ExitStack() as stack:
+        mealdb = stack.enter_context(FakeMealDB(meals, latency=latency))
+        data_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        for patcher in (
+            # A server compiles the script once for all of its sessions;
+            # AppTest would recompile it, in parallel, on every run.
+            patch.object(app_test, "ScriptCache", lambda: script_cache),
+            patch.object(local_script_runner, "ScriptCache",
+                         lambda: script_cache),
+            patch.object(Runtime, "instance",
+                         classmethod(lambda cls: runtime.instance())),
+            patch.object(Runtime, "exists",
+                         classmethod(lambda cls: runtime.exists())),
+            patch.object(MealDBClient, "BASE_URL", mealdb.base_url),
+            # The stand-in is local; MealDB's own limits would only time
+            # the rate limiter.
+            patch.object(MealDBClient, "governor",
+                         RequestGovernor(rate=None)),
+            patch.dict(os.environ, {"COOKTODAY_DATA_DIR": data_dir}),
+            # Each run turns global.appTest on and restores it after, so
+            # one session finishing would switch it off under another
+            # that is still running.
+            patch_config_options({"global.appTest": True}),
+        ):
+            stack.enter_context(patcher)
+        # Sessions need the browser storage path, not the unit-test one.
+        os.environ.pop("TESTING", None)
+
+        start = time.perf_counter()
+        Session(-1, Recorder(), words, timeout).step("warmup")
+        warmup = time.perf_counter() - start
+        rss_before = rss()
+
+        def drive(number: int) -> None:
+            session = Session(number, recorder, words, timeout)
+            session.step("open")
+            for _ in range(iterations):
+                for name in session.rng.sample(journeys, len(journeys)):
+                    try:
+                        JOURNEYS[name](session)
+                    except Exception as e:
+                        # A widget the journey needs is missing, usually
+                        # because the last run raised.
+                        recorder.fail(name, f"{type(e).__name__}: {e}")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            list(pool.map(drive, range(sessions)))
+        duration = time.perf_counter() - start
+
+        mealdb_requests = dict(mealdb.requests)
+
+    return {
+        "sessions": sessions,
+        "iterations": iterations,
+        "journeys": list(journeys),
+        "catalog_size": catalog_size,
+        "mealdb_latency_s": latency,
+        "warmup_s": round(warmup, 3),
+        "duration_s": round(duration, 3),
+        "steps": recorder.steps,
+        "throughput_steps_per_s": round(recorder.steps / duration, 2),
+        "errors": dict(recorder.errors),
+        "error_samples": recorder.messages,
+        "step_latency": {step: summarize(times)
+                         for step, times in recorder.latencies.items()},
+        "rss_bytes": {"before": rss_before, "after": rss()},
+        "mealdb_requests": mealdb_requests,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=2)
+    parser.add_argument("--journeys", default=",".join(JOURNEYS),
+                        help="comma-separated subset of "
+                             + ", ".join(JOURNEYS))
+    parser.add_argument("--catalog-size", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds the MealDB stand-in waits per request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0,
+                        help="seconds one rerun may take")
+    parser.add_argument("--output", help="write the report here")
+    args = parser.parse_args(argv)
+    # Every session thread is "bare mode" to Streamlit's own checks.
+    streamlit_logger.set_log_level("error")
+
+    journeys = tuple(j for j in args.journeys.split(",") if j)
+    unknown = set(journeys) - set(JOURNEYS)
+    if unknown:
+        parser.error(f"unknown journeys: {', '.join(sorted(unknown))}")
+
+    report = run_load(args.sessions, args.iterations, journeys,
+                      args.catalog_size, args.latency, args.seed,
+                      args.timeout)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
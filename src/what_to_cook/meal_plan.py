@@ -0,0 +1,144 @@
+import random
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.what_to_cook.catalog import normalize_ingredient
+from src.what_to_cook.pantry import IngredientMatrix
+
+
+@dataclass
+class MealPlan:
+    recipes: list
+    # Distinct ingredients to buy for the whole plan.
+    ingredients: int
+    # Ingredient uses saved by recipes sharing them.
+    shared: int
+
+
+def _codes(values: list) -> np.ndarray:
+    lookup: dict = {}
+    return np.array([lookup.setdefault(v, len(lookup)) for v in values],
+                    dtype=np.int64)
+
+
+class MealPlanner:
+    """Picks recipes for several days that share as many ingredients as
+    possible, so the shopping list stays short.
+
+    The plan is grown greedily, adding the recipe that brings the fewest
+    new ingredients, then improved by swapping single days for better
+    recipes until no swap helps. Both steps score every candidate at once
+    with an OR plus a popcount over the ingredient bit matrix. A few
+    restarts from random first recipes keep plans varied.
+    """
+
+    def __init__(self, matrix: IngredientMatrix):
+        self.matrix = matrix
+        recipes = matrix.recipes
+        self.categories = _codes([r.get("category") or "Unknown"
+                                  for r in recipes])
+        self.areas = _codes([r.get("area") or "Unknown" for r in recipes])
+
+    @classmethod
+    def build(cls, recipes: list) -> "MealPlanner":
+        return cls(IngredientMatrix(recipes))
+
+    def _cost(self, union: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Shopping list size if each row were added to `union`."""
+        return np.bitwise_count(union | self.matrix.bits[rows]).sum(
+            axis=1, dtype=np.int64
+        )
+
+    def _allowed(self, plan: list, eligible: np.ndarray,
+                 max_per_category: int, max_per_area: int) -> np.ndarray:
+        allowed = eligible.copy()
+        allowed[plan] = False
+        for codes, cap in ((self.categories, max_per_category),
+                           (self.areas, max_per_area)):
+            counts = np.bincount(codes[plan], minlength=codes.max() + 1)
+            allowed &= counts[codes] < cap
+        return np.flatnonzero(allowed)
+
+    def _union(self, plan: list) -> np.ndarray:
+        union = np.zeros(self.matrix.bits.shape[1], dtype=np.uint8)
+        for i in plan:
+            union |= self.matrix.bits[i]
+        return union
+
+    def _score(self, union, rows, noise) -> np.ndarray:
+        # Fewest ingredients first, then the recipe sharing more of them;
+        # the noise only breaks exact ties.
+        return self._cost(union, rows) * 1024 \
+            - self.matrix.sizes[rows] + noise[rows]
+
+    def _best(self, union, candidates, noise) -> tuple:
+        score = self._score(union, candidates, noise)
+        best = int(np.argmin(score))
+        return int(candidates[best]), score[best]
+
+    def _search(self, days, start, eligible, caps, noise) -> list:
+        plan = [start]
+        while len(plan) < days:
+            candidates = self._allowed(plan, eligible, *caps)
+            if not len(candidates):
+                break
+            plan.append(self._best(self._union(plan), candidates, noise)[0])
+
+        improved = True
+        while improved:
+            improved = False
+            for slot in range(len(plan)):
+                rest = plan[:slot] + plan[slot + 1:]
+                candidates = self._allowed(rest, eligible, *caps)
+                if not len(candidates):
+                    continue
+                union = self._union(rest)
+                current = self._score(union, [plan[slot]], noise)[0]
+                best, score = self._best(union, candidates, noise)
+                if score < current:
+                    plan[slot] = best
+                    improved = True
+        return plan
+
+    def plan(self, days: int = 7, include=(), exclude=(),
+             max_per_category: int = 2, max_per_area: int = 3,
+             restarts: int = 4, seed=None) -> MealPlan:
+        """Plan `days` distinct recipes.
+
+        Every recipe uses all `include` ingredients and none of the
+        `exclude` ones, and no category or cuisine appears more than its
+        cap. The plan is shorter than `days` when the constraints leave
+        too few recipes.
+        """
+        matrix = self.matrix
+        rng = random.Random(seed)
+        eligible = np.ones(len(matrix), dtype=bool)
+        include = {normalize_ingredient(n) for n in include}
+        if not include <= set(matrix.column):
+            return MealPlan([], 0, 0)
+        if include:
+            eligible &= matrix.count(matrix.mask(include)) == len(include)
+        if exclude:
+            eligible &= matrix.count(matrix.mask(exclude)) == 0
+        starts = np.flatnonzero(eligible)
+        if not len(starts) or days < 1:
+            return MealPlan([], 0, 0)
+
+        caps = (max_per_category, max_per_area)
+        noise = np.random.default_rng(rng.getrandbits(32)).random(len(matrix))
+        best = None
+        for start in rng.sample(list(starts), min(restarts, len(starts))):
+            plan = self._search(days, int(start), eligible, caps, noise)
+            key = (-len(plan), int(np.bitwise_count(self._union(plan))
+                                   .sum(dtype=np.int64)))
+            if best is None or key < best[0]:
+                best = (key, plan)
+
+        plan = best[1]
+        ingredients = best[0][1]
+        return MealPlan(
+            recipes=[matrix.recipes[i] for i in plan],
+            ingredients=ingredients,
+            shared=int(matrix.sizes[plan].sum()) - ingredients,
+        )
@@ -0,0 +1,116 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+# Unit spelling -> (canonical unit, factor to it). Mass is kept in grams
+# and volume in millilitres so amounts from different recipes add up.
+UNITS = {
+    "g": ("g", 1.0), "gr": ("g", 1.0), "gram": ("g", 1.0),
+    "kg": ("g", 1000.0), "kilogram": ("g", 1000.0),
+    "mg": ("g", 0.001),
+    "oz": ("g", 28.35), "ounce": ("g", 28.35),
+    "lb": ("g", 453.6), "pound": ("g", 453.6),
+    "ml": ("ml", 1.0), "millilitre": ("ml", 1.0), "milliliter": ("ml", 1.0),
+    "cl": ("ml", 10.0), "dl": ("ml", 100.0),
+    "l": ("ml", 1000.0), "litre": ("ml", 1000.0), "liter": ("ml", 1000.0),
+    "tsp": ("ml", 5.0), "teaspoon": ("ml", 5.0),
+    "tbsp": ("ml", 15.0), "tbs": ("ml", 15.0), "tblsp": ("ml", 15.0),
+    "tbls": ("ml", 15.0), "tablespoon": ("ml", 15.0),
+    "cup": ("ml", 240.0),
+    "pint": ("ml", 568.0), "pt": ("ml", 568.0),
+    "quart": ("ml", 946.0), "qt": ("ml", 946.0),
+    "fl oz": ("ml", 28.4),
+}
+# Units that are counted rather than converted.
+COUNTED = {
+    "clove", "slice", "can", "tin", "jar", "packet", "pack", "sprig",
+    "stick", "bunch", "handful", "pinch", "dash", "piece", "head", "leaf",
+    "rasher", "fillet", "sheet", "cube", "stalk", "knob", "bottle",
+}
+# Descriptive words after a number that still mean "this many".
+SIZES = {"large", "medium", "small", "whole", "big", "chopped", "sliced",
+         "diced", "finely", "fresh"}
+
+FRACTIONS = {"¼": "1/4", "½": "1/2", "¾": "3/4", "⅓": "1/3", "⅔": "2/3",
+             "⅛": "1/8", "⅜": "3/8", "⅝": "5/8", "⅞": "7/8"}
+
+_NUMBER = r"\d+/\d+|\d+(?:[.,]\d+)?(?:\s+\d+/\d+)?"
+_AMOUNT = re.compile(
+    rf"^\s*(?P<amount>{_NUMBER})"
+    rf"(?:\s*(?:-|–|to)\s*(?P<upper>{_NUMBER}))?\s*(?P<rest>.*)$"
+)
+
+
+class Quantity(NamedTuple):
+    """Parsed measure. `amount` is None when the measure has no number
+    ("to taste"); `unit` is "" for plain counts ("3 large")."""
+
+    amount: float | None
+    unit: str | None
+
+
+NO_QUANTITY = Quantity(None, None)
+
+
+def _number(text: str) -> float:
+    total = 0.0
+    for part in text.replace(",", ".").split():
+        if "/" in part:
+            numerator, denominator = part.split("/")
+            total += int(numerator) / int(denominator) \
+                if int(denominator) else 0.0
+        else:
+            total += float(part)
+    return total
+
+
+def _unit(words: list) -> tuple:
+    """Canonical unit and factor for the words after the amount."""
+    if len(words) > 1 and f"{words[0]} {words[1]}" in UNITS:
+        return UNITS[f"{words[0]} {words[1]}"]
+    word = words[0] if words else ""
+    word = "leaf" if word == "leaves" else word
+    for candidate in (word, word.removesuffix("s"),
+                      word.removesuffix("es")):
+        if candidate in UNITS:
+            return UNITS[candidate]
+        if candidate in COUNTED:
+            return candidate, 1.0
+    return "", 1.0
+
+
+@lru_cache(maxsize=8192)
+def parse_measure(raw: str) -> Quantity:
+    """Parse a free-text MealDB measure such as "1 1/2 cups" or "100g".
+
+    Ranges ("2-3 tbsp") take their upper bound, so a shopping list never
+    falls short. Results are cached per distinct string: the catalog
+    repeats the same few hundred measures thousands of times.
+    """
+    text = raw.strip().lower()
+    for glyph, fraction in FRACTIONS.items():
+        text = text.replace(glyph, f" {fraction}")
+    match = _AMOUNT.match(text)
+    if not match:
+        return NO_QUANTITY
+
+    amount = _number(match["amount"])
+    if match["upper"]:
+        amount = max(amount, _number(match["upper"]))
+    words = re.findall(r"[a-z]+", match["rest"])
+    while words and words[0] in SIZES and words[0] not in UNITS:
+        words = words[1:]
+    unit, factor = _unit(words)
+    return Quantity(round(amount * factor, 3), unit)
+
+
+def recipe_quantities(recipe: dict) -> list:
+    """One Quantity per ingredient, parsed at ingest when available."""
+    stored = recipe.get("quantities")
+    if stored is not None and len(stored) == len(recipe["ingredients"]):
+        return [Quantity(*q) for q in stored]
+    measures = recipe.get("measures") or []
+    return [
+        parse_measure(measures[i]) if i < len(measures) else NO_QUANTITY
+        for i in range(len(recipe["ingredients"]))
+    ]
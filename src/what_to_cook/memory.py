@@ -0,0 +1,209 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from types import FunctionType, MethodType, ModuleType
+from typing import Callable, MutableMapping
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Keys holding recipe dicts that may be copies of catalog or custom ones.
+RECIPE_LISTS = ("favorites", "filtered_recipes")
+RECIPE_ITEMS = ("current_recipe",)
+# Derived state that is rebuilt on demand when missing.
+REBUILDABLE = ("similar_custom", "search_custom", "session_sources",
+               "indexes")
+# Charged first, so recipes they share with other keys are billed here.
+OWNERS = ("all_meals", "custom_recipes")
+
+_ATOMS = (str, bytes, bytearray, int, float, complex, bool, type(None))
+_OPAQUE = (type, ModuleType, FunctionType, MethodType, threading.Thread)
+
+
+def deep_size(obj, skip=frozenset(), seen: set | None = None) -> int:
+    """Approximate bytes reachable from `obj`.
+
+    Objects whose id is in `skip` or `seen` cost nothing; `seen` is
+    updated, so calls sharing it count every object once.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or id(obj) in skip:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, _OPAQUE) or callable(obj):
+            continue
+        total += sys.getsizeof(obj)
+        if isinstance(obj, _ATOMS):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        elif isinstance(obj, np.ndarray):
+            if obj.base is not None:
+                stack.append(obj.base)
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+    return total
+
+
+def shared_ids(*collections) -> set:
+    """Ids of `collections` and their items, for `deep_size(skip=...)`."""
+    ids = set()
+    for collection in collections:
+        ids.add(id(collection))
+        ids.update(id(item) for item in collection)
+    return ids
+
+
+def format_bytes(size: float) -> str:
+    if size < 1024:
+        return f"{size:.0f} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+
+
+@dataclass
+class SessionReport:
+    session_id: str
+    sizes: dict
+    measured_at: float
+    compactions: int = 0
+
+    @property
+    def total(self) -> int:
+        return sum(self.sizes.values())
+
+    def largest(self, n: int = 3) -> list:
+        return sorted(self.sizes.items(), key=lambda kv: -kv[1])[:n]
+
+
+class MemoryLedger:
+    """Approximate session-state memory per key and per session.
+
+    Sessions are measured at most once per `interval` seconds and
+    forgotten after `ttl` seconds without a measurement. Objects passed
+    as shared (the process-wide catalog) are not charged to any session.
+    """
+
+    def __init__(self, budget: int = 25 << 20, interval: float = 10.0,
+                 ttl: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.budget = budget
+        self.interval = interval
+        self.ttl = ttl
+        self.clock = clock
+        self._reports: dict = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "MemoryLedger":
+        return cls(
+            budget=int(float(os.environ.get("COOKTODAY_SESSION_BUDGET_MB",
+                                            25)) * (1 << 20)),
+            interval=float(os.environ.get("COOKTODAY_MEMORY_INTERVAL", 10.0)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._reports)
+
+    def due(self, session_id: str) -> bool:
+        with self._lock:
+            report = self._reports.get(session_id)
+        return report is None or \
+            self.clock() - report.measured_at >= self.interval
+
+    def measure(self, session_id: str, state: dict, shared=frozenset(),
+                compacted: bool = False) -> SessionReport:
+        seen: set = set()
+        order = [k for k in OWNERS if k in state]
+        order += sorted((k for k in state if k not in OWNERS), key=str)
+        sizes = {str(k): deep_size(state[k], shared, seen) for k in order}
+
+        now = self.clock()
+        with self._lock:
+            previous = self._reports.get(session_id)
+            report = SessionReport(
+                session_id, sizes, now,
+                (previous.compactions if previous else 0) + compacted,
+            )
+            self._reports[session_id] = report
+            for stale in [sid for sid, r in self._reports.items()
+                          if now - r.measured_at > self.ttl]:
+                del self._reports[stale]
+        return report
+
+    def over_budget(self, report: SessionReport) -> bool:
+        return report.total > self.budget
+
+    def account(self, session_id: str, state: MutableMapping,
+                recipes: list, shared=frozenset()) -> SessionReport:
+        """Measure a session and compact it if it is over budget."""
+        report = self.measure(session_id, dict(state.items()), shared)
+        if not self.over_budget(report):
+            return report
+        changed = compact(state, recipes)
+        report = self.measure(session_id, dict(state.items()), shared,
+                              compacted=True)
+        if self.over_budget(report):
+            logger.warning(
+                "Session %s uses %s after compacting %s (budget %s)",
+                session_id, format_bytes(report.total),
+                ", ".join(changed) or "nothing", format_bytes(self.budget),
+            )
+        return report
+
+    def report(self, session_id: str) -> SessionReport | None:
+        with self._lock:
+            return self._reports.get(session_id)
+
+    def heaviest(self, n: int = 10) -> list:
+        with self._lock:
+            reports = list(self._reports.values())
+        return sorted(reports, key=lambda r: -r.total)[:n]
+
+
+def compact(state: MutableMapping, recipes: list) -> list:
+    """Swap recipe copies in `state` for the shared ones with the same id.
+
+    Favorites restored from browser storage, and anything else holding a
+    copy, end up referencing the catalog or custom recipe instead; derived
+    indexes are dropped to be rebuilt on demand. Returns the keys changed.
+    """
+    by_id = {r["id"]: r for r in recipes}
+    changed = []
+
+    def canonical(recipe):
+        return by_id.get(recipe.get("id"), recipe)
+
+    for key in RECIPE_LISTS:
+        value = state.get(key) or []
+        interned = [canonical(r) for r in value]
+        if any(a is not b for a, b in zip(value, interned)):
+            state[key] = interned
+            changed.append(key)
+    for key in RECIPE_ITEMS:
+        value = state.get(key)
+        if value and canonical(value) is not value:
+            state[key] = canonical(value)
+            changed.append(key)
+    for key in REBUILDABLE:
+        if key in state:
+            del state[key]
+            changed.append(key)
+    return changed
+
+
+ledger = MemoryLedger.from_env()
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.what_to_cook.catalog import normalize_ingredient
+
+
+@dataclass
+class PantryMatch:
+    recipe: dict
+    matched: int
+    total: int
+    missing: list
+
+    @property
+    def coverage(self) -> float:
+        return self.matched / self.total if self.total else 0.0
+
+
+class IngredientMatrix:
+    """Recipe x ingredient bit matrix over a recipe list.
+
+    Row `i` holds recipe `i`'s ingredients packed eight per byte, so
+    scoring a pantry against the whole catalog is an AND plus a popcount
+    per row instead of a Python loop over every ingredient list.
+    """
+
+    def __init__(self, recipes: list):
+        self.recipes = recipes
+        keys = [{normalize_ingredient(i) for i in r["ingredients"]}
+                for r in recipes]
+        self.vocabulary = sorted(set().union(*keys))
+        self.column = {name: j for j, name in enumerate(self.vocabulary)}
+
+        dense = np.zeros((len(recipes), len(self.vocabulary)), dtype=bool)
+        rows = [i for i, row in enumerate(keys) for _ in row]
+        cols = [self.column[name] for row in keys for name in row]
+        dense[rows, cols] = True
+        self.bits = np.packbits(dense, axis=1)
+        self.sizes = dense.sum(axis=1)
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def mask(self, ingredients) -> np.ndarray:
+        """Pack a set of ingredient names into a row-compatible bitmask."""
+        dense = np.zeros(len(self.vocabulary), dtype=bool)
+        for name in ingredients:
+            j = self.column.get(normalize_ingredient(name))
+            if j is not None:
+                dense[j] = True
+        return np.packbits(dense)
+
+    def count(self, mask: np.ndarray) -> np.ndarray:
+        """Number of `mask` ingredients in every recipe."""
+        return np.bitwise_count(self.bits & mask).sum(axis=1, dtype=np.int64)
+
+    def rank(self, pantry, k: int = 10, exclude=()) -> list:
+        """Top-k recipes by share of their ingredients found in `pantry`.
+
+        Ties on coverage go to the recipe missing fewer ingredients.
+        Recipes using nothing from the pantry, or anything in `exclude`,
+        are left out.
+        """
+        if not len(self):
+            return []
+        matched = self.count(self.mask(pantry))
+        coverage = matched / np.maximum(self.sizes, 1)
+        missing = self.sizes - matched
+
+        eligible = matched > 0
+        if exclude:
+            eligible &= self.count(self.mask(exclude)) == 0
+        candidates = np.flatnonzero(eligible)
+        if len(candidates) > k:
+            scores = coverage[candidates]
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            candidates = candidates[scores >= kth]
+        order = np.lexsort((missing[candidates], -coverage[candidates]))
+
+        have = {normalize_ingredient(i) for i in pantry}
+        results = []
+        for i in candidates[order][:k]:
+            recipe = self.recipes[i]
+            results.append(PantryMatch(
+                recipe=recipe,
+                matched=int(matched[i]),
+                total=int(self.sizes[i]),
+                missing=list(dict.fromkeys(
+                    name for name in recipe["ingredients"]
+                    if normalize_ingredient(name) not in have
+                )),
+            ))
+        return results
@@ -0,0 +1,203 @@
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.what_to_cook.catalog_store import DEFAULT_DATA_DIR
+
+PROFILE_TOP = 15
+# Saved profiles kept on disk; older ones are deleted.
+PROFILE_KEEP = 50
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+_active = threading.local()
+# cProfile and tracemalloc are process-wide, so only one rerun at a time
+# gets them; concurrent profiled reruns still record their sections.
+_tracing = threading.Lock()
+
+
+def profiling_requested(query_params) -> bool:
+    """On for every rerun with $COOKTODAY_PROFILE set, or for one opened
+    with `?profile=1` when $COOKTODAY_ADMIN lets visitors ask for it:
+    profiles write to the server's disk and show its internals."""
+    if os.environ.get("COOKTODAY_PROFILE"):
+        return True
+    return bool(os.environ.get("COOKTODAY_ADMIN")) and \
+        query_params.get("profile") in ("1", "true")
+
+
+def profile_dir() -> Path:
+    default = Path(os.environ.get("COOKTODAY_DATA_DIR", DEFAULT_DATA_DIR))
+    return Path(os.environ.get("COOKTODAY_PROFILE_DIR",
+                               default / "profiles"))
+
+
+@contextmanager
+def section(name: str):
+    """Time a named part of the rerun being profiled in this thread;
+    a no-op when none is."""
+    profiler = getattr(_active, "profiler", None)
+    if profiler is None:
+        yield
+        return
+    profiler.enter(name)
+    try:
+        yield
+    finally:
+        profiler.leave(name)
+
+
+@dataclass
+class ProfileResult:
+    elapsed: float
+    # Section -> (calls, seconds), in first-entered order.
+    sections: dict = field(default_factory=dict)
+    # (function, calls, cumulative seconds, own seconds).
+    functions: list = field(default_factory=list)
+    # (file:line, bytes, blocks) allocated and still held by the rerun.
+    allocations: list = field(default_factory=list)
+    peak: int = 0
+    paths: list = field(default_factory=list)
+
+    @property
+    def traced(self) -> bool:
+        return bool(self.functions)
+
+
+def _label(key: tuple) -> str:
+    filename, line, function = key
+    if filename == "~":
+        return function
+    return f"{function} ({Path(filename).name}:{line})"
+
+
+class Profiler:
+    """cProfile and tracemalloc around one script rerun.
+
+    Code inside it marks phases with `section`; their timings are kept
+    as a speedscope timeline next to the `.prof` dump, which pstats,
+    snakeviz and friends read for the function-level detail.
+    """
+
+    def __init__(self, directory: Path | None = None, name: str = "rerun",
+                 top: int = PROFILE_TOP, clock=time.perf_counter):
+        self.directory = directory
+        self.name = name
+        self.top = top
+        self.clock = clock
+        self.result: ProfileResult | None = None
+        self._events: list = []
+        self._sections: dict = {}
+        self._open: list = []
+        self._profile = None
+        self._snapshot = None
+        self._started_tracing = False
+        self._outer = None
+
+    def enter(self, name: str) -> None:
+        now = self.clock()
+        self._events.append(("O", name, now - self._start))
+        self._open.append(now)
+
+    def leave(self, name: str) -> None:
+        now = self.clock()
+        calls, seconds = self._sections.get(name, (0, 0.0))
+        self._sections[name] = (calls + 1, seconds + now - self._open.pop())
+        self._events.append(("C", name, now - self._start))
+
+    def __enter__(self) -> "Profiler":
+        if _tracing.acquire(blocking=False):
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._snapshot = tracemalloc.take_snapshot()
+            self._profile = cProfile.Profile()
+        self._outer = getattr(_active, "profiler", None)
+        _active.profiler = self
+        self._start = self.clock()
+        if self._profile is not None:
+            self._profile.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+        elapsed = self.clock() - self._start
+        _active.profiler = self._outer
+        self.result = ProfileResult(elapsed, dict(self._sections))
+        if self._profile is None:
+            return
+        try:
+            self._collect(self.result)
+            if self.directory is not None:
+                self.result.paths = self.save(self.directory)
+        finally:
+            if self._started_tracing:
+                tracemalloc.stop()
+            _tracing.release()
+
+    def _collect(self, result: ProfileResult) -> None:
+        result.peak = tracemalloc.get_traced_memory()[1]
+        ignore = [tracemalloc.Filter(False, module.__file__)
+                  for module in (tracemalloc, cProfile)]
+        ignore.append(tracemalloc.Filter(False, __file__))
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+        before = self._snapshot.filter_traces(ignore)
+        grown = [stat for stat in after.compare_to(before, "lineno")
+                 if stat.size_diff > 0]
+        grown.sort(key=lambda stat: -stat.size_diff)
+        result.allocations = [
+            (f"{Path(stat.traceback[0].filename).name}:"
+             f"{stat.traceback[0].lineno}",
+             stat.size_diff, stat.count_diff)
+            for stat in grown[:self.top]
+        ]
+        stats = pstats.Stats(self._profile).stats
+        ranked = sorted(stats.items(), key=lambda item: -item[1][3])
+        result.functions = [
+            (_label(key), calls, cumulative, own)
+            for key, (_, calls, own, cumulative, _) in ranked[:self.top]
+        ]
+
+    def speedscope(self) -> dict:
+        frames = list(dict.fromkeys(name for _, name, _ in self._events))
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "shared": {"frames": [{"name": name} for name in frames]},
+            "profiles": [{
+                "type": "evented",
+                "name": self.name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": self.result.elapsed * 1000,
+                "events": [
+                    {"type": kind, "frame": frames.index(name),
+                     "at": at * 1000}
+                    for kind, name, at in self._events
+                ],
+            }],
+            "exporter": "cooktoday",
+        }
+
+    def save(self, directory: Path) -> list:
+        """Write `<stamp>.prof` and `<stamp>.speedscope.json`, dropping
+        the oldest profiles past `PROFILE_KEEP`."""
+        directory.mkdir(parents=True, exist_ok=True)
+        name = "".join(c for c in self.name if c.isalnum() or c in "-_")
+        stem = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-" \
+            f"{time.time_ns() % 10**9:09d}-{name}"
+        prof = stem.with_name(stem.name + ".prof")
+        timeline = stem.with_name(stem.name + ".speedscope.json")
+        self._profile.dump_stats(prof)
+        timeline.write_text(json.dumps(self.speedscope()))
+        for old in sorted(directory.glob("*.prof"))[:-PROFILE_KEEP]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".speedscope.json").unlink(missing_ok=True)
+        return [prof, timeline]
@@ -0,0 +1,214 @@
+import heapq
+import math
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
+
+FIELDS = ("name", "ingredients", "instructions")
+BOOSTS = {"name": 3.0, "ingredients": 2.0, "instructions": 1.0}
+K1 = 1.2
+B = 0.75
+STOPWORDS = frozenset(
+    "a an and are as at be by for from if in into is it of on or over "
+    "the then to until with you your".split()
+)
+# Expansions tried for a half-typed last word ("chi" -> chicken, chilli).
+PREFIX_EXPANSIONS = 16
+SNIPPET_WORDS = 12
+# Summary recipes hydrated at a time while building an index.
+BUILD_BATCH = 256
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Fold plurals so "tomatoes" finds "tomato" and "eggs" finds "egg"."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("ches", "shes", "xes", "oes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and \
+            not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list:
+    return [stem(w) for w in _WORD.findall(text.lower())
+            if w not in STOPWORDS]
+
+
+def _field_text(recipe: dict, field: str) -> str:
+    if field == "ingredients":
+        return " ".join(recipe.get("ingredients") or [])
+    return recipe.get(field) or ""
+
+
+@dataclass
+class SearchHit:
+    score: float
+    recipe: dict
+    snippet: str
+
+
+class SearchIndex:
+    """BM25F inverted index over recipe name, ingredients and instructions.
+
+    Postings hold per-field term counts, so field boosts and length
+    normalisation are applied at query time and a query only reads the
+    postings of its own terms. Recipes can be added one at a time.
+    """
+
+    def __init__(self):
+        self.recipes: list = []
+        self._position: dict = {}
+        self._postings: dict = {}
+        self._lengths: list = []
+        self.totals = [0] * len(FIELDS)
+        self._terms: list | None = None
+
+    @classmethod
+    def build(cls, recipes: list, hydrate=None) -> "SearchIndex":
+        """Index `recipes`. `hydrate` supplies the full text of summary
+        records, a batch at a time; the index keeps the summaries."""
+        index = cls()
+        for start in range(0, len(recipes), BUILD_BATCH):
+            batch = recipes[start:start + BUILD_BATCH]
+            full = hydrate(batch) if hydrate else batch
+            for recipe, text in zip(batch, full):
+                index.add(recipe, text)
+        return index
+
+    @property
+    def ids(self):
+        return self._position.keys()
+
+    def __contains__(self, recipe_id) -> bool:
+        return recipe_id in self._position
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def add(self, recipe: dict, text: dict | None = None) -> None:
+        if recipe["id"] in self._position:
+            return
+        doc = len(self.recipes)
+        self._position[recipe["id"]] = doc
+        self.recipes.append(recipe)
+
+        counts: dict = {}
+        lengths = []
+        for f, field in enumerate(FIELDS):
+            tokens = tokenize(_field_text(text or recipe, field))
+            lengths.append(len(tokens))
+            self.totals[f] += len(tokens)
+            for token in tokens:
+                counts.setdefault(token, [0] * len(FIELDS))[f] += 1
+        self._lengths.append(lengths)
+        for token, tf in counts.items():
+            self._postings.setdefault(token, {})[doc] = tf
+        self._terms = None
+
+    def postings(self, term: str) -> dict:
+        return self._postings.get(term, {})
+
+    def expand(self, prefix: str) -> list:
+        """Indexed terms starting with `prefix`, most frequent first."""
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+        matches = []
+        for term in self._terms[bisect_left(self._terms, prefix):]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+
+def _query_terms(indexes: list, query: str) -> list:
+    words = [w for w in _WORD.findall(query.lower()) if w not in STOPWORDS]
+    terms = [stem(w) for w in words]
+    if words and not query[-1:].isspace():
+        # Still being typed: let the last word match as a prefix too.
+        last = words[-1]
+        expansions = {t for index in indexes for t in index.expand(last)}
+        ranked = sorted(
+            expansions,
+            key=lambda t: -sum(len(i.postings(t)) for i in indexes),
+        )
+        terms[-1:] = list(dict.fromkeys(
+            [terms[-1]] + ranked[:PREFIX_EXPANSIONS]
+        ))
+    return list(dict.fromkeys(terms))
+
+
+def snippet(recipe: dict, terms: set) -> str:
+    """A few words of the instructions around the first matching term,
+    with matches in bold; falls back to the matching ingredients."""
+    words = (recipe.get("instructions") or "").split()
+    hits = [i for i, w in enumerate(words)
+            if set(tokenize(w)) & terms]
+    if hits:
+        start = max(0, hits[0] - SNIPPET_WORDS // 3)
+        window = words[start:start + SNIPPET_WORDS]
+        text = " ".join(
+            f"**{w}**" if set(tokenize(w)) & terms else w for w in window
+        )
+        prefix = "…" if start else ""
+        suffix = "…" if start + SNIPPET_WORDS < len(words) else ""
+        return f"{prefix}{text}{suffix}"
+    matched = [i for i in recipe.get("ingredients") or []
+               if set(tokenize(i)) & terms]
+    return ", ".join(f"**{i}**" for i in matched)
+
+
+def search(indexes: list, query: str, k: int = 20, hydrate=None) -> list:
+    """Top-k `SearchHit`s for `query` across `indexes`.
+
+    Collection statistics (document frequency, average field lengths) are
+    pooled over all indexes, so hits from a shared catalog index and a
+    small per-session one are scored on the same scale. Snippets are cut
+    from the hits hydrated by `hydrate`, when given.
+    """
+    indexes = [index for index in indexes if len(index)]
+    count = sum(len(index) for index in indexes)
+    terms = _query_terms(indexes, query)
+    if not count or not terms:
+        return []
+
+    boosts = [BOOSTS[field] for field in FIELDS]
+    averages = [
+        max(sum(index.totals[f] for index in indexes) / count, 1.0)
+        for f in range(len(FIELDS))
+    ]
+    scores: dict = {}
+    matched: dict = {}
+    for term in terms:
+        df = sum(len(index.postings(term)) for index in indexes)
+        if not df:
+            continue
+        idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+        for number, index in enumerate(indexes):
+            for doc, tf in index.postings(term).items():
+                lengths = index._lengths[doc]
+                weighted = sum(
+                    boost * freq / (1 - B + B * length / avg)
+                    for boost, freq, length, avg in zip(
+                        boosts, tf, lengths, averages
+                    )
+                    if freq
+                )
+                key = (number, doc)
+                scores[key] = scores.get(key, 0.0) + \
+                    idf * weighted / (K1 + weighted)
+                matched.setdefault(key, set()).add(term)
+
+    top = heapq.nlargest(k, scores.items(), key=itemgetter(1))
+    recipes = [indexes[number].recipes[doc] for (number, doc), _ in top]
+    full = hydrate(recipes) if hydrate else recipes
+    return [
+        SearchHit(score, recipe, snippet(text, matched[key]))
+        for (key, score), recipe, text in zip(top, recipes, full)
+    ]
@@ -0,0 +1,105 @@
+import csv
+import io
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.what_to_cook.catalog import normalize_ingredient
+from src.what_to_cook.measures import recipe_quantities
+
+# Larger display unit per canonical unit, used past 1000.
+_SCALED = {"g": "kg", "ml": "l"}
+# Counted units whose plural is not the singular plus "s".
+_PLURALS = {"bunch": "bunches", "pinch": "pinches", "dash": "dashes",
+            "leaf": "leaves"}
+
+
+@dataclass
+class ShoppingItem:
+    ingredient: str
+    # None when no recipe gave a usable amount ("to taste").
+    amount: float | None
+    unit: str | None
+    recipes: int
+
+    @property
+    def quantity(self) -> str:
+        if self.amount is None:
+            return ""
+        amount, unit = self.amount, self.unit
+        if unit in _SCALED and amount >= 1000:
+            amount, unit = amount / 1000, _SCALED[unit]
+        text = f"{amount:.2f}".rstrip("0").rstrip(".")
+        if unit in ("g", "kg", "ml", "l"):
+            return f"{text} {unit}"
+        if unit:
+            if amount > 1:
+                unit = _PLURALS.get(unit, f"{unit}s")
+            return f"{text} {unit}"
+        return text
+
+
+def build_shopping_list(recipes: list) -> list:
+    """Merge the ingredients of `recipes` into one shopping list.
+
+    Quantities of the same ingredient in the same unit are added up;
+    amounts in units that cannot be converted into each other (grams and
+    cups of flour) stay on separate lines. Rows are gathered in a single
+    pass and summed with one bincount per column.
+    """
+    labels: dict = {}
+    groups: dict = {}
+    codes, amounts, owners = [], [], []
+    for number, recipe in enumerate(recipes):
+        for name, quantity in zip(recipe["ingredients"],
+                                  recipe_quantities(recipe)):
+            key = normalize_ingredient(name)
+            labels.setdefault(key, name)
+            codes.append(groups.setdefault((key, quantity.unit),
+                                           len(groups)))
+            amounts.append(quantity.amount or 0.0)
+            owners.append(number)
+    if not groups:
+        return []
+
+    codes = np.asarray(codes, dtype=np.int64)
+    totals = np.bincount(codes, weights=np.asarray(amounts),
+                         minlength=len(groups))
+    # Distinct (group, recipe) pairs, so a recipe listing an ingredient
+    # twice counts once.
+    pairs = np.unique(codes * len(recipes) + np.asarray(owners))
+    uses = np.bincount(pairs // len(recipes), minlength=len(groups))
+
+    items = [
+        ShoppingItem(
+            ingredient=labels[key],
+            amount=None if unit is None else round(float(totals[code]), 3),
+            unit=unit,
+            recipes=int(uses[code]),
+        )
+        for (key, unit), code in groups.items()
+    ]
+    items.sort(key=lambda item: (item.ingredient.lower(),
+                                 item.amount is None, item.unit or ""))
+    return items
+
+
+def to_text(items: list) -> str:
+    return "".join(
+        f"- {item.ingredient}: {item.quantity or 'as needed'}\n"
+        for item in items
+    )
+
+
+def to_csv(items: list) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["ingredient", "amount", "unit", "recipes"])
+    for item in items:
+        writer.writerow([
+            item.ingredient,
+            "" if item.amount is None else item.amount,
+            item.unit or "",
+            item.recipes,
+        ])
+    return buffer.getvalue()
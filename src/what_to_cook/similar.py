@@ -0,0 +1,133 @@
+import hashlib
+import heapq
+from functools import lru_cache
+from operator import itemgetter
+
+import numpy as np
+
+from src.what_to_cook.catalog import normalize_ingredient
+
+_PRIME = (1 << 31) - 1
+
+
+@lru_cache(maxsize=65536)
+def _token_hash(token: str) -> int:
+    digest = hashlib.blake2b(token.encode(), digest_size=4).digest()
+    return int.from_bytes(digest, "little") % _PRIME
+
+
+def recipe_tokens(recipe: dict) -> frozenset:
+    """Ingredients plus category and area, as one comparable set."""
+    tokens = {f"ing:{normalize_ingredient(i)}" for i in recipe["ingredients"]}
+    for field in ("category", "area"):
+        if recipe.get(field):
+            tokens.add(f"{field}:{recipe[field].lower()}")
+    return frozenset(tokens)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class MinHash:
+    """`num_perm` MinHash functions, cut into `bands` for LSH bucketing."""
+
+    def __init__(self, num_perm: int = 64, bands: int = 32, seed: int = 7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, tokens) -> np.ndarray:
+        hashes = np.fromiter(
+            (t if isinstance(t, int) else _token_hash(t) for t in tokens),
+            dtype=np.uint64, count=len(tokens),
+        )
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+    def band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows].tobytes()
+
+
+class SimilarityIndex:
+    """MinHash/LSH index for "more like this" lookups.
+
+    Each recipe gets a `num_perm` MinHash signature over its tokens. The
+    signature is cut into `bands`; recipes sharing any band land in the
+    same bucket and become candidates, which are then ranked by exact
+    Jaccard similarity. A query only touches its own buckets, so its cost
+    does not grow with the catalog.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 32, seed: int = 7):
+        self.minhash = MinHash(num_perm, bands, seed)
+        self.recipes: list = []
+        self._tokens: list = []
+        self._signatures: list = []
+        self._position: dict = {}
+        self._buckets: dict = {}
+
+    @classmethod
+    def build(cls, recipes: list) -> "SimilarityIndex":
+        index = cls()
+        for recipe in recipes:
+            index.add(recipe)
+        return index
+
+    @property
+    def ids(self):
+        return self._position.keys()
+
+    def __contains__(self, recipe_id) -> bool:
+        return recipe_id in self._position
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def add(self, recipe: dict) -> None:
+        if recipe["id"] in self._position:
+            return
+        tokens = recipe_tokens(recipe)
+        position = len(self.recipes)
+        self._position[recipe["id"]] = position
+        self.recipes.append(recipe)
+        self._tokens.append(tokens)
+        signature = self.minhash.signature(tokens) if tokens else None
+        self._signatures.append(signature)
+        if signature is not None:
+            for key in self.minhash.band_keys(signature):
+                self._buckets.setdefault(key, []).append(position)
+
+    def _query(self, recipe: dict) -> tuple:
+        position = self._position.get(recipe["id"])
+        if position is not None:
+            return self._tokens[position], self._signatures[position]
+        tokens = recipe_tokens(recipe)
+        return tokens, self.minhash.signature(tokens) if tokens else None
+
+    def _candidates(self, signature) -> set:
+        candidates = set()
+        if signature is not None:
+            for key in self.minhash.band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+        return candidates
+
+    def candidates(self, recipe: dict) -> set:
+        """Positions of the recipes sharing a bucket with `recipe`, the
+        only ones a query scores."""
+        return self._candidates(self._query(recipe)[1])
+
+    def similar(self, recipe: dict, k: int = 5) -> list:
+        """Top-k `(score, recipe)` pairs most similar to `recipe`."""
+        tokens, signature = self._query(recipe)
+        scored = [
+            (jaccard(tokens, self._tokens[c]), self.recipes[c])
+            for c in self._candidates(signature)
+            if self.recipes[c]["id"] != recipe["id"]
+        ]
+        return heapq.nlargest(k, scored, key=itemgetter(0))
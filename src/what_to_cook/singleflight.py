@@ -0,0 +1,70 @@
+import threading
+from typing import Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while
+    it is in flight wait for it and get the same result, or the same
+    exception. Nothing is kept once the call finishes, so this is not a
+    cache: a later call for the key runs again.
+    """
+
+    def __init__(self):
+        self._calls: dict = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def waiting(self, key: Hashable) -> int:
+        """Callers currently waiting on the in-flight call for `key`."""
+        with self._lock:
+            call = self._calls.get(key)
+            return call.waiters if call else 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
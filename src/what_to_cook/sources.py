@@ -0,0 +1,285 @@
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from src.what_to_cook.api_client import MealDBClient
+from src.what_to_cook.bulk import (
+    content_hash,
+    format_of,
+    iter_json_array,
+    iter_ndjson,
+    to_recipe,
+)
+from src.what_to_cook.catalog import sync_index
+from src.what_to_cook.data_manager import process_meal
+from src.what_to_cook.dedup import DuplicateIndex
+
+logger = logging.getLogger(__name__)
+
+# A full MealDB crawl is a few hundred governed requests.
+MEALDB_TIMEOUT = 120.0
+LOCAL_TIMEOUT = 30.0
+
+
+class RecipeSource(ABC):
+    """Somewhere catalog recipes come from.
+
+    `fetch` returns the source's recipes in the app's format. Sources
+    are merged by `priority`, lowest first: on a clash of ids or a near
+    duplicate, the record from the earlier source is kept.
+    """
+
+    name = "source"
+    priority = 0
+    timeout = LOCAL_TIMEOUT
+
+    @abstractmethod
+    def fetch(self) -> list:
+        """The source's recipes; may block, and may raise."""
+
+
+class MealDBSource(RecipeSource):
+    name = "mealdb"
+    timeout = MEALDB_TIMEOUT
+
+    def __init__(self, client: Callable[[], MealDBClient] = MealDBClient,
+                 priority: int = 0):
+        self.client = client
+        self.priority = priority
+
+    def fetch(self) -> list:
+        processed = [process_meal(m) for m in self.client().fetch_all_meals()]
+        return [m for m in processed if m is not None]
+
+
+class DirectorySource(RecipeSource):
+    """The .json and .ndjson recipe files of a local directory, in the
+    bulk import format. Records without an id get one from their
+    content, so it is stable across refreshes."""
+
+    def __init__(self, path, priority: int = 1, name: str | None = None,
+                 timeout: float = LOCAL_TIMEOUT):
+        self.path = Path(path)
+        self.priority = priority
+        self.name = name or f"dir:{self.path.name}"
+        self.timeout = timeout
+
+    def _image(self, relative: str) -> bytes:
+        path = (self.path / relative).resolve()
+        if not path.is_relative_to(self.path.resolve()):
+            raise ValueError(f"image outside {self.path}: {relative}")
+        return path.read_bytes()
+
+    def fetch(self) -> list:
+        recipes = []
+        for file in sorted(self.path.iterdir()):
+            fmt = format_of(file.name)
+            if fmt not in ("json", "ndjson"):
+                continue
+            with open(file, encoding="utf-8-sig") as text:
+                parse = iter_json_array if fmt == "json" else iter_ndjson
+                for number, raw in enumerate(parse(text), 1):
+                    try:
+                        if isinstance(raw, Exception):
+                            raise raw
+                        recipe = to_recipe(raw, self._image)
+                    except (ValueError, KeyError, OSError) as e:
+                        logger.warning("%s:%d skipped: %s", file.name,
+                                       number, e)
+                        continue
+                    recipe["id"] = str(raw.get("id") or
+                                       f"local-{content_hash(recipe)}")
+                    recipe["source"] = "local"
+                    recipes.append(recipe)
+        return recipes
+
+
+class CustomRecipeSource(RecipeSource):
+    """A session's own recipes, merged over the shared catalog."""
+
+    name = "custom"
+
+    def __init__(self, recipes: list, priority: int = 1):
+        self.recipes = recipes
+        self.priority = priority
+
+    def fetch(self) -> list:
+        return self.recipes
+
+
+def directory_sources(value: str | None = None) -> list:
+    """A DirectorySource per entry of $COOKTODAY_SOURCE_DIRS, in order
+    after MealDB."""
+    value = os.environ.get("COOKTODAY_SOURCE_DIRS", "") \
+        if value is None else value
+    return [DirectorySource(path, priority=n)
+            for n, path in enumerate(value.split(os.pathsep), 1) if path]
+
+
+def _timed(source: RecipeSource) -> tuple:
+    start = time.monotonic()
+    recipes = source.fetch()
+    return recipes, time.monotonic() - start
+
+
+@dataclass
+class SourceReport:
+    name: str
+    # "ok", "timeout" or "error".
+    status: str
+    # Recipes the source contributed before merging.
+    records: int
+    seconds: float
+    # Records are the source's last good fetch, not this one.
+    stale: bool = False
+    error: str = ""
+
+
+def merge(results: list) -> list:
+    """Recipes of (source, recipes) pairs in priority order, without
+    repeated ids or near duplicates of a recipe an earlier source has."""
+    merged: list = []
+    seen: set = set()
+    index = None
+    for _, recipes in results:
+        fresh = [r for r in recipes if str(r["id"]) not in seen]
+        seen.update(str(r["id"]) for r in fresh)
+        index = DuplicateIndex.build(fresh, parent=index)
+        merged.extend(index.unique())
+    return merged
+
+
+class Federation:
+    """Refreshes every recipe source in parallel into one catalog.
+
+    Each source gets its own deadline. One that misses it, or fails,
+    contributes its last good fetch instead, so a slow source degrades
+    the catalog rather than holding it up; its fetch keeps running and
+    is picked up by the next refresh instead of starting another.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="source")
+        # Fetches whose result no refresh has taken yet.
+        self._running: dict = {}
+        self._last: dict = {}
+        # Reentrant: a done callback added under it runs at once.
+        self._lock = threading.RLock()
+        self.reports: list = []
+
+    def _start(self, source: RecipeSource) -> Future:
+        with self._lock:
+            future = self._running.get(source.name)
+            if future is None:
+                future = self._executor.submit(_timed, source)
+                future.add_done_callback(
+                    lambda f, name=source.name: self._keep(name, f)
+                )
+                self._running[source.name] = future
+            return future
+
+    def _keep(self, name: str, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            with self._lock:
+                self._last[name] = future.result()[0]
+
+    def refresh(self, sources: list) -> list:
+        """Merged recipes of `sources`; `reports` describes each one."""
+        sources = sorted(sources, key=lambda s: s.priority)
+        start = time.monotonic()
+        futures = [(source, self._start(source)) for source in sources]
+        results, reports = [], []
+        for source, future in futures:
+            remaining = start + source.timeout - time.monotonic()
+            try:
+                recipes, seconds = future.result(timeout=max(remaining, 0))
+                report = SourceReport(source.name, "ok", len(recipes),
+                                      seconds)
+            except Exception as e:
+                timeout = isinstance(e, FutureTimeout)
+                with self._lock:
+                    recipes = self._last.get(source.name, [])
+                report = SourceReport(
+                    source.name, "timeout" if timeout else "error",
+                    len(recipes), time.monotonic() - start,
+                    stale=bool(recipes),
+                    error="" if timeout else f"{type(e).__name__}: {e}",
+                )
+                logger.warning("Recipe source %s: %s %s", source.name,
+                               report.status, report.error)
+            if future.done():
+                with self._lock:
+                    self._running.pop(source.name, None)
+            results.append((source, recipes))
+            reports.append(report)
+        self.reports = reports
+        return merge(results)
+
+
+federation = Federation()
+
+
+class SessionFederation:
+    """A session's own sources merged after the shared catalog.
+
+    The catalog is fetched and indexed once per process; a session's
+    sources follow it in priority order under the same rules as `merge`,
+    leaving out clashing ids and near duplicates of an earlier record.
+    Sources are local, so they are fetched inline, and each keeps its
+    DuplicateIndex so a rerun only indexes the recipes it gained.
+    """
+
+    def __init__(self, catalog: DuplicateIndex):
+        self.catalog = catalog
+        self._indexes: dict = {}
+        self.reports: list = []
+
+    def refresh(self, sources: list) -> list:
+        """Recipes `sources` add to the catalog; `reports` describes each
+        one."""
+        merged, reports, indexes = [], [], {}
+        parent = self.catalog
+        for source in sorted(sources, key=lambda s: s.priority):
+            start = time.monotonic()
+            try:
+                recipes = source.fetch()
+                report = SourceReport(source.name, "ok", len(recipes), 0.0)
+            except Exception as e:
+                recipes = []
+                report = SourceReport(source.name, "error", 0, 0.0,
+                                      error=f"{type(e).__name__}: {e}")
+                logger.warning("Recipe source %s: error %s", source.name,
+                               report.error)
+            fresh = [r for r in recipes if not self._known(r["id"], parent)]
+            index = self._indexes.get(source.name)
+            if index is not None and index.parent is not parent:
+                # Built over an older catalog or earlier source.
+                index = None
+            index = sync_index(
+                index, fresh,
+                lambda batch, p=parent: DuplicateIndex.build(batch,
+                                                             parent=p),
+            )
+            merged.extend(index.unique())
+            report.seconds = time.monotonic() - start
+            reports.append(report)
+            indexes[source.name] = parent = index
+        self._indexes = indexes
+        self.reports = reports
+        return merged
+
+    @staticmethod
+    def _known(recipe_id, index: DuplicateIndex | None) -> bool:
+        while index is not None:
+            if recipe_id in index:
+                return True
+            index = index.parent
+        return False
@@ -0,0 +1,125 @@
+import json
+import logging
+import time
+from itertools import count
+
+import streamlit as st
+from streamlit_js_eval import streamlit_js_eval
+
+PENDING_KEY = "storage_pending"
+READ_KEY = "storage_read"
+ITEMS_KEY = "storage_items"
+READ_SINCE_KEY = "storage_read_since"
+# Seconds a session waits for the browser to answer the read before it
+# goes on without saved items (component blocked or failing to load).
+READ_TIMEOUT = 10.0
+# Everything the app keeps in the browser, read together at session start.
+APP_KEYS = ("favorites", "custom_recipes", "all_recipes")
+
+logger = logging.getLogger(__name__)
+
+_sequence = count(1)
+
+
+def _write_js(item_key: str, value: str, seq: int) -> str:
+    # Same layout streamlit-local-storage uses, so items it saved read back.
+    item = json.dumps({item_key: value})
+    return (f"localStorage.setItem({json.dumps(item_key)}, "
+            f"{json.dumps(item)}); {seq}")
+
+
+def _read_js(keys) -> str:
+    # Items are stored as {key: value} under their key; see _write_js.
+    return (f"JSON.stringify(Object.fromEntries({json.dumps(list(keys))}"
+            ".map(k => { try { return [k, JSON.parse("
+            "localStorage.getItem(k))[k]]; } catch (e) { return [k, null]; }"
+            " })))")
+
+
+class BrowserStorage:
+    """Browser localStorage with one batched read and acknowledged writes.
+
+    `read` fetches every app key in a single component round trip and
+    returns None until the browser has answered, so a session can tell
+    "not loaded yet" from "nothing saved". A browser that has not
+    answered within `READ_TIMEOUT` counts as having nothing saved.
+
+    `setItem` only records the latest value per key. `flush` renders one
+    small script per pending write that stores it and answers with the
+    write's sequence number; the write stays pending until that answer
+    comes back, and is re-sent on a later run if it never does. Callers
+    no longer need to sleep before `st.rerun` to let a write land.
+    """
+
+    def __init__(self, keys=APP_KEYS):
+        self.keys = keys
+        self._rendered = set()
+
+    @property
+    def _pending(self) -> dict:
+        if PENDING_KEY not in st.session_state:
+            st.session_state[PENDING_KEY] = {}
+        return st.session_state[PENDING_KEY]
+
+    @property
+    def pending(self) -> list:
+        """Keys whose latest write the browser has not confirmed yet."""
+        return list(self._pending)
+
+    @property
+    def loaded(self) -> bool:
+        return self.read() is not None
+
+    def read(self) -> dict | None:
+        """Saved values of the app keys, or None until the browser has
+        answered the read."""
+        if ITEMS_KEY in st.session_state:
+            return st.session_state[ITEMS_KEY]
+        answer = st.session_state.get(READ_KEY)
+        if answer is None and READ_KEY not in self._rendered:
+            self._rendered.add(READ_KEY)
+            answer = streamlit_js_eval(js_expressions=_read_js(self.keys),
+                                       key=READ_KEY)
+        if answer is None:
+            since = st.session_state.setdefault(READ_SINCE_KEY,
+                                                time.monotonic())
+            if time.monotonic() - since < READ_TIMEOUT:
+                return None
+            logger.warning("Browser storage did not answer; going on "
+                           "without saved items")
+            answer = "{}"
+        items = {key: value for key, value in json.loads(answer).items()
+                 if value is not None}
+        st.session_state[ITEMS_KEY] = items
+        return items
+
+    def getItem(self, item_key: str):
+        return (self.read() or {}).get(item_key)
+
+    def release(self) -> None:
+        """Forget the values read, once the session holds its own copies;
+        the storage stays loaded."""
+        st.session_state[ITEMS_KEY] = {}
+
+    def setItem(self, item_key: str, value: str) -> None:
+        self._pending[item_key] = {"seq": next(_sequence), "value": value}
+
+    def flush(self) -> None:
+        """Send pending writes and drop the ones the browser confirmed."""
+        pending = self._pending
+        for item_key, write in list(pending.items()):
+            component_key = f"storage_{item_key}_{write['seq']}"
+            if st.session_state.get(component_key) == write["seq"]:
+                del pending[item_key]
+                continue
+            # A script run may flush more than once; one write per key.
+            if component_key in self._rendered:
+                continue
+            self._rendered.add(component_key)
+            ack = streamlit_js_eval(
+                js_expressions=_write_js(item_key, write["value"],
+                                         write["seq"]),
+                key=component_key,
+            )
+            if ack == write["seq"]:
+                del pending[item_key]
@@ -0,0 +1,39 @@
+from pytest import fixture
+
+from src.what_to_cook.api_client import MealDBClient, ResponseCache
+from src.what_to_cook.cards import cards
+from src.what_to_cook.discovery import random_meals
+from src.what_to_cook.governor import RequestGovernor
+from src.what_to_cook.singleflight import SingleFlight
+
+
+@fixture(autouse=True)
+def fresh_governor(monkeypatch):
+    # The governor, cache and flights are process-wide; give each test
+    # its own, without the rate limit so mocked crawls do not sleep.
+    governor = RequestGovernor(rate=None)
+    monkeypatch.setattr(MealDBClient, "governor", governor)
+    monkeypatch.setattr(MealDBClient, "cache", ResponseCache())
+    monkeypatch.setattr(MealDBClient, "flights", SingleFlight())
+    return governor
+
+
+@fixture(autouse=True)
+def data_dir(monkeypatch, tmp_path):
+    # Keep the shared catalog store out of the real cache directory.
+    monkeypatch.setenv("COOKTODAY_DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+@fixture(autouse=True)
+def fresh_cards():
+    # Rendered cards are cached process-wide by recipe id, which tests
+    # reuse for different recipes.
+    cards.clear()
+
+
+@fixture(autouse=True)
+def idle_random_meals(monkeypatch):
+    # Sessions start the process-wide buffer, which would fetch from the
+    # real MealDB in the background.
+    monkeypatch.setattr(random_meals, "start", lambda: None)
@@ -41,3 +41,30 @@ def test_fetch_all_meals(client, mocked_requests):
 def test_get_meal_details(client, mocked_requests, mocked_client_url):
     client.get_meal_details(1)
     mocked_requests.get.assert_called_with("testlookup.php?i=1", timeout=10)
+
+
+def test_open_circuit_serves_cached_payload(client, mocked_requests,
+                                            fresh_governor):
+    mocked_requests.get.return_value.json.return_value = {"meals": [
+        {"idMeal": "1"}
+    ]}
+    assert client.fetch_meals_by_first_letter("a") == [{"idMeal": "1"}]
+
+    for _ in range(fresh_governor.breaker.failure_threshold):
+        fresh_governor.breaker.record_failure()
+    mocked_requests.get.reset_mock()
+
+    assert client.fetch_meals_by_first_letter("a") == [{"idMeal": "1"}]
+    assert client.fetch_meals_by_first_letter("b") == []
+    mocked_requests.get.assert_not_called()
+
+
+def test_server_errors_trip_the_breaker(client, mocked_requests,
+                                        fresh_governor):
+    mocked_requests.get.return_value.ok = False
+    mocked_requests.get.return_value.status_code = 503
+
+    for _ in range(fresh_governor.breaker.failure_threshold):
+        client.fetch_random_meal()
+
+    assert fresh_governor.breaker.state.value == "open"
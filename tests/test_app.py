@@ -6,18 +6,15 @@ app = None
 
 @pytest.fixture(autouse=True)
 def setup_imports():
-    with (
-        patch("streamlit.session_state", new_callable=MagicMock),
-        patch("streamlit_local_storage.LocalStorage") as mock_local_storage,
-    ):
+    with patch("streamlit.session_state", new_callable=MagicMock):
         mock_storage_instance = MagicMock()
         mock_storage_instance.getItem.side_effect = lambda key: "[]"
-        mock_local_storage.return_value = mock_storage_instance
 
         global app
         import app
 
-        yield
+        with patch.object(app, "local_storage", mock_storage_instance):
+            yield
 
 
 @pytest.fixture
@@ -118,14 +115,16 @@ def test_show_recipe_favorite_toggle(mock_session_state):
         patch("app.st.markdown"),
         patch("app.st.image"),
         patch("app.st.expander"),
-        patch("app.st.button"),
+        patch("app.st.button") as mock_button,
         patch("app.st.toast"),
         patch("app.save_favorites") as mock_save,
     ):
         app.show_recipe(recipe, False)
 
-        mock_session_state["favorites"].append(recipe)
+        click = mock_button.call_args.kwargs
+        click["on_click"](*click["args"])
         mock_save.assert_called_once()
+        assert mock_session_state.favorites == [recipe]
 
 
 def test_create_custom_recipe():
@@ -1,11 +1,17 @@
 import io
 import os
 
-from pytest import fixture, mark
+from pytest import fixture, mark, raises
 from PIL import Image
 from unittest.mock import patch, MagicMock
 
 
+class State(dict):
+    """Session state that, like Streamlit's, takes attribute access."""
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
 @fixture(autouse=True)
 def envs():
     os.environ["TESTING"] = "true"
@@ -181,3 +187,401 @@ def test_render_custom_recipes(
 
     mocked_streamlit.title.assert_called_with("📝 Custom Recipes")
     mocked_save_custom_recipes.assert_called()
+
+
+def test_render_pantry_ranks_recipes(mocked_streamlit):
+    from app import render_pantry
+
+    recipes = [
+        {"ingredients": ["rice", "egg"], "name": "Fried rice", "id": "p1"},
+        {"ingredients": ["egg"], "name": "Boiled egg", "id": "p2"},
+    ]
+    mocked_streamlit.multiselect.side_effect = [["egg"], []]
+
+    ranked = render_pantry(recipes, ["egg", "rice"])
+
+    assert [r["id"] for r in ranked] == ["p2", "p1"]
+    mocked_streamlit.markdown.assert_called()
+
+
+def test_sync_catalog_adopts_shared_version(mocked_streamlit, mocker):
+    from app import sync_catalog
+    from src.what_to_cook.catalog_store import shared_store
+
+    shared_store().publish([{"id": "s1", "name": "Shared", "ingredients": []}])
+    fetch = mocker.patch("app.fetch_catalog")
+    mocked_save_all = mocker.patch("app.save_all")
+    mocked_streamlit.session_state.get.return_value = None
+
+    sync_catalog()
+
+    fetch.assert_not_called()
+    assert mocked_streamlit.session_state.all_meals[0]["id"] == "s1"
+    mocked_save_all.assert_called_once()
+
+
+def test_sync_catalog_refreshes_empty_store(mocked_streamlit, mocker):
+    from app import sync_catalog
+    from src.what_to_cook.catalog_store import shared_store
+
+    mocker.patch("app.fetch_catalog", return_value=[
+        {"id": "f1", "name": "Fresh", "ingredients": []}
+    ])
+    mocker.patch("app.save_all")
+
+    sync_catalog()
+
+    version, _ = shared_store().head()
+    assert shared_store().load(version)[0]["id"] == "f1"
+
+
+def test_render_meal_plan_shows_week(mocked_streamlit):
+    from app import render_meal_plan
+
+    recipes = [
+        {"ingredients": ["rice", "egg"], "name": "Fried rice", "id": "m1"},
+        {"ingredients": ["egg"], "name": "Boiled egg", "id": "m2"},
+        {"ingredients": ["beef", "onion"], "name": "Stew", "id": "m3"},
+    ]
+    state = mocked_streamlit.session_state
+    state.get.side_effect = lambda key, default=None: getattr(state, key)
+    mocked_streamlit.slider.return_value = 2
+    mocked_streamlit.multiselect.return_value = []
+    mocked_streamlit.number_input.return_value = 2
+    mocked_streamlit.button.return_value = True
+
+    render_meal_plan(recipes)
+
+    assert {r["id"] for r in state.meal_plan.recipes} == {"m1", "m2"}
+    week, shopping = [c.args[0] for c in
+                      mocked_streamlit.markdown.call_args_list]
+    assert "**Monday:**" in week and "**Tuesday:**" in week
+    assert shopping == "- egg: as needed\n- rice: as needed\n"
+    assert mocked_streamlit.download_button.call_count == 2
+
+
+@mark.usefixtures("mocked_save_favorites")
+def test_render_browse_ranks_by_relevance(mocked_streamlit,
+                                          mocked_show_recipe):
+    from app import render_browse
+
+    recipes = [
+        {"ingredients": ["pork"], "name": "Pulled pork", "id": "b1",
+         "instructions": "Use the slow cooker.", "source": "api"},
+        {"ingredients": ["beans"], "name": "Slow cooker chilli",
+         "id": "b2", "instructions": "", "source": "api"},
+        {"ingredients": ["eggs"], "name": "Omelette", "id": "b3",
+         "instructions": "Whisk.", "source": "api"},
+    ]
+    mocked_streamlit.text_input.return_value = "slow cooker"
+    mocked_streamlit.pills.return_value = []
+    mocked_streamlit.multiselect.return_value = []
+
+    render_browse(recipes)
+
+    shown = [c.args[0]["id"] for c in mocked_show_recipe.call_args_list]
+    assert shown == ["b2", "b1"]
+    mocked_streamlit.caption.assert_any_call(
+        "Use the **slow** **cooker.**"
+    )
+
+
+def test_ingredient_picker_offers_suggestions(mocked_streamlit):
+    from app import ingredient_picker
+    from src.what_to_cook.fuzzy import IngredientLookup
+
+    lookup = IngredientLookup({"tomato": 3, "salt": 5, "rice": 1})
+    labels = {"tomato": "Tomato", "salt": "Salt", "rice": "Rice"}
+    state = mocked_streamlit.session_state
+    state.get.return_value = ["salt"]
+    mocked_streamlit.text_input.return_value = "tomatoe"
+
+    ingredient_picker("Include ingredients", lookup, labels, "home_include")
+
+    args, kwargs = mocked_streamlit.multiselect.call_args
+    assert args[1] == ["salt", "tomato"]
+    assert kwargs["default"] == ["salt"]
+
+
+def test_render_custom_recipes_uses_catalog_spelling(
+    mocked_streamlit, mocked_save_custom_recipes
+):
+    from app import render_custom_recipes
+
+    state = mocked_streamlit.session_state
+    state.all_meals = [{"ingredients": ["Tomato", "Chili"], "id": "c1"}]
+    state.custom_recipes = []
+    mocked_streamlit.form_submit_button.return_value = True
+    mocked_streamlit.file_uploader.return_value = None
+    mocked_streamlit.text_area.side_effect = ["Tomatoes\nCHILI\nbasil",
+                                              "Mix"]
+
+    render_custom_recipes()
+
+    assert state.custom_recipes[0]["ingredients"] == [
+        "tomato", "chili", "basil"
+    ]
+
+
+def test_show_recipe_hydrates_summary_when_opened(mocked_streamlit, mocker):
+    from app import show_recipe
+
+    hydrate = mocker.patch("app.details.hydrate", return_value={
+        "id": "s1", "name": "Soup", "ingredients": ["leek"],
+        "measures": ["2"], "instructions": "Simmer.",
+    })
+    summary = {"id": "s1", "name": "Soup", "ingredients": ["leek"],
+               "summary": True}
+    mocked_streamlit.toggle.return_value = True
+    mocker.patch("app.similar_recipes", return_value=[])
+
+    show_recipe(summary)
+
+    hydrate.assert_called_once_with(summary)
+    mocked_streamlit.markdown.assert_any_call("- Leek: 2")
+    mocked_streamlit.markdown.assert_any_call("Simmer.")
+    click = mocked_streamlit.button.call_args.kwargs
+    assert click["args"] == (summary,)
+
+
+def test_import_upload_saves_new_recipes_once(
+    mocked_streamlit, mocked_save_custom_recipes
+):
+    from app import import_upload
+
+    state = mocked_streamlit.session_state
+    state.all_meals = [{"id": "a1", "name": "Toast", "ingredients": ["bread"]}]
+    state.custom_recipes = []
+    upload = io.BytesIO(b'{"name": "Toast", "ingredients": ["Bread"]}\n'
+                        b'{"name": "Soup", "ingredients": ["leek"]}\n'
+                        b'{"name": "Stew", "ingredients": ["beef"]}\n')
+    upload.name, upload.size = "recipes.ndjson", len(upload.getvalue())
+
+    import_upload(upload)
+
+    assert [r["name"] for r in state.custom_recipes] == ["Soup", "Stew"]
+    mocked_save_custom_recipes.assert_called_once()
+    mocked_streamlit.success.assert_called_once_with(
+        "Imported 2 recipes, skipped 1 duplicates"
+    )
+
+
+def test_export_is_built_only_when_downloaded(mocked_streamlit, mocker):
+    from app import render_bulk_transfer
+
+    recipes = [{"id": "c1", "name": "Mine", "ingredients": ["egg"]}]
+    mocked_streamlit.session_state = State(custom_recipes=recipes)
+    mocked_streamlit.file_uploader.return_value = None
+    mocked_streamlit.radio.return_value = "json"
+    export = mocker.patch("app.export_recipes", return_value=b"[]")
+
+    render_bulk_transfer()
+
+    export.assert_not_called()
+    data = mocked_streamlit.download_button.call_args.args[1]
+    assert data() == b"[]"
+    export.assert_called_once_with(recipes, "json")
+
+
+def test_merged_recipes_hides_custom_copies(mocked_streamlit):
+    from app import merged_recipes
+
+    state = mocked_streamlit.session_state
+    state.all_meals = [{"id": "a1", "name": "Pancakes",
+                        "ingredients": ["Flour", "Egg", "Milk"]}]
+    state.custom_recipes = [
+        {"id": "c1", "name": "pancakes", "ingredients": ["milk", "egg",
+                                                         "flour"]},
+        {"id": "c2", "name": "Granola", "ingredients": ["oats", "honey"]},
+    ]
+
+    assert [r["id"] for r in merged_recipes()] == ["a1", "c2"]
+
+
+def test_main_profiles_rerun_when_requested(mocked_streamlit, mocker,
+                                            tmp_path, monkeypatch):
+    from app import main
+    from src.what_to_cook.profiler import section
+
+    monkeypatch.setenv("COOKTODAY_PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("COOKTODAY_ADMIN", "1")
+    mocked_streamlit.query_params = {"profile": "1"}
+
+    def render_app():
+        with section("render"):
+            pass
+
+    mocker.patch("app.render_app", side_effect=render_app)
+    render_profile = mocker.patch("app.render_profile")
+
+    main()
+
+    result = render_profile.call_args.args[0]
+    assert result.sections["render"][0] == 1
+    assert len(list(tmp_path.glob("*.prof"))) == 1
+
+
+def test_surprise_me_takes_unseen_meal(mocked_streamlit, mocker):
+    from app import surprise_me
+
+    mocked_streamlit.session_state = {"surprise_history": ["1"]}
+    take = mocker.patch("app.random_meals.take",
+                        return_value={"id": "2", "name": "Stew"})
+
+    surprise_me()
+
+    assert take.call_args.args[0] == {"1"}
+    assert mocked_streamlit.session_state["current_recipe"]["id"] == "2"
+    assert mocked_streamlit.session_state["surprise_history"] == ["1", "2"]
+
+    take.return_value = None
+    surprise_me()
+    mocked_streamlit.warning.assert_called_once()
+
+
+def test_main_waits_for_browser_storage(mocked_streamlit, mocker):
+    from app import main
+
+    mocked_streamlit.session_state = {}
+    mocked_streamlit.stop.side_effect = SystemExit
+    mocker.patch("app.local_storage").loaded = False
+    sync = mocker.patch("app.sync_catalog")
+
+    with raises(SystemExit):
+        main()
+
+    sync.assert_not_called()
+    assert "initialized" not in mocked_streamlit.session_state
+
+
+def test_new_session_starts_filling_surprise_buffer(mocked_streamlit,
+                                                    mocker):
+    from app import render_app
+    from src.what_to_cook.discovery import RandomMealBuffer
+
+    buffer = mocker.patch("app.random_meals", RandomMealBuffer(
+        lambda: {"id": "1", "name": "Stew"}, size=1, low_water=1
+    ))
+    mocked_streamlit.session_state = State()
+    mocker.patch("app.local_storage").loaded = True
+    mocker.patch("app.sync_catalog")
+    mocker.patch("app.load_all", return_value=[])
+    mocker.patch("app.load_favorites", return_value=[])
+    mocker.patch("app.load_custom_recipes", return_value=[])
+
+    render_app()
+
+    try:
+        with buffer._changed:
+            assert buffer._changed.wait_for(lambda: len(buffer._ready), 5)
+    finally:
+        buffer.stop()
+
+
+def test_fetch_catalog_adds_local_recipe_directories(mocker, monkeypatch,
+                                                     tmp_path):
+    from app import fetch_catalog
+
+    client = mocker.patch("app.MealDBClient")
+    client.return_value.fetch_all_meals.return_value = []
+    (tmp_path / "family.json").write_text(
+        '[{"id": "f1", "name": "Gran\'s pie", "ingredients": ["apple"]}]'
+    )
+    monkeypatch.setenv("COOKTODAY_SOURCE_DIRS", str(tmp_path))
+
+    assert [r["id"] for r in fetch_catalog()] == ["f1"]
+
+
+def test_session_lists_are_indexed_apart_from_catalog(mocked_streamlit,
+                                                      mocker):
+    from app import FacetIndex, IndexCache, recipe_index
+
+    shared = mocker.patch("app.indexes", IndexCache())
+    catalog = [{"id": "local-1", "name": "Old name", "category": "Beef",
+                "ingredients": ["beef"]}]
+    custom = {"id": "c1", "name": "Mine", "ingredients": ["egg"],
+              "source": "custom"}
+    mocked_streamlit.session_state = State(all_meals=catalog,
+                                           catalog_version=None)
+
+    index = recipe_index("facets", list(catalog), FacetIndex)
+    recipe_index("facets", catalog + [custom], FacetIndex)
+
+    # The catalog's index and the positions its recipes key by.
+    assert len(shared) == 2
+    assert len(mocked_streamlit.session_state["indexes"]) == 1
+
+    # Same ids, new content: the catalog is indexed again.
+    edited = [dict(catalog[0], name="New name", category="Pork")]
+    mocked_streamlit.session_state.all_meals = edited
+    fresh = recipe_index("facets", edited, FacetIndex)
+    assert fresh is not index
+    assert fresh.recipes_in(fresh.everything())[0]["name"] == "New name"
+
+
+def test_render_mealdb_stats_shows_client_metrics(mocked_streamlit,
+                                                  fresh_governor):
+    from app import MealDBClient, render_mealdb_stats
+
+    MealDBClient.flights.coalesced = 3
+    for _ in range(fresh_governor.breaker.failure_threshold):
+        fresh_governor.breaker.record_failure()
+
+    render_mealdb_stats()
+
+    stats, transitions = (c.args[0] for c in
+                          mocked_streamlit.dataframe.call_args_list)
+    assert stats[0]["Circuit"] == "open"
+    assert stats[0]["Coalesced"] == 3
+    assert (transitions[0]["From"], transitions[0]["To"]) == \
+        ("closed", "open")
+
+
+def test_account_memory_bills_overlay_not_shared_parent(mocked_streamlit,
+                                                        mocker):
+    from app import IndexCache, account_memory, merged_recipes
+    from src.what_to_cook.memory import MemoryLedger, deep_size
+
+    ledger = mocker.patch("app.ledger", MemoryLedger())
+    mocker.patch("app.indexes", IndexCache())
+    mocker.patch("app.get_script_run_ctx").return_value.session_id = "s1"
+    catalog = [{"id": str(i), "name": f"Dish {i}",
+                "ingredients": [f"item {i}", f"item {i + 1}"]}
+               for i in range(300)]
+    mocked_streamlit.session_state = State(
+        all_meals=catalog, catalog_version=1, favorites=[],
+        custom_recipes=[{"id": "c1", "name": "Mine", "ingredients": ["egg"],
+                         "source": "custom"}],
+    )
+    merged_recipes()
+    parent = mocked_streamlit.session_state["session_sources"].catalog
+
+    account_memory()
+
+    billed = ledger.report("s1").sizes["session_sources"]
+    assert billed < deep_size(parent) / 10
+
+
+def test_session_lists_hash_only_their_own_recipes(mocked_streamlit,
+                                                   mocker):
+    from app import FacetIndex, IndexCache, catalog_key, recipe_index
+
+    mocker.patch("app.indexes", IndexCache())
+    catalog = [{"id": str(i), "name": f"Dish {i}", "ingredients": ["salt"]}
+               for i in range(50)]
+    custom = {"id": "c1", "name": "Mine", "ingredients": ["egg"],
+              "source": "custom"}
+    mocked_streamlit.session_state = State(all_meals=catalog,
+                                           catalog_version=1)
+    catalog_key()
+    digest = mocker.spy(__import__("app"), "catalog_version")
+
+    index = recipe_index("facets", catalog + [custom], FacetIndex)
+    assert recipe_index("facets", catalog + [custom], FacetIndex) is index
+    assert recipe_index("facets", catalog[1:] + [custom],
+                        FacetIndex) is not index
+    edited = dict(custom, name="Yours")
+    assert recipe_index("facets", catalog + [edited],
+                        FacetIndex) is not index
+
+    assert all(len(c.args[0]) == 1 for c in digest.call_args_list)
@@ -0,0 +1,160 @@
+import base64
+import csv
+import io
+import json
+import os
+import zipfile
+
+from PIL import Image
+from pytest import fixture, raises
+
+from src.what_to_cook.bulk import (
+    content_hash, export_recipes, format_of, import_recipes,
+    iter_json_array,
+)
+
+
+@fixture
+def photo():
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), "green").save(buffer, format="PNG")
+    return "data:image/png;base64," + \
+        base64.b64encode(buffer.getvalue()).decode()
+
+
+@fixture
+def recipes(photo):
+    return [
+        {"id": "1", "name": "Leek Soup", "ingredients": ["leek", "stock"],
+         "measures": ["2", "1 l"], "instructions": "Simmer.",
+         "image_url": photo, "category": "Soup", "area": "Welsh"},
+        {"id": "2", "name": "Toast", "ingredients": ["bread"],
+         "measures": [""], "instructions": "Toast it.", "image_url": None,
+         "category": "Custom", "area": "Personal"},
+    ]
+
+
+def imported(data: bytes, fmt: str, **kwargs):
+    return import_recipes(io.BytesIO(data), fmt, **kwargs)
+
+
+def test_json_array_is_decoded_across_chunks():
+    text = io.StringIO(' [ {"name": "a", "tags": ["x, y]"]} ,\n{"name": "b"}]')
+
+    assert list(iter_json_array(text, chunk_size=3)) == [
+        {"name": "a", "tags": ["x, y]"]}, {"name": "b"}
+    ]
+
+
+def test_json_must_be_an_array():
+    with raises(ValueError):
+        list(iter_json_array(io.StringIO('{"name": "a"}')))
+    with raises(ValueError):
+        list(iter_json_array(io.StringIO('[{"name": "a"}')))
+
+
+def test_round_trip_every_format(recipes):
+    for fmt in ("json", "ndjson", "csv", "zip"):
+        result = imported(export_recipes(recipes, fmt), fmt)
+
+        assert [r["name"] for r in result.recipes] == ["Leek Soup", "Toast"]
+        soup = result.recipes[0]
+        assert soup["ingredients"] == ["leek", "stock"]
+        assert soup["measures"] == ["2", "1 l"]
+        assert soup["image_url"].startswith("data:image/png;base64,")
+        assert soup["source"] == "custom" and soup["id"] != "1"
+
+
+def test_csv_round_trip_keeps_large_photo(recipes):
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", (200, 200), os.urandom(120000)).save(
+        buffer, format="PNG"
+    )
+    recipes[0]["image_url"] = "data:image/png;base64," + \
+        base64.b64encode(buffer.getvalue()).decode()
+    assert len(recipes[0]["image_url"]) > 131072
+
+    result = imported(export_recipes(recipes, "csv"), "csv")
+
+    assert [r["name"] for r in result.recipes] == ["Leek Soup", "Toast"]
+    assert len(result.recipes[0]["image_url"]) > 131072
+
+
+def test_csv_errors_are_reported_as_value_errors(mocker):
+    rows = mocker.patch("src.what_to_cook.bulk.csv.DictReader").return_value
+    rows.__next__.side_effect = csv.Error("field larger than field limit")
+
+    with raises(ValueError, match="field limit"):
+        imported(b"name\nSoup\n", "csv")
+
+
+def test_zip_keeps_images_as_files(recipes):
+    archive = zipfile.ZipFile(io.BytesIO(export_recipes(recipes, "zip")))
+
+    assert sorted(archive.namelist()) == ["images/00000.png",
+                                          "recipes.ndjson"]
+    assert b"images/00000.png" in archive.read("recipes.ndjson")
+
+
+def test_duplicates_are_skipped_against_existing_and_earlier_rows():
+    rows = [{"name": "Leek  soup", "ingredients": ["Stock", "Leek"]},
+            {"name": "Toast", "ingredients": ["bread"]},
+            {"name": "toast", "ingredients": ["Bread"]}]
+    data = "".join(json.dumps(r) + "\n" for r in rows).encode()
+    existing = [{"name": "Leek Soup", "ingredients": ["leek", "stock"]}]
+
+    result = imported(data, "ndjson", existing=existing)
+
+    assert [r["name"] for r in result.recipes] == ["Toast"]
+    assert result.duplicates == 2
+    assert content_hash(rows[1]) == content_hash(rows[2])
+
+
+def test_bad_records_are_reported_and_skipped():
+    data = b'{"name": "a"}\n{oops\n[1]\n{"ingredients": ["x"]}\n'
+
+    result = imported(data, "ndjson")
+
+    assert [r["name"] for r in result.recipes] == ["a"]
+    assert result.failed == 3
+    assert result.errors[2] == "Record 4: recipe has no name"
+
+
+def test_csv_lists_split_on_newlines_or_semicolons():
+    data = b"Name,Ingredients,Measures\nStew,Beef; Onion,500 g;2\n"
+
+    recipe = imported(data, "csv").recipes[0]
+
+    assert recipe["ingredients"] == ["beef", "onion"]
+    assert recipe["measures"] == ["500 g", "2"]
+
+
+def test_ingredients_are_mapped_onto_vocabulary():
+    from src.what_to_cook.fuzzy import IngredientLookup
+
+    lookup = IngredientLookup({"tomato": 3})
+    data = b'{"name": "Soup", "ingredients": ["Tomatoes", "tomato"]}\n'
+
+    recipe = imported(data, "ndjson", lookup=lookup).recipes[0]
+
+    assert recipe["ingredients"] == ["tomato"]
+
+
+def test_progress_reports_bytes_read(mocker):
+    data = b"".join(json.dumps({"name": f"r{i}"}).encode() + b"\n"
+                    for i in range(250))
+    progress = mocker.Mock()
+
+    imported(data, "ndjson", progress=progress, size=len(data))
+
+    assert progress.call_count == 3
+    progress.assert_called_with(len(data), len(data))
+
+
+def test_unknown_formats_are_rejected():
+    assert format_of("recipes.JSONL") == "ndjson"
+    assert format_of("recipes.txt") is None
+    with raises(ValueError):
+        imported(b"", None)
+    with raises(ValueError):
+        imported(b"not a zip", "zip")
@@ -0,0 +1,52 @@
+from src.what_to_cook.cards import CardCache, render_card
+
+
+def test_render_card_joins_each_section():
+    card = render_card({
+        "id": "1", "name": "Soup", "category": "Starter", "area": "French",
+        "ingredients": ["leek", "salt"], "measures": ["2", ""],
+        "instructions": "Simmer.",
+    })
+
+    assert card.facts == "**Category:** Starter  \n**Cuisine:** French"
+    assert card.ingredients == "- Leek: 2\n- Salt"
+    assert card.instructions == "Simmer."
+
+
+def test_render_card_tolerates_missing_fields():
+    card = render_card({"id": "1", "ingredients": ["egg", "milk"],
+                        "measures": ["1"]})
+
+    assert card.facts == "**Category:** N/A  \n**Cuisine:** N/A"
+    assert card.ingredients == "- Egg: 1\n- Milk"
+    assert card.instructions == "No instructions provided"
+
+
+def test_render_card_leaves_out_summary_instructions():
+    card = render_card({"id": "1", "ingredients": ["egg"],
+                        "summary": True})
+
+    assert card.instructions is None
+
+
+def test_card_cache_reuses_cards_per_version(mocker):
+    render = mocker.patch("src.what_to_cook.cards.render_card",
+                          side_effect=render_card)
+    cache = CardCache()
+    recipe = {"id": "1", "ingredients": ["egg"]}
+
+    first = cache.card(recipe, "v1")
+    assert cache.card(dict(recipe), "v1") is first
+    cache.card(recipe, "v2")
+    cache.card({**recipe, "summary": True}, "v2")
+
+    assert render.call_count == 3
+
+
+def test_card_cache_evicts_least_recently_used():
+    cache = CardCache(maxsize=2)
+    for recipe_id in ("1", "2", "1", "3"):
+        cache.card({"id": recipe_id, "ingredients": []}, "v1")
+
+    assert len(cache) == 2
+    assert ("2", "v1", False) not in cache._data
@@ -0,0 +1,83 @@
+import subprocess
+import sys
+import textwrap
+
+from pytest import fixture
+
+from src.what_to_cook.catalog_store import CatalogStore, shared_store
+
+
+@fixture
+def store(tmp_path):
+    return CatalogStore(tmp_path / "catalog.sqlite3")
+
+
+def test_empty_store_has_no_version(store):
+    assert store.head() == (None, None)
+
+
+def test_publish_makes_new_version_current(store):
+    first = store.publish([{"id": "1", "name": "Soup"}])
+    second = store.publish([{"id": "2", "name": "Stew"},
+                            {"id": "3", "name": "Pie"}])
+
+    version, published_at = store.head()
+    assert (first, second, version) == (1, 2, 2)
+    assert published_at > 0
+    assert [r["id"] for r in store.load(version)] == ["2", "3"]
+    assert store.load(first) == []
+
+
+def test_other_process_sees_published_version(store):
+    script = textwrap.dedent(f"""
+        from src.what_to_cook.catalog_store import CatalogStore
+        store = CatalogStore({str(store.path)!r})
+        store.publish([{{"id": "x", "name": "From elsewhere"}}])
+    """)
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+    version, _ = store.head()
+    assert store.load(version) == [{"id": "x", "name": "From elsewhere"}]
+
+
+def test_load_is_shared_within_process(store):
+    version = store.publish([{"id": "1"}])
+
+    assert store.load(version) is store.load(version)
+
+
+def test_refresh_lock_elects_one_holder(store):
+    with store.refresh_lock() as first:
+        with store.refresh_lock() as second:
+            assert (first, second) == (True, False)
+    with store.refresh_lock() as again:
+        assert again is True
+
+
+def test_shared_store_follows_data_dir(data_dir):
+    assert shared_store() is shared_store()
+    assert shared_store().path == data_dir / "catalog.sqlite3"
+
+
+def test_versions_hold_summaries_and_details_by_id(store):
+    version = store.publish([
+        {"id": "1", "name": "Soup", "ingredients": ["Leek"],
+         "instructions": "Simmer.", "measures": ["2"]},
+        {"id": "2", "name": "Toast"},
+    ])
+
+    assert store.load(version) == [
+        {"id": "1", "name": "Soup", "ingredients": ["Leek"],
+         "summary": True},
+        {"id": "2", "name": "Toast"},
+    ]
+    assert store.details(["1", "2", "3"]) == {
+        "1": {"instructions": "Simmer.", "measures": ["2"]}
+    }
+
+
+def test_publish_drops_details_of_removed_recipes(store):
+    store.publish([{"id": "1", "instructions": "Old"}])
+    store.publish([{"id": "2", "instructions": "New"}])
+
+    assert store.details(["1", "2"]) == {"2": {"instructions": "New"}}
@@ -0,0 +1,100 @@
+from src.what_to_cook.catalog import summarize, sync_index
+from src.what_to_cook.dedup import (
+    BUCKET_LIMIT, DuplicateIndex, fingerprint, is_duplicate,
+)
+
+STEPS = ("Brown the lamb in batches. Add the onions and cook until soft. "
+         "Stir in the spices and tomatoes, then simmer for two hours.")
+
+
+def recipe(id, name, ingredients, instructions="", image_url=None):
+    return {"id": id, "name": name, "ingredients": ingredients,
+            "instructions": instructions, "image_url": image_url}
+
+
+def test_same_dish_spelled_differently_is_duplicate():
+    a = recipe("1", "Lamb Tagine", ["Lamb", "Onions", "Cumin", "Tomatoes"])
+    b = recipe("2", "lamb  tagine!", ["tomato", "onion", "lamb", "cumin"])
+
+    assert is_duplicate(fingerprint(a), fingerprint(b))
+
+
+def test_shared_instructions_catch_renamed_copies():
+    a = recipe("1", "Lamb Tagine", ["lamb", "onion", "cumin", "tomato"],
+               STEPS)
+    b = recipe("2", "Grandma's stew", ["lamb", "onion", "tomato"], STEPS)
+    c = recipe("3", "Grandma's stew", ["lamb", "onion", "tomato"])
+
+    assert is_duplicate(fingerprint(a), fingerprint(b))
+    assert not is_duplicate(fingerprint(a), fingerprint(c))
+
+
+def test_different_dishes_are_kept():
+    a = recipe("1", "Lamb Tagine", ["lamb", "onion", "cumin", "tomato"])
+    b = recipe("2", "Lamb Kebab", ["lamb", "yogurt", "garlic", "mint"])
+    c = recipe("3", "Lamb Tagine", ["chicken", "lemon", "olives"])
+
+    index = DuplicateIndex.build([a, b, c])
+
+    assert index.hidden() == set()
+
+
+def test_cluster_shows_most_complete_record():
+    records = [
+        recipe("1", "Pancakes", ["flour", "egg", "milk"]),
+        recipe("2", "pancakes", ["Flour", "Eggs", "Milk"], STEPS, "x.png"),
+        recipe("3", "Pancakes ", ["milk", "flour", "egg"], STEPS),
+    ]
+
+    index = DuplicateIndex.build(records)
+
+    assert index.hidden() == {"1", "3"}
+    assert [r["id"] for r in index.unique()] == ["2"]
+    assert index.match(recipe("4", "PANCAKES", ["egg", "flour", "milk"])) \
+        is records[1]
+
+
+def test_parent_records_stay_shown():
+    catalog = DuplicateIndex.build([
+        recipe("a1", "Pancakes", ["flour", "egg", "milk"]),
+    ])
+    custom = [recipe("c1", "My pancakes", ["flour", "egg", "milk"],
+                     STEPS, "x.png"),
+              recipe("c2", "Granola", ["oats", "honey"])]
+
+    overlay = sync_index(None, custom,
+                         lambda rs: DuplicateIndex.build(rs, catalog))
+    custom.append(recipe("c3", "granola", ["Honey", "Oats"]))
+    same = sync_index(overlay, custom,
+                      lambda rs: DuplicateIndex.build(rs, catalog))
+
+    assert same is overlay
+    assert overlay.hidden() == {"c1", "c3"}
+    assert catalog.hidden() == set()
+
+
+def test_bucket_cap_bounds_comparisons():
+    # Every recipe shares the name bucket; only the most recent few of
+    # a bucket are compared, so inserts stay constant-time.
+    index = DuplicateIndex.build([
+        recipe(str(i), "Soup", [f"a{i}", f"b{i}", f"c{i}"])
+        for i in range(400)
+    ])
+    probe = fingerprint(recipe("x", "Soup", ["a1", "b1", "c1"]))
+
+    assert len(index._candidates(probe)) <= BUCKET_LIMIT * len(probe.keys)
+    assert index.hidden() == set()
+
+
+def test_summaries_are_fingerprinted_from_hydrated_text():
+    full = recipe("a1", "Lamb Tagine", ["lamb", "onion", "cumin", "tomato"],
+                  STEPS)
+    summary = summarize(full)
+    copy = recipe("c1", "Grandma's stew", ["lamb", "onion", "tomato"], STEPS)
+
+    catalog = DuplicateIndex.build([summary], hydrate=lambda batch: [full])
+    unhydrated = DuplicateIndex.build([summary])
+
+    assert catalog.recipes == [summary]
+    assert DuplicateIndex.build([copy], catalog).hidden() == {"c1"}
+    assert DuplicateIndex.build([copy], unhydrated).hidden() == set()
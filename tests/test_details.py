@@ -0,0 +1,99 @@
+from pytest import fixture
+
+from src.what_to_cook.catalog import summarize
+from src.what_to_cook.catalog_store import shared_store
+from src.what_to_cook.details import DetailCache, load_details
+
+
+@fixture
+def full():
+    return [{"id": str(i), "name": f"Recipe {i}", "ingredients": ["Salt"],
+             "instructions": f"Step {i}", "measures": ["1 tsp"]}
+            for i in range(4)]
+
+
+@fixture
+def load(mocker, full):
+    by_id = {r["id"]: {"instructions": r["instructions"],
+                       "measures": r["measures"]} for r in full}
+    return mocker.Mock(side_effect=lambda ids, remote: {
+        i: by_id[i] for i in ids if i in by_id
+    })
+
+
+def test_hydrate_restores_full_recipe(load, full):
+    cache = DetailCache(load)
+
+    assert cache.hydrate(summarize(full[0])) == full[0]
+    assert cache.hydrate(summarize(full[0])) == full[0]
+    load.assert_called_once_with(["0"], remote=True)
+
+
+def test_hydrate_many_loads_missing_in_one_batch(load, full):
+    cache = DetailCache(load)
+    cache.hydrate(summarize(full[1]))
+
+    assert cache.hydrate_many([summarize(r) for r in full]) == full
+    load.assert_called_with(["0", "2", "3"], remote=True)
+
+
+def test_full_recipes_pass_through(load, full):
+    assert DetailCache(load).hydrate(full[2]) is full[2]
+    load.assert_not_called()
+
+
+def test_cache_keeps_recently_viewed(load, full):
+    cache = DetailCache(load, maxsize=2)
+    for recipe in full[:3]:
+        cache.hydrate(summarize(recipe))
+    cache.hydrate(summarize(full[0]))
+
+    assert len(cache) == 2
+    assert load.call_count == 4
+
+
+def test_bulk_reads_do_not_fill_cache(load, full):
+    cache = DetailCache(load)
+    cache.hydrate_many([summarize(r) for r in full], remember=False)
+
+    assert len(cache) == 0
+    assert load.call_args.kwargs == {"remote": False}
+
+
+def test_adopting_new_version_clears_cache(load, full):
+    cache = DetailCache(load)
+    cache.adopt(1)
+    cache.hydrate(summarize(full[0]))
+    cache.adopt(1)
+    assert len(cache) == 1
+    cache.adopt(2)
+    assert len(cache) == 0
+
+
+def test_unknown_recipe_hydrates_without_details(load):
+    recipe = summarize({"id": "9", "instructions": "x"})
+
+    assert DetailCache(load).hydrate(recipe) == {"id": "9"}
+    assert recipe["summary"] is True
+
+
+def test_load_details_asks_mealdb_only_for_opened_mealdb_recipes(mocker):
+    client = mocker.patch("src.what_to_cook.details.MealDBClient")
+    client.return_value.get_meal_details.return_value = {
+        "idMeal": "52772", "strMeal": "Teriyaki Chicken",
+        "strMealThumb": "http://x/t.jpg",
+        "strInstructions": "Cook.", "strIngredient1": "Chicken",
+        "strMeasure1": "2",
+    }
+    shared_store().publish([{"id": "1", "name": "Stew", "ingredients": [],
+                             "instructions": "Simmer."}])
+
+    assert load_details(["1", "52772", "local-ab"], remote=False) == {
+        "1": {"instructions": "Simmer."},
+    }
+    client.return_value.get_meal_details.assert_not_called()
+
+    found = load_details(["1", "52772", "local-ab"])
+    assert found["52772"]["instructions"] == "Cook."
+    assert "local-ab" not in found
+    client.return_value.get_meal_details.assert_called_once_with("52772")
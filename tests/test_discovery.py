@@ -0,0 +1,116 @@
+import itertools
+import threading
+
+from pytest import fixture
+
+from src.what_to_cook.discovery import RandomMealBuffer, fetch_random_recipe
+
+
+class FakeFetch:
+    def __init__(self, ids):
+        self.ids = iter(ids)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            recipe_id = next(self.ids, None)
+        if isinstance(recipe_id, Exception):
+            raise recipe_id
+        return None if recipe_id is None else {"id": recipe_id}
+
+
+@fixture
+def buffers():
+    started = []
+
+    def make(fetch, **kwargs):
+        kwargs.setdefault("retry_delay", 0.001)
+        kwargs.setdefault("max_retry_delay", 0.001)
+        buffer = RandomMealBuffer(fetch, **kwargs)
+        started.append(buffer)
+        return buffer
+
+    yield make
+    for buffer in started:
+        buffer.stop()
+
+
+def test_take_waits_for_cold_buffer_then_serves_instantly(buffers):
+    buffer = buffers(FakeFetch(map(str, itertools.count())), size=4,
+                     low_water=2)
+
+    first = buffer.take(timeout=5)
+    second = buffer.take(timeout=5)
+
+    assert first["id"] != second["id"]
+    assert buffer.fetched >= 2
+
+
+def test_buffer_skips_buffered_and_served_meals(buffers):
+    fetch = FakeFetch(["1", "1", "2", "1", "2", "3"])
+    buffer = buffers(fetch, size=3, low_water=3)
+
+    taken = [buffer.take(timeout=5)["id"] for _ in range(3)]
+
+    assert taken == ["1", "2", "3"]
+    assert buffer.duplicates == 3
+
+
+def test_buffer_backs_off_after_failures(buffers):
+    fetch = FakeFetch([RuntimeError("down"), None, "1"])
+    buffer = buffers(fetch, size=1, low_water=1)
+
+    assert buffer.take(timeout=5)["id"] == "1"
+    assert buffer.failures == 2
+
+
+def test_buffer_refills_below_low_water(buffers):
+    fetch = FakeFetch(map(str, itertools.count()))
+    buffer = buffers(fetch, size=4, low_water=2)
+    buffer.take(timeout=5)
+
+    for _ in range(3):
+        buffer.take(timeout=5)
+    buffer.take(timeout=5)
+
+    assert fetch.calls >= 5
+    assert len(buffer) <= 4
+
+
+def test_take_skips_excluded_meals(buffers):
+    buffer = buffers(FakeFetch(["1", "2", "3"]), size=1, low_water=1)
+
+    assert buffer.take({"1", "2"}, timeout=5)["id"] == "3"
+
+
+def test_excluded_meals_stay_buffered_for_other_callers(buffers):
+    buffer = buffers(FakeFetch(["1", "2", "3"]), size=2, low_water=2)
+
+    assert buffer.take({"1", "2"}, timeout=5)["id"] == "3"
+    assert buffer.take(timeout=5)["id"] == "1"
+    assert buffer.take(timeout=5)["id"] == "2"
+
+
+def test_take_without_wait_returns_none_when_empty(buffers):
+    buffer = buffers(FakeFetch([]))
+
+    assert buffer.take() is None
+
+
+def test_fetch_random_recipe_converts_payload(mocker):
+    client = mocker.patch("src.what_to_cook.discovery.MealDBClient")
+    client.return_value.fetch_random_meal.return_value = {
+        "idMeal": "7", "strMeal": "Stew", "strMealThumb": "http://x/s.jpg",
+        "strIngredient1": "Beef", "strMeasure1": "1kg",
+    }
+
+    recipe = fetch_random_recipe()
+
+    assert recipe["id"] == "7"
+    assert recipe["ingredients"] == ["Beef"]
+    client.return_value.get_meal_details.assert_not_called()
+
+    client.return_value.fetch_random_meal.return_value = {}
+    assert fetch_random_recipe() is None
@@ -0,0 +1,67 @@
+from pytest import fixture
+
+from src.what_to_cook.facets import FacetIndex
+
+
+@fixture
+def index():
+    return FacetIndex([
+        {"id": "1", "category": "Beef", "area": "Italian",
+         "ingredients": ["Beef", "Tomato"]},
+        {"id": "2", "category": "Chicken", "area": "Indian",
+         "ingredients": ["Chicken", "tomato", "Rice"]},
+        {"id": "3", "category": "Chicken", "area": "Italian",
+         "ingredients": ["Chicken", "Pasta"]},
+        {"id": "4", "ingredients": ["Rice"]},
+    ])
+
+
+def ids(index, mask):
+    return [r["id"] for r in index.recipes_in(mask)]
+
+
+def test_values_and_labels(index):
+    assert index.values("category") == ["Beef", "Chicken", "Unknown"]
+    assert index.labels["ingredients"]["tomato"] == "Tomato"
+
+
+def test_match_ors_within_and_ands_across_facets(index):
+    assert ids(index, index.match({"category": ["Beef", "Chicken"]})) == [
+        "1", "2", "3"
+    ]
+    assert ids(index, index.match({"category": ["Chicken"],
+                                   "area": ["Italian"]})) == ["3"]
+
+
+def test_match_include_exclude_ingredients(index):
+    assert ids(index, index.match({}, include=["TOMATO"])) == ["1", "2"]
+    assert ids(index, index.match({}, include=["tomato"],
+                                  exclude=["rice"])) == ["1"]
+    assert ids(index, index.match({}, include=["truffle"])) == []
+
+
+def test_counts_within_result_set(index):
+    mask = index.match({"area": ["Italian"]})
+
+    assert index.counts("category", mask) == {"Beef": 1, "Chicken": 1}
+    assert index.counts("ingredients", mask) == {
+        "chicken": 1, "beef": 1, "pasta": 1, "tomato": 1,
+    }
+
+
+def test_skip_counts_against_other_facets(index):
+    selections = {"category": ["Chicken"]}
+
+    mask = index.match(selections, skip="category")
+
+    assert index.counts("category", mask) == {
+        "Chicken": 2, "Beef": 1, "Unknown": 1,
+    }
+
+
+def test_within_limits_to_search_results(index):
+    within = index.from_positions([1, 3])
+
+    assert ids(index, index.match({}, include=["rice"],
+                                  within=within)) == ["2", "4"]
+    assert ids(index, index.match({}, within=index.from_positions([]))) == []
@@ -0,0 +1,46 @@
+from pytest import fixture
+
+from src.what_to_cook.api_client import MealDBClient
+from src.what_to_cook.fake_mealdb import FakeMealDB, synthetic_meals
+
+
+@fixture
+def mealdb(mocker):
+    with FakeMealDB(synthetic_meals(40, seed=3)) as server:
+        mocker.patch.object(MealDBClient, "BASE_URL", server.base_url)
+        yield server
+
+
+def test_synthetic_meals_are_deterministic():
+    meals = synthetic_meals(5, seed=1)
+
+    assert meals == synthetic_meals(5, seed=1)
+    assert len({m["idMeal"] for m in meals}) == 5
+    assert all(m["strIngredient1"] and m["strMeasure1"] is not None
+               for m in meals)
+
+
+def test_client_crawls_stand_in(mealdb):
+    meals = MealDBClient().fetch_all_meals()
+
+    assert sorted(m["idMeal"] for m in meals) == \
+        sorted(m["idMeal"] for m in mealdb.meals)
+    assert mealdb.requests["search.php"] == 26
+
+
+def test_lookup_and_random(mealdb):
+    client = MealDBClient()
+    meal = mealdb.meals[7]
+
+    assert client.get_meal_details(meal["idMeal"]) == meal
+    assert client.get_meal_details("missing") == {}
+    assert client.fetch_random_meal()["idMeal"] in {
+        m["idMeal"] for m in mealdb.meals
+    }
+
+
+def test_unknown_endpoint_is_not_found(mealdb):
+    payload = MealDBClient()._get_json(f"{mealdb.base_url}nope.php",
+                                       timeout=5)
+
+    assert payload is None
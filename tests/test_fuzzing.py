@@ -17,19 +17,16 @@ app = None
 
 @pytest.fixture(autouse=True)
 def setup_imports():
-    with (
-        patch("streamlit.session_state", new_callable=MagicMock),
-        patch("streamlit_local_storage.LocalStorage") as mock_local_storage,
-    ):
-        # Properly mock LocalStorage responses
+    with patch("streamlit.session_state", new_callable=MagicMock):
+        # Properly mock browser storage responses
         mock_storage = MagicMock()
         mock_storage.getItem.side_effect = lambda key: json.dumps([])
-        mock_local_storage.return_value = mock_storage
 
         global app
         import app
 
-        yield
+        with patch.object(app, "local_storage", mock_storage):
+            yield
 
 
 @pytest.fixture
@@ -0,0 +1,74 @@
+from pytest import fixture
+
+from src.what_to_cook.catalog import IndexCache
+from src.what_to_cook.fuzzy import (
+    IngredientLookup, distance, shared_lookup, vocabulary_version,
+)
+
+
+@fixture
+def lookup():
+    return IngredientLookup({
+        "Tomato": 50, "tomatoes": 20, "tomato puree": 10, "chili": 5,
+        "chilli powder": 8, "chicken": 60, "chicken stock": 30, "egg": 40,
+        "salt": 100, "rice": 30,
+    })
+
+
+def test_distance_counts_transpositions():
+    assert distance("rcie", "rice", 2) == 1
+    assert distance("chilli", "chili", 2) == 1
+    assert distance("salt", "tomatoes", 2) == 3
+
+
+def test_suggest_prefers_prefixes_then_misspellings(lookup):
+    assert lookup.suggest("tom", 3) == ["tomato", "tomatoes", "tomato puree"]
+    assert lookup.suggest("stock") == ["chicken stock"]
+    assert lookup.suggest("chiken") == ["chicken", "chicken stock"]
+    assert lookup.suggest("rcie") == ["rice"]
+
+
+def test_suggest_empty_text_gives_most_used(lookup):
+    assert lookup.suggest("", 2) == ["salt", "chicken"]
+
+
+def test_short_words_need_an_exact_prefix(lookup):
+    assert lookup.suggest("egs") == []
+    assert lookup.suggest("eg") == ["egg"]
+
+
+def test_canonical_maps_onto_vocabulary(lookup):
+    assert lookup.canonical("TOMATO") == "tomato"
+    assert lookup.canonical("Eggs") == "egg"
+    assert lookup.canonical("Chiken  Stok") == "chicken stock"
+    assert lookup.canonical("Saffron") == "saffron"
+
+
+def test_canonical_leaves_short_typos_alone():
+    lookup = IngredientLookup({"peas": 30, "salt": 100, "chili": 5})
+    assert lookup.canonical("pear") == "pear"
+    assert lookup.canonical("Malt") == "malt"
+    assert lookup.canonical("chilli") == "chilli"
+    assert lookup.canonical("pea") == "peas"
+
+
+def test_canonical_needs_a_single_candidate():
+    lookup = IngredientLookup({"chicken stock": 30, "chicken stick": 1})
+    assert lookup.canonical("chicken stok") == "chicken stok"
+
+
+def test_build_counts_recipes_per_ingredient():
+    lookup = IngredientLookup.build([
+        {"ingredients": ["Salt", "salt", "Rice"]},
+        {"ingredients": ["salt"]},
+    ])
+    assert lookup.counts == {"salt": 2, "rice": 1}
+
+
+def test_shared_lookup_rebuilds_only_for_new_vocabulary(mocker):
+    mocker.patch("src.what_to_cook.fuzzy.indexes", IndexCache())
+
+    first = shared_lookup({"salt": 2, "rice": 1})
+    assert shared_lookup({"salt": 5, "rice": 3}) is first
+    assert shared_lookup({"salt": 2, "egg": 1}) is not first
+    assert vocabulary_version(["a", "b"]) == vocabulary_version(["b", "a"])
@@ -0,0 +1,115 @@
+from pytest import fixture, raises
+
+from src.what_to_cook.governor import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    RequestGovernor,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@fixture
+def clock():
+    return FakeClock()
+
+
+def test_token_bucket_waits_when_empty(clock):
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire()
+    assert bucket.acquire()
+    assert clock.slept == []
+
+    assert bucket.acquire()
+    assert clock.slept == [0.5]
+
+
+def test_token_bucket_refuses_long_waits(clock):
+    bucket = TokenBucket(rate=1, capacity=1, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+
+    assert bucket.acquire(max_wait=0.1) is False
+    assert bucket.tokens == 0
+
+
+def test_limiter_grows_on_fast_success_and_halves_on_error(clock):
+    limiter = AdaptiveLimiter(initial=4, max_limit=8, clock=clock)
+
+    for _ in range(4):
+        assert limiter.acquire(timeout=0)
+        limiter.release(latency=0.1, ok=True)
+    grown = limiter.limit
+    assert 4.5 < grown < 5
+
+    limiter.acquire(timeout=0)
+    limiter.release(latency=0.1, ok=False)
+    assert limiter.limit == grown / 2
+
+    # Second decrease inside the cooldown window is ignored.
+    limiter.acquire(timeout=0)
+    limiter.release(latency=30, ok=True)
+    assert limiter.limit == grown / 2
+
+
+def test_limiter_blocks_past_limit(clock):
+    limiter = AdaptiveLimiter(initial=1, clock=clock)
+
+    assert limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=0) is False
+
+
+def test_breaker_opens_probes_and_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10,
+                             clock=clock)
+    seen = []
+    breaker.subscribe(lambda old, new: seen.append((old, new)))
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.allow() is False
+
+    clock.now = 10
+    assert breaker.allow()
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert breaker.allow() is False  # only one probe at a time
+
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+    assert seen == [
+        (CircuitState.CLOSED, CircuitState.OPEN),
+        (CircuitState.OPEN, CircuitState.HALF_OPEN),
+        (CircuitState.HALF_OPEN, CircuitState.CLOSED),
+    ]
+    assert [t[2] for t in breaker.transitions] == [
+        "open", "half_open", "closed"
+    ]
+
+
+def test_governor_fails_fast_when_open():
+    governor = RequestGovernor(rate=None, failure_threshold=1)
+    calls = []
+
+    governor.call(lambda: calls.append(1), is_failure=lambda _: True)
+    with raises(CircuitOpenError):
+        governor.call(lambda: calls.append(1))
+
+    assert calls == [1]
+    assert governor.snapshot()["circuit"] == "open"
+    assert governor.snapshot()["in_flight"] == 0
@@ -0,0 +1,37 @@
+import json
+
+from src.what_to_cook.loadtest import main, run_load, summarize
+
+
+def test_summarize_percentiles():
+    stats = summarize([i / 1000 for i in range(1, 101)])
+
+    assert stats["count"] == 100
+    assert stats["p50_ms"] == 50.5
+    assert stats["p99_ms"] == 99.01
+    assert stats["max_ms"] == 100
+
+
+def test_run_load_drives_every_journey():
+    report = run_load(sessions=2, iterations=1, catalog_size=30)
+
+    assert report["errors"] == {}
+    assert {"open", "home.random", "browse.type", "custom.save"} <= \
+        set(report["step_latency"])
+    assert report["steps"] == sum(
+        s["count"] for s in report["step_latency"].values()
+    )
+    assert report["throughput_steps_per_s"] > 0
+    assert report["rss_bytes"]["after"]["peak"] > 0
+    assert report["mealdb_requests"]["search.php"] == 26
+
+
+def test_main_writes_report(tmp_path, capsys):
+    output = tmp_path / "report.json"
+
+    code = main(["--sessions", "1", "--iterations", "1", "--journeys",
+                 "home", "--catalog-size", "10", "--output", str(output)])
+
+    assert code == 0
+    assert json.loads(output.read_text())["journeys"] == ["home"]
+    assert json.loads(capsys.readouterr().out)["sessions"] == 1
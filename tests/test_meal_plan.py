@@ -0,0 +1,98 @@
+import time
+from itertools import combinations
+
+from pytest import fixture, mark
+
+from src.what_to_cook.catalog import normalize_ingredient
+from src.what_to_cook.data_manager import process_meal
+from src.what_to_cook.fake_mealdb import synthetic_meals
+from src.what_to_cook.meal_plan import MealPlanner
+
+
+def recipe(id, ingredients, category="Beef", area="British"):
+    return {"id": id, "name": f"Recipe {id}", "ingredients": ingredients,
+            "category": category, "area": area}
+
+
+@fixture
+def recipes():
+    return [
+        recipe("1", ["Eggs", "Butter", "Flour"], "Breakfast", "French"),
+        recipe("2", ["Eggs", "Butter", "Milk"], "Breakfast", "British"),
+        recipe("3", ["Eggs", "Flour", "Milk"], "Dessert", "French"),
+        recipe("4", ["Rice", "Saffron", "Prawns", "Peas"], "Seafood",
+               "Spanish"),
+        recipe("5", ["Lamb", "Mint", "Potatoes", "Carrots"], "Lamb",
+               "British"),
+        recipe("6", ["Tofu", "Soy Sauce", "Ginger"], "Vegan", "Chinese"),
+    ]
+
+
+@fixture
+def catalog(mocker):
+    client = mocker.patch("src.what_to_cook.data_manager.MealDBClient")
+    client.return_value.get_meal_details.return_value = {}
+    return [process_meal(m) for m in synthetic_meals(5000, seed=2)]
+
+
+def union_size(plan):
+    return len({normalize_ingredient(i)
+                for r in plan for i in r["ingredients"]})
+
+
+def test_plan_minimises_shopping_list(recipes):
+    plan = MealPlanner.build(recipes).plan(days=3, seed=0)
+
+    assert {r["id"] for r in plan.recipes} == {"1", "2", "3"}
+    assert (plan.ingredients, plan.shared) == (4, 5)
+    assert plan.ingredients == min(
+        union_size(c) for c in combinations(recipes, 3)
+    )
+
+
+def test_plan_respects_include_and_exclude(recipes):
+    planner = MealPlanner.build(recipes)
+
+    included = planner.plan(days=3, include=["eggs"], exclude=["Milk"])
+    assert [r["id"] for r in included.recipes] == ["1"]
+    assert planner.plan(days=3, include=["Unobtainium"]).recipes == []
+
+
+def test_plan_respects_variety_caps(recipes):
+    plan = MealPlanner.build(recipes).plan(
+        days=6, max_per_category=1, max_per_area=1, seed=3
+    )
+
+    categories = [r["category"] for r in plan.recipes]
+    areas = [r["area"] for r in plan.recipes]
+    assert len(set(categories)) == len(categories)
+    assert len(set(areas)) == len(areas)
+    assert len(plan.recipes) == 4
+
+
+def test_plan_has_no_repeats_and_is_seeded(catalog):
+    planner = MealPlanner.build(catalog)
+
+    plan = planner.plan(days=14, seed=5)
+
+    assert len({r["id"] for r in plan.recipes}) == 14
+    assert plan == planner.plan(days=14, seed=5)
+
+
+def test_week_over_full_catalog(catalog):
+    planner = MealPlanner.build(catalog)
+
+    plan = planner.plan(days=7, include=["garlic"], seed=1)
+
+    assert len(plan.recipes) == 7
+    assert all("Garlic" in r["ingredients"] for r in plan.recipes)
+
+
+@mark.benchmark
+def test_week_over_full_catalog_is_fast(catalog):
+    planner = MealPlanner.build(catalog)
+
+    start = time.perf_counter()
+    planner.plan(days=7, include=["garlic"], seed=1)
+
+    assert time.perf_counter() - start < 0.5
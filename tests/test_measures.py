@@ -0,0 +1,58 @@
+from pytest import mark
+
+from src.what_to_cook.data_manager import process_meal
+from src.what_to_cook.measures import (
+    NO_QUANTITY,
+    Quantity,
+    parse_measure,
+    recipe_quantities,
+)
+
+
+@mark.parametrize("raw, expected", [
+    ("1 tbsp", Quantity(15.0, "ml")),
+    ("2 cups", Quantity(480.0, "ml")),
+    ("1/2 tsp", Quantity(2.5, "ml")),
+    ("1 1/2 cups", Quantity(360.0, "ml")),
+    ("½ tsp", Quantity(2.5, "ml")),
+    ("100g", Quantity(100.0, "g")),
+    ("1kg", Quantity(1000.0, "g")),
+    ("1.5 L", Quantity(1500.0, "ml")),
+    ("2-3 tbsp", Quantity(45.0, "ml")),
+    ("3 large", Quantity(3.0, "")),
+    ("2 Cloves Chopped", Quantity(2.0, "clove")),
+    ("4 leaves", Quantity(4.0, "leaf")),
+    ("1 fl oz", Quantity(28.4, "ml")),
+    ("to taste", NO_QUANTITY),
+    ("", NO_QUANTITY),
+])
+def test_parse_measure(raw, expected):
+    assert parse_measure(raw) == expected
+
+
+def test_parse_measure_is_cached():
+    parse_measure.cache_clear()
+    for _ in range(3):
+        parse_measure("1 tbsp")
+
+    assert parse_measure.cache_info().hits == 2
+
+
+def test_process_meal_parses_measures_at_ingest(mocker):
+    client = mocker.patch("src.what_to_cook.data_manager.MealDBClient")
+    client.return_value.get_meal_details.return_value = {}
+    meal = process_meal({
+        "idMeal": "1", "strMeal": "Soup", "strMealThumb": "x",
+        "strIngredient1": "Water", "strMeasure1": "1 l",
+        "strIngredient2": "Salt", "strMeasure2": "",
+    })
+
+    assert meal["quantities"] == [(1000.0, "ml"), (None, None)]
+
+
+def test_recipe_quantities_falls_back_to_measures():
+    stored = {"ingredients": ["a"], "quantities": [[5.0, "g"]]}
+    custom = {"ingredients": ["a", "b"], "measures": ["2 tsp"]}
+
+    assert recipe_quantities(stored) == [Quantity(5.0, "g")]
+    assert recipe_quantities(custom) == [Quantity(10.0, "ml"), NO_QUANTITY]
@@ -0,0 +1,144 @@
+import sys
+
+import numpy as np
+from pytest import fixture
+
+from src.what_to_cook.memory import (
+    MemoryLedger,
+    compact,
+    deep_size,
+    format_bytes,
+    shared_ids,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@fixture
+def clock():
+    return FakeClock()
+
+
+@fixture
+def catalog():
+    return [
+        {"id": str(i), "name": f"Recipe {i}", "ingredients": ["salt"] * 20}
+        for i in range(50)
+    ]
+
+
+def test_deep_size_counts_nested_objects():
+    payload = "x" * 10_000
+
+    assert deep_size({"a": [payload]}) > sys.getsizeof(payload)
+    assert deep_size(np.zeros(1000)) >= 8000
+
+
+def test_deep_size_counts_shared_objects_once():
+    payload = "x" * 10_000
+    seen = set()
+
+    first = deep_size([payload], seen=seen)
+    second = deep_size([payload], seen=seen)
+
+    assert first > 10_000
+    assert second < 100
+
+
+def test_deep_size_skips_shared_catalog(catalog):
+    state = {"favorites": list(catalog)}
+
+    assert deep_size(state, skip=shared_ids(catalog)) < \
+        deep_size(state) / 10
+
+
+def test_format_bytes():
+    assert format_bytes(12) == "12 B"
+    assert format_bytes(1536) == "1.5 KB"
+    assert format_bytes(3 << 20) == "3.0 MB"
+
+
+def test_measure_charges_owner_keys_first(clock, catalog):
+    ledger = MemoryLedger(clock=clock)
+    state = {"filtered_recipes": catalog, "all_meals": catalog}
+
+    report = ledger.measure("s1", state)
+
+    assert report.sizes["all_meals"] > report.sizes["filtered_recipes"]
+    assert report.sizes["filtered_recipes"] == 0
+
+
+def test_due_respects_interval(clock):
+    ledger = MemoryLedger(interval=10, clock=clock)
+
+    assert ledger.due("s1")
+    ledger.measure("s1", {})
+    assert not ledger.due("s1")
+    clock.now = 10
+    assert ledger.due("s1")
+
+
+def test_heaviest_sorted_and_stale_sessions_forgotten(clock):
+    ledger = MemoryLedger(ttl=60, clock=clock)
+    ledger.measure("small", {"a": "x"})
+    ledger.measure("big", {"a": "x" * 10_000})
+
+    assert [r.session_id for r in ledger.heaviest()] == ["big", "small"]
+
+    clock.now = 61
+    ledger.measure("new", {})
+    assert [r.session_id for r in ledger.heaviest()] == ["new"]
+
+
+def test_compact_interns_recipe_copies(catalog):
+    custom = {"id": "c1", "name": "Mine", "ingredients": []}
+    stranger = {"id": "gone", "name": "Old", "ingredients": []}
+    state = {
+        "favorites": [dict(catalog[0]), dict(custom), stranger],
+        "current_recipe": dict(catalog[1]),
+        "filtered_recipes": catalog[:2],
+        "similar_custom": object(),
+    }
+
+    changed = compact(state, catalog + [custom])
+
+    assert changed == ["favorites", "current_recipe", "similar_custom"]
+    assert state["favorites"][0] is catalog[0]
+    assert state["favorites"][1] is custom
+    assert state["favorites"][2] is stranger
+    assert state["current_recipe"] is catalog[1]
+    assert "similar_custom" not in state
+
+
+def test_account_compacts_over_budget_session(clock, catalog):
+    state = {
+        "all_meals": catalog,
+        "custom_recipes": [],
+        "favorites": [dict(r, ingredients=list(r["ingredients"]))
+                      for r in catalog],
+    }
+    ledger = MemoryLedger(budget=1, clock=clock)
+    before = deep_size(state["favorites"], skip=shared_ids(catalog))
+
+    report = ledger.account("s1", state, catalog, shared_ids(catalog))
+
+    assert report.compactions == 1
+    assert report.sizes["favorites"] < before / 10
+    assert state["favorites"][0] is catalog[0]
+
+
+def test_account_leaves_session_within_budget(clock, catalog):
+    favorites = [dict(r) for r in catalog]
+    state = {"all_meals": catalog, "favorites": favorites}
+    ledger = MemoryLedger(clock=clock)
+
+    report = ledger.account("s1", state, catalog)
+
+    assert report.compactions == 0
+    assert state["favorites"] is favorites
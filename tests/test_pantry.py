@@ -0,0 +1,69 @@
+from pytest import fixture
+
+from src.what_to_cook.catalog import IndexCache, catalog_version
+from src.what_to_cook.pantry import IngredientMatrix
+
+
+@fixture
+def recipes():
+    return [
+        {"id": "1", "name": "Omelette", "ingredients": ["Eggs", "Butter"]},
+        {"id": "2", "name": "Pancakes",
+         "ingredients": ["Eggs", "Flour", "Milk", "Butter"]},
+        {"id": "3", "name": "Toast", "ingredients": ["bread", "butter"]},
+        {"id": "4", "name": "Salad", "ingredients": ["Lettuce"]},
+    ]
+
+
+def test_rank_orders_by_coverage(recipes):
+    matrix = IngredientMatrix(recipes)
+
+    matches = matrix.rank(["eggs", "butter", "milk"], k=10)
+
+    assert [m.recipe["name"] for m in matches] == [
+        "Omelette", "Pancakes", "Toast"
+    ]
+    assert matches[0].coverage == 1
+    assert (matches[1].matched, matches[1].total) == (3, 4)
+    assert matches[1].missing == ["Flour"]
+    assert matches[2].missing == ["bread"]
+
+
+def test_rank_top_k_and_exclude(recipes):
+    matrix = IngredientMatrix(recipes)
+
+    assert len(matrix.rank(["butter"], k=1)) == 1
+    names = [m.recipe["name"]
+             for m in matrix.rank(["butter"], exclude=["Flour"])]
+    assert "Pancakes" not in names
+
+
+def test_rank_ignores_unknown_ingredients(recipes):
+    matrix = IngredientMatrix(recipes)
+
+    assert matrix.rank(["caviar"]) == []
+    assert IngredientMatrix([]).rank(["eggs"]) == []
+
+
+def test_index_cache_builds_once_per_version(recipes):
+    cache = IndexCache()
+    builds = []
+
+    def build(items):
+        builds.append(len(items))
+        return IngredientMatrix(items)
+
+    first = cache.get("pantry", recipes, build)
+    assert cache.get("pantry", list(recipes), build) is first
+    cache.get("pantry", recipes[:2], build)
+
+    assert builds == [4, 2]
+    assert catalog_version(recipes) != catalog_version(recipes[:2])
+
+
+def test_catalog_version_tracks_recipe_content(recipes):
+    edited = [dict(recipes[0], name="Frittata")] + recipes[1:]
+
+    assert catalog_version(edited) != catalog_version(recipes)
+    assert catalog_version([dict(r) for r in recipes]) == \
+        catalog_version(recipes)
@@ -0,0 +1,89 @@
+import json
+import pstats
+
+from src.what_to_cook.profiler import (
+    PROFILE_KEEP,
+    Profiler,
+    profiling_requested,
+    section,
+)
+
+
+def busy(n: int) -> list:
+    return [str(i) * 10 for i in range(n)]
+
+
+def test_profiling_requested_by_env_or_query(monkeypatch):
+    monkeypatch.delenv("COOKTODAY_PROFILE", raising=False)
+    monkeypatch.setenv("COOKTODAY_ADMIN", "1")
+
+    assert not profiling_requested({})
+    assert profiling_requested({"profile": "1"})
+
+    monkeypatch.setenv("COOKTODAY_PROFILE", "1")
+    assert profiling_requested({})
+
+
+def test_query_is_ignored_without_admin(monkeypatch):
+    monkeypatch.delenv("COOKTODAY_PROFILE", raising=False)
+    monkeypatch.delenv("COOKTODAY_ADMIN", raising=False)
+
+    assert not profiling_requested({"profile": "1"})
+
+
+def test_section_is_a_no_op_outside_a_profile():
+    with section("filter"):
+        pass
+
+
+def test_profiler_reports_sections_functions_and_allocations():
+    with Profiler() as profiler:
+        with section("filter"):
+            kept = busy(20_000)
+        with section("filter"):
+            busy(10)
+
+    result = profiler.result
+    assert result.sections["filter"][0] == 2
+    assert result.elapsed >= result.sections["filter"][1] > 0
+    assert any(function.startswith("busy (") for function, *_ in
+               result.functions)
+    assert result.allocations[0][1] > 0
+    assert result.peak > 0
+    assert kept
+
+
+def test_profiler_saves_prof_and_speedscope(tmp_path):
+    with Profiler(tmp_path, "abc") as profiler:
+        with section("render"):
+            with section("search"):
+                busy(100)
+
+    prof, timeline = profiler.result.paths
+    assert pstats.Stats(str(prof)).total_calls > 0
+    document = json.loads(timeline.read_text())
+    frames = [f["name"] for f in document["shared"]["frames"]]
+    events = [(e["type"], frames[e["frame"]])
+              for e in document["profiles"][0]["events"]]
+    assert events == [("O", "render"), ("O", "search"),
+                      ("C", "search"), ("C", "render")]
+
+
+def test_profiler_keeps_recent_profiles(tmp_path):
+    for _ in range(PROFILE_KEEP + 2):
+        with Profiler(tmp_path):
+            pass
+
+    assert len(list(tmp_path.glob("*.prof"))) == PROFILE_KEEP
+    assert len(list(tmp_path.glob("*.speedscope.json"))) == PROFILE_KEEP
+
+
+def test_concurrent_profile_records_sections_only():
+    with Profiler() as outer:
+        with Profiler() as inner:
+            with section("search"):
+                pass
+
+    assert outer.result.traced
+    assert not inner.result.traced
+    assert inner.result.sections["search"][0] == 1
@@ -0,0 +1,104 @@
+from pytest import fixture
+
+from src.what_to_cook.catalog import summarize, sync_index
+from src.what_to_cook.search import SearchIndex, search, stem, tokenize
+
+
+def recipe(id, name, ingredients, instructions=""):
+    return {"id": id, "name": name, "ingredients": ingredients,
+            "instructions": instructions}
+
+
+@fixture
+def recipes():
+    return [
+        recipe("1", "Beef Stew", ["Beef", "Carrots"],
+               "Brown the beef. Cook in a slow cooker for eight hours."),
+        recipe("2", "Roast Chicken", ["Chicken", "Lemon"],
+               "Roast in a hot oven for an hour."),
+        recipe("3", "Chicken Curry", ["Chicken", "Rice", "Tomatoes"],
+               "Simmer gently on the hob. No oven needed."),
+        recipe("4", "Pulled Pork", ["Pork", "Barbecue Sauce"],
+               "Leave the pork in the slow cooker overnight, then shred."),
+    ]
+
+
+def ids(hits):
+    return [hit.recipe["id"] for hit in hits]
+
+
+def test_tokenize_folds_plurals_and_drops_stopwords():
+    assert tokenize("The Tomatoes and eggs") == ["tomato", "egg"]
+    assert stem("berries") == "berry"
+    assert stem("glass") == "glass"
+
+
+def test_search_finds_instruction_text(recipes):
+    index = SearchIndex.build(recipes)
+
+    hits = search([index], "slow cooker ")
+
+    assert sorted(ids(hits)) == ["1", "4"]
+    assert "**slow** **cooker**" in hits[0].snippet
+
+
+def test_name_matches_outrank_instruction_matches(recipes):
+    index = SearchIndex.build(recipes)
+
+    assert ids(search([index], "roast ")) == ["2"]
+    assert set(ids(search([index], "chicken "))) == {"2", "3"}
+    assert ids(search([index], "oven chicken "))[0] in {"2", "3"}
+    assert ids(search([index], "pork "))[0] == "4"
+
+
+def test_last_word_matches_as_prefix_while_typing(recipes):
+    index = SearchIndex.build(recipes)
+
+    assert set(ids(search([index], "chick"))) == {"2", "3"}
+    assert search([index], "chick ") == []
+
+
+def test_top_k(recipes):
+    index = SearchIndex.build(recipes)
+
+    assert len(search([index], "the cooker oven chicken ", k=2)) == 2
+
+
+def test_snippet_falls_back_to_ingredients(recipes):
+    hits = search([SearchIndex.build(recipes)], "rice ")
+
+    assert hits[0].snippet == "**Rice**"
+
+
+def test_custom_overlay_is_incremental_and_pooled(recipes):
+    base = SearchIndex.build(recipes)
+    custom = [recipe("c1", "Slow Cooker Chilli", ["Beans"], "")]
+
+    overlay = sync_index(None, custom, SearchIndex.build)
+    custom.append(recipe("c2", "Granola", ["Oats"], ""))
+    same = sync_index(overlay, custom, SearchIndex.build)
+
+    assert same is overlay and "c2" in overlay
+    hits = search([base, overlay], "slow cooker ")
+    assert ids(hits)[0] == "c1"
+    assert set(ids(hits)) == {"1", "4", "c1"}
+
+
+def test_empty_queries_and_indexes(recipes):
+    assert search([SearchIndex.build(recipes)], "the ") == []
+    assert search([SearchIndex()], "beef") == []
+
+
+def test_summaries_are_indexed_and_snipped_from_details(recipes):
+    full = {r["id"]: r for r in recipes}
+    summaries = [summarize(r) for r in recipes]
+
+    def hydrate(batch):
+        return [full[r["id"]] for r in batch]
+
+    index = SearchIndex.build(summaries, hydrate)
+    hits = search([index], "slow cooker ", hydrate=hydrate)
+
+    assert sorted(ids(hits)) == ["1", "4"]
+    assert "**slow** **cooker**" in hits[0].snippet
+    assert hits[0].recipe["summary"] is True
@@ -0,0 +1,65 @@
+import csv
+import io
+
+from src.what_to_cook.shopping import build_shopping_list, to_csv, to_text
+
+
+def recipe(ingredients, measures):
+    return {"ingredients": ingredients, "measures": measures}
+
+
+def test_shopping_list_merges_across_recipes():
+    items = build_shopping_list([
+        recipe(["Flour", "Milk", "Salt"], ["200g", "1 cup", "pinch"]),
+        recipe(["flour", "Milk", "Eggs"], ["1kg", "250ml", "3 large"]),
+        recipe(["Flour", "Garlic"], ["2 cups", "3 cloves"]),
+    ])
+
+    rows = [(i.ingredient, i.quantity, i.recipes) for i in items]
+    assert rows == [
+        ("Eggs", "3", 1),
+        ("Flour", "1.2 kg", 2),
+        ("Flour", "480 ml", 1),
+        ("Garlic", "3 cloves", 1),
+        ("Milk", "490 ml", 2),
+        ("Salt", "", 1),
+    ]
+
+
+def test_counted_units_are_pluralized():
+    items = build_shopping_list([
+        recipe(["Salt", "Bay", "Parsley", "Garlic"],
+               ["1 pinch", "2 leaves", "2 bunch", "1 clove"]),
+        recipe(["Salt", "Garlic"], ["1 pinch", "1 clove"]),
+    ])
+
+    assert [i.quantity for i in items] == [
+        "2 leaves", "2 cloves", "2 bunches", "2 pinches",
+    ]
+
+
+def test_recipe_listing_an_ingredient_twice_counts_once():
+    items = build_shopping_list([
+        recipe(["Butter", "Butter"], ["1 tbsp", "2 tbsp"]),
+    ])
+
+    assert [(i.amount, i.recipes) for i in items] == [(45.0, 1)]
+
+
+def test_empty_shopping_list():
+    assert build_shopping_list([]) == []
+    assert to_text([]) == ""
+
+
+def test_exports():
+    items = build_shopping_list([
+        recipe(["Rice", "Salt"], ["300g", "to taste"]),
+    ])
+
+    assert to_text(items) == "- Rice: 300 g\n- Salt: as needed\n"
+    rows = list(csv.reader(io.StringIO(to_csv(items))))
+    assert rows == [
+        ["ingredient", "amount", "unit", "recipes"],
+        ["Rice", "300.0", "g", "1"],
+        ["Salt", "", "", "1"],
+    ]
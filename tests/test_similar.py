@@ -0,0 +1,66 @@
+from pytest import fixture
+
+from src.what_to_cook.catalog import sync_index
+from src.what_to_cook.similar import SimilarityIndex
+
+
+def recipe(recipe_id, ingredients, category="Dessert", area="French"):
+    return {"id": recipe_id, "name": f"Recipe {recipe_id}",
+            "ingredients": ingredients, "category": category, "area": area}
+
+
+@fixture
+def recipes():
+    return [
+        recipe("crepes", ["Eggs", "Flour", "Milk", "Butter", "Sugar"]),
+        recipe("pancakes", ["eggs", "flour", "milk", "butter"],
+               area="American"),
+        recipe("curry", ["Chicken", "Curry Powder", "Rice", "Onion"],
+               category="Chicken", area="Indian"),
+    ]
+
+
+def test_similar_finds_overlapping_recipe(recipes):
+    index = SimilarityIndex.build(recipes)
+
+    hits = index.similar(recipes[0], k=2)
+
+    assert hits[0][1]["id"] == "pancakes"
+    assert all(r["id"] != "crepes" for _, r in hits)
+    assert 0 < hits[0][0] < 1
+
+
+def test_similar_for_unindexed_recipe(recipes):
+    index = SimilarityIndex.build(recipes)
+
+    hits = index.similar(recipe("new", ["Chicken", "Rice", "Onion"],
+                                category="Chicken", area="Indian"))
+
+    assert hits[0][1]["id"] == "curry"
+    assert index.similar(recipe("empty", [], category="", area="")) == []
+
+
+def test_sync_index_adds_and_rebuilds(recipes):
+    index = sync_index(None, recipes[:2], SimilarityIndex.build)
+    same = sync_index(index, recipes, SimilarityIndex.build)
+
+    assert same is index
+    assert len(index) == 3
+
+    rebuilt = sync_index(index, recipes[1:], SimilarityIndex.build)
+    assert rebuilt is not index
+    assert "crepes" not in rebuilt
+
+
+def test_similar_query_scores_a_bounded_share_of_catalog():
+    catalog = [
+        recipe(str(i), [f"ingredient {(i * 7 + j) % 400}" for j in range(8)],
+               category=f"c{i % 14}", area=f"a{i % 25}")
+        for i in range(5000)
+    ]
+    index = SimilarityIndex.build(catalog)
+
+    # Queries only score their buckets, not the whole catalog.
+    assert max(len(index.candidates(item))
+               for item in catalog[:100]) < len(catalog) / 5
+    assert all(index.similar(item) for item in catalog[:100])
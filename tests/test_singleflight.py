@@ -0,0 +1,108 @@
+import threading
+import time
+
+from pytest import raises
+
+from src.what_to_cook.api_client import MealDBClient
+from src.what_to_cook.singleflight import SingleFlight
+
+
+def wait_for_waiters(flights, key, count):
+    deadline = time.monotonic() + 5
+    while flights.waiting(key) < count:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def run_concurrently(flights, key, fn, callers):
+    results, errors = [], []
+    release = threading.Event()
+
+    def leader_fn():
+        release.wait()
+        return fn()
+
+    def call():
+        try:
+            results.append(flights.do(key, leader_fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    wait_for_waiters(flights, key, callers - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_callers_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    results, errors = run_concurrently(
+        flights, "k", lambda: calls.append(1) or "value", callers=5
+    )
+
+    assert calls == [1]
+    assert results == ["value"] * 5
+    assert errors == []
+    assert flights.snapshot() == {"executed": 1, "coalesced": 4,
+                                  "in_flight": 0}
+
+
+def test_errors_reach_every_waiter_for_that_key():
+    flights = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    results, errors = run_concurrently(flights, "k", fail, callers=3)
+
+    assert results == []
+    assert [str(e) for e in errors] == ["boom"] * 3
+    assert flights.do("other", lambda: "ok") == "ok"
+
+
+def test_finished_call_is_not_cached():
+    flights = SingleFlight()
+
+    assert flights.do("k", lambda: 1) == 1
+    assert flights.do("k", lambda: 2) == 2
+    with raises(KeyError):
+        flights.do("k", lambda: {}["missing"])
+
+
+def test_client_coalesces_meal_lookups(mocker):
+    gate = threading.Event()
+
+    def slow_get(url, timeout):
+        gate.wait()
+        response = mocker.MagicMock(status_code=200)
+        response.json.return_value = {"meals": [{"idMeal": "1"}]}
+        return response
+
+    get = mocker.patch("src.what_to_cook.api_client.requests.get",
+                       side_effect=slow_get)
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                MealDBClient().get_meal_details("1")
+            )
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    url = f"{MealDBClient.BASE_URL}lookup.php?i=1"
+    wait_for_waiters(MealDBClient.flights, url, 3)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert get.call_count == 1
+    assert results == [{"idMeal": "1"}] * 4
+    assert MealDBClient.stats()["coalesced"] == 3
@@ -0,0 +1,199 @@
+import json
+import threading
+
+from pytest import fixture, raises
+
+from src.what_to_cook.dedup import DuplicateIndex
+from src.what_to_cook.sources import (
+    CustomRecipeSource,
+    DirectorySource,
+    Federation,
+    MealDBSource,
+    RecipeSource,
+    SessionFederation,
+    directory_sources,
+    merge,
+)
+
+
+class StaticSource(RecipeSource):
+    def __init__(self, name, recipes, priority=0, timeout=5.0,
+                 gate=None, error=None):
+        self.name = name
+        self.recipes = recipes
+        self.priority = priority
+        self.timeout = timeout
+        self.gate = gate
+        self.error = error
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return self.recipes
+
+
+def recipe(recipe_id, name, ingredients):
+    return {"id": recipe_id, "name": name, "ingredients": ingredients}
+
+
+@fixture
+def federation():
+    return Federation(max_workers=4)
+
+
+def test_merge_keeps_earlier_source_on_clash():
+    first = [recipe("1", "Beef Stew", ["beef", "carrot", "onion"])]
+    second = [recipe("1", "Other", ["egg"]),
+              recipe("2", "Beef stew", ["beef", "carrot", "onion"]),
+              recipe("3", "Pancakes", ["flour", "egg", "milk"])]
+
+    merged = merge([(None, first), (None, second)])
+
+    assert [r["id"] for r in merged] == ["1", "3"]
+    assert merged[0]["name"] == "Beef Stew"
+
+
+def test_refresh_merges_by_priority_and_reports(federation):
+    local = StaticSource("local", [recipe("1", "Local", ["egg"])],
+                         priority=1)
+    remote = StaticSource("remote", [recipe("1", "Remote", ["egg"]),
+                                     recipe("2", "Soup", ["leek"])])
+
+    merged = federation.refresh([local, remote])
+
+    assert [r["name"] for r in merged] == ["Remote", "Soup"]
+    reports = {r.name: r for r in federation.reports}
+    assert reports["remote"].status == "ok"
+    assert reports["remote"].records == 2
+    assert reports["local"].records == 1
+    assert reports["local"].seconds >= 0
+
+
+def test_slow_source_times_out_without_holding_up_refresh(federation):
+    gate = threading.Event()
+    slow = StaticSource("slow", [recipe("s", "Slow", ["salt"])],
+                        timeout=0.05, gate=gate)
+    fast = StaticSource("fast", [recipe("f", "Fast", ["egg"])],
+                        priority=1)
+
+    merged = federation.refresh([slow, fast])
+
+    assert [r["id"] for r in merged] == ["f"]
+    report = federation.reports[0]
+    assert (report.name, report.status, report.records) == \
+        ("slow", "timeout", 0)
+
+    # The late fetch is reused by the next refresh, not started again.
+    gate.set()
+    merged = federation.refresh([slow, fast])
+    assert [r["id"] for r in merged] == ["s", "f"]
+    assert slow.calls == 1
+
+
+def test_failed_source_falls_back_to_last_good_fetch(federation):
+    source = StaticSource("flaky", [recipe("1", "Stew", ["beef"])])
+    federation.refresh([source])
+
+    source.error = RuntimeError("down")
+    merged = federation.refresh([source])
+
+    assert [r["id"] for r in merged] == ["1"]
+    report = federation.reports[0]
+    assert report.status == "error"
+    assert report.stale
+    assert "down" in report.error
+
+
+def test_directory_source_reads_json_and_ndjson(tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps([
+        {"id": "x1", "name": "Tart", "ingredients": ["Apple"]},
+    ]))
+    (tmp_path / "b.ndjson").write_text(
+        json.dumps({"name": "Salad", "ingredients": ["lettuce"]}) +
+        "\nnot json\n"
+    )
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    recipes = DirectorySource(tmp_path).fetch()
+
+    assert [r["name"] for r in recipes] == ["Tart", "Salad"]
+    assert recipes[0]["id"] == "x1"
+    assert recipes[1]["id"].startswith("local-")
+    assert recipes[1]["id"] == DirectorySource(tmp_path).fetch()[1]["id"]
+    assert {r["source"] for r in recipes} == {"local"}
+
+
+def test_directory_source_refuses_images_outside_it(tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps([
+        {"name": "Tart", "ingredients": ["apple"],
+         "image": "../secret.png"},
+    ]))
+
+    assert DirectorySource(tmp_path).fetch() == []
+
+
+def test_directory_sources_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("COOKTODAY_SOURCE_DIRS", str(tmp_path))
+
+    sources = directory_sources()
+
+    assert [(s.path, s.priority) for s in sources] == [(tmp_path, 1)]
+    assert directory_sources("") == []
+
+
+def test_mealdb_source_skips_empty_meals(mocker):
+    client = mocker.MagicMock()
+    client.return_value.fetch_all_meals.return_value = [{}]
+
+    assert MealDBSource(client).fetch() == []
+
+
+def test_sources_must_implement_fetch():
+    with raises(TypeError):
+        RecipeSource()
+
+
+def test_session_sources_merge_over_catalog():
+    catalog = DuplicateIndex.build(
+        [recipe("1", "Beef Stew", ["beef", "carrot", "onion"])]
+    )
+    custom = [recipe("1", "Clash", ["egg"]),
+              recipe("c1", "Beef stew", ["beef", "carrot", "onion"]),
+              recipe("c2", "Pancakes", ["flour", "egg", "milk"])]
+    session = SessionFederation(catalog)
+
+    merged = session.refresh([CustomRecipeSource(custom)])
+
+    assert [r["id"] for r in merged] == ["c2"]
+    [report] = session.reports
+    assert (report.name, report.status, report.records) == ("custom", "ok",
+                                                            3)
+
+
+def test_session_sources_index_only_new_recipes(mocker):
+    catalog = DuplicateIndex.build([recipe("1", "Stew", ["beef"])])
+    custom = [recipe("c1", "Pancakes", ["flour", "egg", "milk"])]
+    session = SessionFederation(catalog)
+    session.refresh([CustomRecipeSource(custom)])
+    build = mocker.spy(DuplicateIndex, "build")
+
+    custom.append(recipe("c2", "Granola", ["oats", "honey"]))
+    merged = session.refresh([CustomRecipeSource(custom)])
+
+    assert [r["id"] for r in merged] == ["c1", "c2"]
+    build.assert_not_called()
+
+
+def test_session_source_error_is_reported():
+    session = SessionFederation(DuplicateIndex())
+
+    merged = session.refresh([StaticSource("broken", [],
+                                           error=ValueError("bad"))])
+
+    assert merged == []
+    assert session.reports[0].status == "error"
+    assert session.reports[0].error == "ValueError: bad"
@@ -0,0 +1,125 @@
+import json
+
+from pytest import fixture
+
+from src.what_to_cook.storage import READ_TIMEOUT, BrowserStorage
+
+
+@fixture
+def session_state(mocker):
+    state = {}
+    mocker.patch("src.what_to_cook.storage.st.session_state", state)
+    return state
+
+
+@fixture
+def js_eval(mocker):
+    return mocker.patch("src.what_to_cook.storage.streamlit_js_eval",
+                        return_value=None)
+
+
+@fixture
+def storage():
+    return BrowserStorage()
+
+
+def test_set_item_is_pending_until_flushed(storage, session_state, js_eval):
+    session_state["storage_items"] = {}
+    storage.setItem("favorites", "[1]")
+    storage.setItem("favorites", "[1, 2]")
+
+    assert storage.pending == ["favorites"]
+    # Writes are not kept in session state on top of the app's copy.
+    assert session_state["storage_items"] == {}
+    js_eval.assert_not_called()
+
+    storage.flush()
+
+    script = js_eval.call_args.kwargs["js_expressions"]
+    assert json.dumps(json.dumps({"favorites": "[1, 2]"})) in script
+    assert storage.pending == ["favorites"]
+
+
+def test_flush_renders_each_write_once_per_run(storage, session_state,
+                                               js_eval):
+    storage.setItem("favorites", "[]")
+
+    storage.flush()
+    storage.flush()
+
+    assert js_eval.call_count == 1
+
+
+def test_browser_ack_confirms_write(storage, session_state, js_eval):
+    storage.setItem("favorites", "[]")
+    seq = session_state["storage_pending"]["favorites"]["seq"]
+    js_eval.return_value = seq
+
+    storage.flush()
+
+    assert storage.pending == []
+
+
+def test_ack_from_previous_run_confirms_write(storage, session_state,
+                                              js_eval):
+    storage.setItem("custom_recipes", "[]")
+    seq = session_state["storage_pending"]["custom_recipes"]["seq"]
+    session_state[f"storage_custom_recipes_{seq}"] = seq
+
+    storage.flush()
+
+    assert storage.pending == []
+    js_eval.assert_not_called()
+
+
+def test_read_is_pending_until_browser_answers(storage, session_state,
+                                               js_eval):
+    assert not storage.loaded
+    assert storage.getItem("favorites") is None
+
+    script = js_eval.call_args.kwargs["js_expressions"]
+    assert '"favorites", "custom_recipes", "all_recipes"' in script
+    assert js_eval.call_count == 1
+
+
+def test_read_fetches_all_keys_in_one_answer(storage, session_state,
+                                             js_eval):
+    js_eval.return_value = json.dumps(
+        {"favorites": "[1]", "custom_recipes": None, "all_recipes": "[]"}
+    )
+
+    assert storage.read() == {"favorites": "[1]", "all_recipes": "[]"}
+    assert storage.getItem("custom_recipes") is None
+    assert storage.getItem("all_recipes") == "[]"
+    assert js_eval.call_count == 1
+
+
+def test_answer_from_previous_run_loads_storage(storage, session_state,
+                                                js_eval):
+    session_state["storage_read"] = json.dumps({})
+
+    assert storage.loaded
+    assert storage.read() == {}
+    js_eval.assert_not_called()
+
+
+def test_unanswered_read_times_out_to_nothing_saved(storage, session_state,
+                                                    js_eval, mocker):
+    clock = mocker.patch("src.what_to_cook.storage.time.monotonic",
+                         return_value=100.0)
+    assert storage.read() is None
+
+    clock.return_value = 100.0 + READ_TIMEOUT
+    assert storage.read() == {}
+    assert storage.loaded
+
+
+def test_release_keeps_storage_loaded_without_values(storage, session_state,
+                                                     js_eval):
+    session_state["storage_read"] = json.dumps({"all_recipes": "[1]"})
+    assert storage.getItem("all_recipes") == "[1]"
+
+    storage.release()
+
+    assert storage.loaded
+    assert storage.getItem("all_recipes") is None